@@ -1,40 +1,200 @@
-from typing import NamedTuple
+import os
+from collections.abc import Sequence
+from datetime import datetime
+from functools import cached_property
+from typing import Literal, NamedTuple
 
 import numpy as np
 import pandas as pd
-from pydantic import BaseModel
 
-from config.scraping.output_path import STATIONS_CSV
+from analyzer.helper.composite import (
+    DEFAULT_PERCENTILES,
+    DiurnalGrouping,
+    DiurnalStatistics,
+)
+from analyzer.helper.wind import (
+    VectorMeanWind,
+    get_vector_mean_wind,
+    get_wind_component_arrays,
+)
+from analyzer.type import (
+    StationValues,
+    StationValuesBlock,
+    StationWind,
+    StationWindBlock,
+)
 from constants.missing_value import MISSING_VALUE
+from stations.registry import get_station_registry
+from storage.csv_chunks import ChunkedCsvReader
+from storage.cube import ObservationCube
+from storage.parquet import ObservationParquetStore
+from storage.sqlite import ObservationSqliteStore
 from util.path import generate_path
 
+# digits kept by float32, as in the csv files (see /src/observation/writer.py)
+FLOAT32_SIGNIFICANT_DIGITS = 7
+
+
+def _round_float32_error(values: np.ndarray) -> np.ndarray:
+    """Round values widened from float32 to the digits they were stored with, e.g. 9.2 instead of 9.199999809265137."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = np.floor(np.log10(np.abs(values)))
+        scale = 10.0 ** (FLOAT32_SIGNIFICANT_DIGITS - 1 - exponent)
+        return np.where(values == 0, 0.0, np.round(values * scale) / scale)
+
 
 class Location(NamedTuple):
     lon: float
     lat: float
 
 
-class StationInfo(BaseModel, frozen=True):
+class StationInfo(NamedTuple):
     station_name: str
     lon: float
     lat: float
 
 
 class AmedasDataAnalyzer:
-    def __init__(self, csv_filepath: str) -> None:
-        self._stations_df = pd.read_csv(STATIONS_CSV, dtype=str)
+    _type: Literal["10min", "hourly", "daily"]
+
+    def __init__(
+        self,
+        csv_filepath: str,
+        block_numbers: list[str] | None = None,
+        elements: list[str] | None = None,
+        lazy: bool = False,
+    ) -> None:
+        """
+        Args:
+            csv_filepath (str): csv file of the observed data, directory of a parquet store (see /src/storage/parquet.py), sqlite store file (see /src/storage/sqlite.py) or directory of a cube (see /src/storage/cube.py). A cube is memory-mapped instead of being read, so processes loading the same cube share its memory.
+            block_numbers (list[str] | None, optional): stations to load. Defaults to all.
+            elements (list[str] | None, optional): elements to load. Defaults to all.
+            lazy (bool, optional): If True, a csv file is only indexed by day (by month for daily data) on open, and each query parses just the days it touches, keeping the most recently used ones (see /src/config/storage/chunks.py). `df` is not available in this mode. Stations and elements cannot be projected. Defaults to False.
+        """
+        self._station_registry = get_station_registry()
 
-        self.df = pd.read_csv(csv_filepath, header=[0, 1, 2], index_col=0)
-        self.df.columns.names = ["block_no", "station", "element"]
-        self.df.index = pd.to_datetime(self.df.index)
-        self._missing_value_to_nan()
+        self._chunk_reader: ChunkedCsvReader | None = None
+        self._sqlite_path: str | None = None
+        self._element_matrices: dict[str, tuple[pd.DataFrame, np.ndarray]] = {}
+        if lazy:
+            is_csv = os.path.isfile(
+                csv_filepath
+            ) and not csv_filepath.endswith(".sqlite3")
+            if not is_csv or block_numbers or elements:
+                raise ValueError(
+                    "lazy loading is only available for whole csv files."
+                )
+            self._chunk_reader = ChunkedCsvReader(
+                csv_filepath,
+                chunk="month" if self._type == "daily" else "day",
+                converter=self._replace_missing_value,
+            )
+        elif ObservationCube.is_cube(csv_filepath):
+            self.df = self._map_cube(csv_filepath, block_numbers, elements)
+        else:
+            if os.path.isdir(csv_filepath):
+                self.df = ObservationParquetStore(csv_filepath).read(
+                    self._type, block_numbers=block_numbers, elements=elements
+                )
+            elif csv_filepath.endswith(".sqlite3"):
+                self._sqlite_path = csv_filepath
+                self.df = self._read_sqlite(
+                    csv_filepath, block_numbers, elements
+                )
+            else:
+                self.df = self._read_csv(csv_filepath, block_numbers, elements)
+            self._missing_value_to_nan()
         self._set_stations_dict_attr()
 
+    def _map_cube(
+        self,
+        cube_dir: str,
+        block_numbers: list[str] | None,
+        elements: list[str] | None,
+    ) -> pd.DataFrame:
+        cube = ObservationCube(cube_dir)
+        if cube.type != self._type:
+            raise ValueError(
+                f"{cube_dir} holds {cube.type} data, not {self._type} data."
+            )
+        return cube.to_dataframe(block_numbers, elements)
+
+    def _read_sqlite(
+        self,
+        db_path: str,
+        block_numbers: list[str] | None,
+        elements: list[str] | None,
+    ) -> pd.DataFrame:
+        store = ObservationSqliteStore(db_path)
+        df = store.read(
+            self._type, block_numbers=block_numbers, elements=elements
+        )
+        store.close()
+        return df
+
+    def _read_csv(
+        self,
+        csv_filepath: str,
+        block_numbers: list[str] | None,
+        elements: list[str] | None,
+    ) -> pd.DataFrame:
+        df = pd.read_csv(csv_filepath, header=[0, 1, 2], index_col=0)
+        df.columns.names = ["block_no", "station", "element"]
+        df.index = pd.to_datetime(df.index)
+        if block_numbers is not None:
+            df = df.loc[:, df.columns.get_level_values(0).isin(block_numbers)]
+        if elements is not None:
+            df = df.loc[:, df.columns.get_level_values(2).isin(elements)]
+        return df
+
+    @property
+    def columns(self) -> pd.MultiIndex:
+        if self._chunk_reader is not None:
+            return self._chunk_reader.columns
+        return self.df.columns
+
+    def get_frame(self, dt: datetime) -> pd.DataFrame:
+        """Frame holding the row of a datetime: the whole data, or the loaded chunk in lazy mode."""
+        if self._chunk_reader is not None:
+            return self._chunk_reader.read_at(pd.Timestamp(dt))
+        return self.df
+
+    def get_frame_between(
+        self, start: datetime, end: datetime
+    ) -> pd.DataFrame:
+        """Rows of [start, end), parsing only the chunks they are in in lazy mode."""
+        if self._chunk_reader is not None:
+            keys = dict.fromkeys(
+                self._chunk_reader.get_chunk_key(day)
+                for day in pd.date_range(
+                    pd.Timestamp(start).normalize(), end, freq="D"
+                )
+            )
+            frame = pd.concat(
+                [self._chunk_reader.read_chunk(key) for key in keys]
+            )
+        else:
+            frame = self.df
+        return frame.loc[(frame.index >= start) & (frame.index < end)]
+
+    def get_station_df(self, block_no: str, station: str) -> pd.DataFrame:
+        """Element columns of one station over the whole period."""
+        if self._chunk_reader is not None:
+            station_columns = [
+                column
+                for column in self.columns
+                if column[:2] == (block_no, station)
+            ]
+            return self._chunk_reader.read_columns(station_columns)[
+                (block_no, station)
+            ]
+        return self.df[(block_no, station)]
+
     @property
     def block_numbers(self) -> list[str]:
         BLOCK_NO_COLUMN_LEVEL = 0
         return (
-            self.df.columns.get_level_values(BLOCK_NO_COLUMN_LEVEL)
+            self.columns.get_level_values(BLOCK_NO_COLUMN_LEVEL)
             .unique()
             .to_list()
         )
@@ -42,16 +202,14 @@ class AmedasDataAnalyzer:
     @property
     def station_names(self) -> list[str]:
         STATION_COLUMN_LEVEL = 1
-        level_0_columns = self.df.columns.get_level_values(
-            STATION_COLUMN_LEVEL
-        )
+        level_0_columns = self.columns.get_level_values(STATION_COLUMN_LEVEL)
         station_names = list(set(level_0_columns))
         return station_names
 
     def _set_stations_dict_attr(self) -> None:
         station_dict: dict[str, StationInfo] = {}
-        for multi_col in self.df.columns:
-            block_no, station, _ = multi_col
+        stations = dict.fromkeys(self.columns.droplevel(-1))
+        for block_no, station in stations:
             location = self.get_lonlat(block_no)
             station_dict[block_no] = StationInfo(
                 station_name=station,
@@ -61,17 +219,239 @@ class AmedasDataAnalyzer:
         self.station_dict = station_dict
 
     def get_lonlat(self, block_no: str) -> Location:
-        match_row = self._stations_df[
-            self._stations_df["block_no"] == block_no
-        ]
-        if match_row.empty:
-            raise ValueError(f"block_number {block_no} is not found.")
-        lon = match_row["lon"].values[0]
-        lat = match_row["lat"].values[0]
-        return Location(lon=lon, lat=lat)
+        record = self._station_registry.get(block_no)
+        return Location(lon=record.lon, lat=record.lat)
+
+    @cached_property
+    def _station_locations(self) -> tuple[list[str], np.ndarray, np.ndarray]:
+        block_numbers = self.block_numbers
+        lons = np.array(
+            [self.station_dict[block_no].lon for block_no in block_numbers]
+        )
+        lats = np.array(
+            [self.station_dict[block_no].lat for block_no in block_numbers]
+        )
+        return block_numbers, lons, lats
+
+    @cached_property
+    def _station_indices(self) -> dict[str, int]:
+        block_numbers, _, _ = self._station_locations
+        return {block_no: i for i, block_no in enumerate(block_numbers)}
+
+    @cached_property
+    def _column_positions(self) -> dict[tuple[str, str, str], int]:
+        return {column: i for i, column in enumerate(self.columns)}
+
+    def _get_element_positions(self, target_var: str) -> np.ndarray:
+        """Column position of the element of each station, -1 where the station lacks it."""
+        block_numbers, _, _ = self._station_locations
+        return np.array(
+            [
+                self._column_positions.get(
+                    (
+                        block_no,
+                        self.station_dict[block_no].station_name,
+                        target_var,
+                    ),
+                    -1,
+                )
+                for block_no in block_numbers
+            ],
+            dtype=np.int64,
+        )
+
+    def _get_element_matrix(
+        self, frame: pd.DataFrame, target_var: str
+    ) -> np.ndarray:
+        """(time, station) float64 values of an element over a frame, built once per frame."""
+        cached = self._element_matrices.get(target_var)
+        if cached is not None and cached[0] is frame:
+            return cached[1]
+        positions = self._get_element_positions(target_var)
+        matrix = np.full((len(frame.index), len(positions)), np.nan)
+        present = positions >= 0
+        columns = frame.iloc[:, positions[present]]
+        values = columns.to_numpy(dtype=np.float64)
+        is_float32 = (columns.dtypes == np.float32).to_numpy()
+        if is_float32.any():
+            values[:, is_float32] = _round_float32_error(values[:, is_float32])
+        matrix[:, present] = values
+        self._element_matrices[target_var] = (frame, matrix)
+        return matrix
+
+    def get_values_at(self, dt: datetime, target_var: str) -> StationValues:
+        """Values of an element of all stations at a datetime (a date for daily data), in the order of `block_numbers`.
+
+        Stations lacking the element have NaN values.
+
+        Raises:
+            KeyError: The datetime is not in the data.
+        """
+        frame = self.get_frame(dt)
+        row = frame.index.get_loc(pd.Timestamp(dt))
+        block_numbers, lons, lats = self._station_locations
+        return StationValues(
+            block_numbers=block_numbers,
+            lon=lons,
+            lat=lats,
+            value=self._get_element_matrix(frame, target_var)[row],
+        )
+
+    def _get_station_value(
+        self, dt: datetime, block_no: str, target_var: str
+    ) -> float:
+        """Value of an element of one station, read from the same matrix as `get_values_at`.
+
+        Raises:
+            KeyError: The datetime, the station or its element is not in the data.
+        """
+        station_index = self._station_indices[block_no]
+        if self._get_element_positions(target_var)[station_index] < 0:
+            raise KeyError(target_var)
+        frame = self.get_frame(dt)
+        row = frame.index.get_loc(pd.Timestamp(dt))
+        return float(
+            self._get_element_matrix(frame, target_var)[row, station_index]
+        )
+
+    def get_values_between(
+        self,
+        target_var: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> StationValuesBlock:
+        """Values of an element of all stations over [start, end), shaped (time, station) in the order of `block_numbers`.
+
+        Stations lacking the element have NaN values.
+        """
+        block_numbers, lons, lats = self._station_locations
+        if self._chunk_reader is not None and (start or end):
+            # only the chunks in range are parsed
+            datetimes = self._chunk_reader.datetimes
+            frame = self.get_frame_between(
+                start or datetimes[0],
+                end or datetimes[-1] + pd.Timedelta(1, "ns"),
+            )
+            matrix = self._get_element_matrix(frame, target_var)
+        elif self._chunk_reader is not None:
+            positions = self._get_element_positions(target_var)
+            present = positions >= 0
+            frame = self._chunk_reader.read_columns(
+                [self.columns[i] for i in positions[present]]
+            )
+            matrix = np.full((len(frame.index), len(positions)), np.nan)
+            matrix[:, present] = frame.to_numpy(dtype=np.float64)
+        else:
+            frame = self.df
+            matrix = self._get_element_matrix(frame, target_var)
+        datetimes = pd.DatetimeIndex(frame.index)
+        start_row = datetimes.searchsorted(start) if start else 0
+        end_row = datetimes.searchsorted(end) if end else len(datetimes)
+        return StationValuesBlock(
+            datetimes=datetimes[start_row:end_row],
+            block_numbers=block_numbers,
+            lon=lons,
+            lat=lats,
+            values=matrix[start_row:end_row],
+        )
+
+    def get_wind_at(
+        self,
+        dt: datetime,
+        speed_var: str = "mean_ws",
+        direction_var: str = "mean_wd",
+    ) -> StationWind:
+        """Wind components of all stations at a datetime, in the order of `block_numbers`.
+
+        Calm gives 0 and missing winds NaN (see /src/analyzer/helper/wind.py).
+        """
+        wind_speed = self.get_values_at(dt, speed_var)
+        wind_direction = self.get_values_at(dt, direction_var)
+        components = get_wind_component_arrays(
+            wind_speed.value, wind_direction.value
+        )
+        return StationWind(
+            block_numbers=wind_speed.block_numbers,
+            lon=wind_speed.lon,
+            lat=wind_speed.lat,
+            u=components.u,
+            v=components.v,
+        )
+
+    def get_wind_between(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        speed_var: str = "mean_ws",
+        direction_var: str = "mean_wd",
+    ) -> StationWindBlock:
+        """Wind components of all stations over [start, end), shaped (time, station) in the order of `block_numbers`."""
+        wind_speed = self.get_values_between(speed_var, start, end)
+        wind_direction = self.get_values_between(direction_var, start, end)
+        components = get_wind_component_arrays(
+            wind_speed.values, wind_direction.values
+        )
+        return StationWindBlock(
+            datetimes=wind_speed.datetimes,
+            block_numbers=wind_speed.block_numbers,
+            lon=wind_speed.lon,
+            lat=wind_speed.lat,
+            u=components.u,
+            v=components.v,
+        )
+
+    def get_mean_wind(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        speed_var: str = "mean_ws",
+        direction_var: str = "mean_wd",
+    ) -> VectorMeanWind:
+        """Vector mean wind of each station over [start, end), in the order of `block_numbers`."""
+        wind_speed = self.get_values_between(speed_var, start, end)
+        wind_direction = self.get_values_between(direction_var, start, end)
+        return get_vector_mean_wind(
+            wind_speed.values, wind_direction.values, axis=0
+        )
+
+    def get_diurnal_composites(
+        self,
+        target_vars: list[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> dict[str, DiurnalStatistics]:
+        """Statistics of elements of all stations by time of day over [start, end).
+
+        The rows are grouped by minute of day once for all the elements (see
+        /src/analyzer/helper/composite.py). Each statistic is shaped (time of
+        day, station) in the order of `block_numbers`, from the first time
+        step after 00:00 to 00:00.
+        """
+        composites: dict[str, DiurnalStatistics] = {}
+        grouping: DiurnalGrouping | None = None
+        for target_var in target_vars:
+            block = self.get_values_between(target_var, start, end)
+            if grouping is None:
+                grouping = DiurnalGrouping(block.datetimes)
+            composites[target_var] = grouping.aggregate(
+                block.values, percentiles
+            )
+        return composites
 
     def get_datetimes(self) -> list[pd.Timestamp]:
+        if self._chunk_reader is not None:
+            return self._chunk_reader.datetimes.to_list()
         return self.df.index.to_list()
 
     def _missing_value_to_nan(self) -> None:
-        self.df = self.df.replace(float(MISSING_VALUE), np.nan)
+        self.df = self._replace_missing_value(self.df)
+
+    @staticmethod
+    def _replace_missing_value(df: pd.DataFrame) -> pd.DataFrame:
+        # float32 columns of the parquet store hold the float32 missing value
+        missing_values = [
+            float(MISSING_VALUE),
+            float(np.float32(MISSING_VALUE)),
+        ]
+        return df.replace(missing_values, np.nan)
@@ -0,0 +1,123 @@
+import warnings
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_PERCENTILES = (10.0, 50.0, 90.0)
+
+
+class DiurnalStatistics(NamedTuple):
+    """Statistics of each column by time of day, shaped (time of day, column).
+
+    minutes is the minute of day of each row, from the first time step after
+    00:00 up to 1440 for 00:00, which closes the day as in the JMA tables.
+    std is the sample standard deviation (ddof=1), like pandas. Missing
+    values are left out, and the statistics of a row without any value are
+    NaN.
+    """
+
+    minutes: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    count: np.ndarray
+    percentiles: dict[float, np.ndarray]
+
+
+def get_minutes_of_day(datetimes: pd.DatetimeIndex) -> np.ndarray:
+    """Minute of day of each datetime, 1440 for 00:00."""
+    minutes = datetimes.hour.to_numpy() * 60 + datetimes.minute.to_numpy()
+    return np.where(minutes == 0, MINUTES_PER_DAY, minutes)
+
+
+def get_time_labels(minutes: np.ndarray) -> list[str]:
+    """Labels of minutes of day as "HH:MM:SS", as the analyzers index the composites."""
+    return [
+        f"{minute // 60 % 24:02d}:{minute % 60:02d}:00" for minute in minutes
+    ]
+
+
+class DiurnalGrouping:
+    """Groups the rows of (time, column) arrays by time of day.
+
+    The rows are sorted by minute of day once, then each array is laid out
+    as (time of day, day, column) with a single fancy-indexed assignment and
+    reduced along the day axis, so every column and statistic is computed in
+    one vectorized pass. Days lacking a time step are padded with NaN.
+    """
+
+    def __init__(self, datetimes: pd.DatetimeIndex) -> None:
+        keys = get_minutes_of_day(datetimes)
+        self._order = np.argsort(keys, kind="stable")
+        self.minutes, starts, counts = np.unique(
+            keys[self._order], return_index=True, return_counts=True
+        )
+        self._groups = np.repeat(np.arange(len(self.minutes)), counts)
+        self._ranks = np.arange(len(keys)) - starts[self._groups]
+        self._days = int(counts.max()) if len(counts) else 0
+
+    def to_cube(self, values: np.ndarray) -> np.ndarray:
+        """(time of day, day, column) layout of (time, column) values."""
+        cube = np.full(
+            (len(self.minutes), self._days) + values.shape[1:], np.nan
+        )
+        cube[self._groups, self._ranks] = values[self._order]
+        return cube
+
+    def aggregate(
+        self,
+        values: np.ndarray,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> DiurnalStatistics:
+        cube = self.to_cube(np.asarray(values, dtype=np.float64))
+        count = (~np.isnan(cube)).sum(axis=1)
+        with warnings.catch_warnings():
+            # all-NaN rows give NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(cube, axis=1)
+            std = np.nanstd(cube, axis=1, ddof=1)
+        return DiurnalStatistics(
+            minutes=self.minutes,
+            mean=mean,
+            std=std,
+            count=count,
+            percentiles=_get_percentiles(cube, count, percentiles),
+        )
+
+
+def _get_percentiles(
+    cube: np.ndarray, count: np.ndarray, percentiles: Sequence[float]
+) -> dict[float, np.ndarray]:
+    """Percentiles along the day axis, interpolated linearly as `np.nanpercentile` does.
+
+    np.nanpercentile loops over the columns along the other axes, so the
+    cube is sorted once (NaN last) and the values are picked for all the
+    columns at once.
+    """
+    if not len(percentiles):
+        return {}
+    sorted_cube = np.sort(cube, axis=1)
+    last = np.maximum(count - 1, 0)[:, np.newaxis]
+    results: dict[float, np.ndarray] = {}
+    for percentile in percentiles:
+        position = last * (percentile / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, last)
+        lower_values = np.take_along_axis(sorted_cube, lower, axis=1)
+        upper_values = np.take_along_axis(sorted_cube, upper, axis=1)
+        values = lower_values + (upper_values - lower_values) * (
+            position - lower
+        )
+        results[percentile] = np.where(count > 0, values[:, 0], np.nan)
+    return results
+
+
+def get_time_of_day_frame(
+    values: np.ndarray, minutes: np.ndarray, columns: list[str]
+) -> pd.DataFrame:
+    """(time of day, column) statistics as a frame indexed by `get_time_labels`."""
+    return pd.DataFrame(
+        values, index=get_time_labels(minutes), columns=columns
+    )
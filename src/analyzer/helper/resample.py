@@ -0,0 +1,352 @@
+import warnings
+from typing import Literal, NamedTuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analyzer.helper.composite import get_minutes_of_day
+from analyzer.helper.wind import get_vector_mean_wind
+from config.analyzer.resample import MIN_COMPLETENESS
+from constants.wind_direction import CALM_VALUE
+
+STEP = pd.Timedelta(minutes=10)
+STEPS_PER_HOUR = 6
+STEPS_PER_DAY = 144
+# rows before the first period needed by the running 1-hour precipitation
+LOOKBACK_STEPS = STEPS_PER_HOUR - 1
+# 16 compass directions of the wind direction, in degrees
+DIRECTION_DEGREES = 22.5
+DIRECTION_COUNT = 16
+
+# 10-minute elements whose "--" (no phenomenon) is read as 0 when resampling
+# from a sqlite store, which keeps the flags; csv files hold the missing value
+NO_PHENOMENON_ZERO_ELEMENTS = ["precipitation", "sunshine_hours"]
+
+# source 10-minute elements of each derived element
+# *_time elements hold the minute of day of the extreme (1440 for 24:00)
+HOURLY_SOURCES: dict[str, tuple[str, ...]] = {
+    "station_pressure": ("station_pressure",),
+    "sea_level_pressure": ("sea_level_pressure",),
+    "precipitation": ("precipitation",),
+    "temperature": ("temperature",),
+    "relative_humidity": ("relative_humidity",),
+    "mean_ws": ("mean_ws",),
+    "mean_wd": ("mean_wd",),
+    "sunshine_hours": ("sunshine_hours",),
+    "max_10min_precipitation": ("precipitation",),
+    "max_10min_precipitation_time": ("precipitation",),
+    "highest_temperature": ("temperature",),
+    "highest_temperature_time": ("temperature",),
+    "lowest_temperature": ("temperature",),
+    "lowest_temperature_time": ("temperature",),
+    "max_instantaneous_ws": ("instantaneous_ws", "instantaneous_wd"),
+    "max_instantaneous_wd": ("instantaneous_ws", "instantaneous_wd"),
+    "max_instantaneous_ws_time": ("instantaneous_ws", "instantaneous_wd"),
+    "vector_mean_ws": ("mean_ws", "mean_wd"),
+    "vector_mean_wd": ("mean_ws", "mean_wd"),
+    "wind_steadiness": ("mean_ws", "mean_wd"),
+}
+
+# names of the JMA daily data (see /src/constants/observation_elems.py)
+DAILY_SOURCES: dict[str, tuple[str, ...]] = {
+    "mean_station_pressure": ("station_pressure",),
+    "mean_sea_level_pressure": ("sea_level_pressure",),
+    "total_precipitation": ("precipitation",),
+    "max_hourly_precipitation": ("precipitation",),
+    "max_hourly_precipitation_time": ("precipitation",),
+    "max_10min_precipitation": ("precipitation",),
+    "max_10min_precipitation_time": ("precipitation",),
+    "mean_temperature": ("temperature",),
+    "highest_temperature": ("temperature",),
+    "highest_temperature_time": ("temperature",),
+    "lowest_temperature": ("temperature",),
+    "lowest_temperature_time": ("temperature",),
+    "mean_relative_humidity": ("relative_humidity",),
+    "min_relative_humidity": ("relative_humidity",),
+    "min_relative_humidity_time": ("relative_humidity",),
+    "mean_ws": ("mean_ws",),
+    "max_ws": ("mean_ws", "mean_wd"),
+    "max_wd": ("mean_ws", "mean_wd"),
+    "max_ws_time": ("mean_ws", "mean_wd"),
+    "max_instantaneous_ws": ("instantaneous_ws", "instantaneous_wd"),
+    "max_instantanious_wd": ("instantaneous_ws", "instantaneous_wd"),
+    "max_instantaneous_ws_time": ("instantaneous_ws", "instantaneous_wd"),
+    "most_frequent_wd": ("mean_wd",),
+    "sunshine_hours": ("sunshine_hours",),
+    "vector_mean_ws": ("mean_ws", "mean_wd"),
+    "vector_mean_wd": ("mean_ws", "mean_wd"),
+    "wind_steadiness": ("mean_ws", "mean_wd"),
+}
+
+# elements observed on the hour and the names of their daily means
+ON_THE_HOUR_ELEMENTS: dict[str, str | None] = {
+    "station_pressure": "mean_station_pressure",
+    "sea_level_pressure": "mean_sea_level_pressure",
+    "temperature": "mean_temperature",
+    "relative_humidity": "mean_relative_humidity",
+    "mean_ws": "mean_ws",
+    "mean_wd": None,
+}
+
+
+class TenMinuteGrid(NamedTuple):
+    """10-minute values of every station on a regular timeline, shaped (time, station).
+
+    The timeline starts LOOKBACK_STEPS rows before the first period, which
+    begins at 00:10 of a day, and ends at 24:00 of the last day. Rows absent
+    from the data are NaN.
+    """
+
+    datetimes: pd.DatetimeIndex
+    values: dict[str, np.ndarray]
+
+
+class ResampledValues(NamedTuple):
+    """Derived elements of every station, shaped (period, station)."""
+
+    datetimes: pd.DatetimeIndex
+    values: dict[str, np.ndarray]
+
+
+class _Periods:
+    """The grid laid out as (period, step, station), a period being (HH-1:00, HH:00] or (00:00, 24:00]."""
+
+    def __init__(self, grid: TenMinuteGrid, steps: int) -> None:
+        self._grid = grid
+        self._steps = steps
+        self.elements = set(grid.values)
+        self.minutes = get_minutes_of_day(
+            grid.datetimes[LOOKBACK_STEPS:]
+        ).reshape(-1, steps)
+
+    def get(self, element: str) -> np.ndarray:
+        values = self._grid.values[element][LOOKBACK_STEPS:]
+        return values.reshape(-1, self._steps, values.shape[1])
+
+    def get_running_sum(self, element: str, window: int) -> np.ndarray:
+        """Sums over the `window` steps ending at each step, e.g. the precipitation of the last hour."""
+        values = self._grid.values[element][LOOKBACK_STEPS + 1 - window :]
+        windows = sliding_window_view(values, window, axis=0)
+        sums = np.where(
+            _is_complete(windows, axis=-1), np.nansum(windows, axis=-1), np.nan
+        )
+        return sums.reshape(-1, self._steps, sums.shape[1])
+
+
+def _is_complete(cube: np.ndarray, axis: int = 1) -> np.ndarray:
+    valid = (~np.isnan(cube)).sum(axis=axis)
+    return valid >= MIN_COMPLETENESS * cube.shape[axis]
+
+
+def _sum(cube: np.ndarray) -> np.ndarray:
+    return np.where(_is_complete(cube), np.nansum(cube, axis=1), np.nan)
+
+
+def _mean(cube: np.ndarray) -> np.ndarray:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.where(_is_complete(cube), np.nanmean(cube, axis=1), np.nan)
+
+
+def _get_extreme_steps(
+    cube: np.ndarray, kind: Literal["max", "min"]
+) -> np.ndarray:
+    """Step of the extreme of each period, the latest one on ties as JMA dates its extremes."""
+    reversed_cube = cube[:, ::-1]
+    if kind == "max":
+        steps = np.argmax(
+            np.where(np.isnan(reversed_cube), -np.inf, reversed_cube), axis=1
+        )
+    else:
+        steps = np.argmin(
+            np.where(np.isnan(reversed_cube), np.inf, reversed_cube), axis=1
+        )
+    return cube.shape[1] - 1 - steps
+
+
+def _get_extreme(
+    periods: _Periods,
+    cube: np.ndarray,
+    kind: Literal["max", "min"],
+    with_values: tuple[np.ndarray, ...] = (),
+) -> tuple[np.ndarray, ...]:
+    """Extreme of each period, its minute of day, and the values of `with_values` at the same step."""
+    steps = _get_extreme_steps(cube, kind)
+    complete = _is_complete(cube)
+    picked = [
+        np.take_along_axis(values, steps[:, np.newaxis], axis=1)[:, 0]
+        for values in (cube, *with_values)
+    ]
+    times = np.take_along_axis(periods.minutes, steps, axis=1)
+    return (
+        np.where(complete, picked[0], np.nan),
+        np.where(complete, times, np.nan),
+        *(np.where(complete, values, np.nan) for values in picked[1:]),
+    )
+
+
+def _get_vector_mean(
+    speed: np.ndarray, direction: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    wind = get_vector_mean_wind(speed, direction, axis=1)
+    complete = wind.count >= MIN_COMPLETENESS * speed.shape[1]
+    return (
+        np.where(complete, wind.speed, np.nan),
+        np.where(complete, wind.direction, np.nan),
+        np.where(complete, wind.steadiness, np.nan),
+    )
+
+
+def _get_most_frequent_direction(direction: np.ndarray) -> np.ndarray:
+    """Most frequent of the 16 directions of each period, calm when the wind was always calm."""
+    calm = direction == float(CALM_VALUE)
+    blowing = ~np.isnan(direction) & ~calm
+    bins = np.rint(np.where(blowing, direction, 0) / DIRECTION_DEGREES)
+    bins = bins.astype(np.int64) % DIRECTION_COUNT
+    counts = np.stack(
+        [(blowing & (bins == i)).sum(axis=1) for i in range(DIRECTION_COUNT)],
+        axis=-1,
+    )
+    most_frequent = np.argmax(counts, axis=-1)
+    degrees = np.where(most_frequent == 0, DIRECTION_COUNT, most_frequent)
+    return np.where(
+        ~_is_complete(direction),
+        np.nan,
+        np.where(
+            counts.sum(axis=-1) > 0,
+            degrees * DIRECTION_DEGREES,
+            float(CALM_VALUE),
+        ),
+    )
+
+
+def _compute(
+    periods: _Periods, elements: dict[str, tuple[str, ...]], daily: bool
+) -> dict[str, np.ndarray]:
+    values: dict[str, np.ndarray] = {}
+
+    def needs(*sources: str) -> bool:
+        return periods.elements.issuperset(sources)
+
+    if needs("precipitation"):
+        precipitation = periods.get("precipitation")
+        total = _sum(precipitation)
+        max_10min, max_10min_time = _get_extreme(periods, precipitation, "max")
+        # the hourly and daily data name the total differently
+        values |= {
+            "total_precipitation": total,
+            "precipitation": total,
+            "max_10min_precipitation": max_10min,
+            "max_10min_precipitation_time": max_10min_time,
+        }
+        if daily:
+            hourly = periods.get_running_sum("precipitation", STEPS_PER_HOUR)
+            max_hourly, max_hourly_time = _get_extreme(periods, hourly, "max")
+            values |= {
+                "max_hourly_precipitation": max_hourly,
+                "max_hourly_precipitation_time": max_hourly_time,
+            }
+    # JMA hourly values are the values on the hour, and daily means are
+    # the means of the 24 values on the hour
+    for element, daily_element in ON_THE_HOUR_ELEMENTS.items():
+        if not needs(element):
+            continue
+        on_the_hour = periods.get(element)[
+            :, STEPS_PER_HOUR - 1 :: STEPS_PER_HOUR
+        ]
+        if not daily:
+            values[element] = on_the_hour[:, 0]
+        elif daily_element is not None:
+            values[daily_element] = _mean(on_the_hour)
+    if needs("temperature"):
+        temperature = periods.get("temperature")
+        highest, highest_time = _get_extreme(periods, temperature, "max")
+        lowest, lowest_time = _get_extreme(periods, temperature, "min")
+        values |= {
+            "highest_temperature": highest,
+            "highest_temperature_time": highest_time,
+            "lowest_temperature": lowest,
+            "lowest_temperature_time": lowest_time,
+        }
+    if needs("relative_humidity"):
+        lowest, lowest_time = _get_extreme(
+            periods, periods.get("relative_humidity"), "min"
+        )
+        values |= {
+            "min_relative_humidity": lowest,
+            "min_relative_humidity_time": lowest_time,
+        }
+    if needs("mean_ws", "mean_wd"):
+        speed, direction = periods.get("mean_ws"), periods.get("mean_wd")
+        max_ws, max_ws_time, max_wd = _get_extreme(
+            periods, speed, "max", (direction,)
+        )
+        vector_ws, vector_wd, steadiness = _get_vector_mean(speed, direction)
+        values |= {
+            "max_ws": max_ws,
+            "max_wd": max_wd,
+            "max_ws_time": max_ws_time,
+            "vector_mean_ws": vector_ws,
+            "vector_mean_wd": vector_wd,
+            "wind_steadiness": steadiness,
+        }
+    if needs("mean_wd") and daily:
+        values["most_frequent_wd"] = _get_most_frequent_direction(
+            periods.get("mean_wd")
+        )
+    if needs("instantaneous_ws", "instantaneous_wd"):
+        max_ws, max_ws_time, max_wd = _get_extreme(
+            periods,
+            periods.get("instantaneous_ws"),
+            "max",
+            (periods.get("instantaneous_wd"),),
+        )
+        # the daily data spell the direction "instantanious"
+        values |= {
+            "max_instantaneous_ws": max_ws,
+            "max_instantaneous_wd": max_wd,
+            "max_instantanious_wd": max_wd,
+            "max_instantaneous_ws_time": max_ws_time,
+        }
+    if needs("sunshine_hours"):
+        # 10-minute sunshine is in minutes
+        values["sunshine_hours"] = _sum(periods.get("sunshine_hours")) / 60
+    return {
+        element: values[element] for element in elements if element in values
+    }
+
+
+def resample_to_hourly(grid: TenMinuteGrid) -> ResampledValues:
+    """Hourly elements (HOURLY_SOURCES) of the grid, labeled by the end of each hour.
+
+    Elements observed on the hour (pressure, temperature, humidity, wind)
+    take the value at HH:00 as in the JMA hourly data. Precipitation and
+    sunshine are summed, extremes are dated by their minute of day, and the
+    wind is also averaged as vectors.
+    """
+    periods = _Periods(grid, STEPS_PER_HOUR)
+    datetimes = grid.datetimes[
+        LOOKBACK_STEPS + STEPS_PER_HOUR - 1 :: STEPS_PER_HOUR
+    ]
+    return ResampledValues(
+        datetimes=datetimes,
+        values=_compute(periods, HOURLY_SOURCES, daily=False),
+    )
+
+
+def resample_to_daily(grid: TenMinuteGrid) -> ResampledValues:
+    """Daily elements (DAILY_SOURCES) of the grid, labeled by date.
+
+    Means are the means of the 24 values on the hour as in the JMA daily
+    data. Precipitation and sunshine are summed, the largest 1-hour
+    precipitation is taken from the running sums ending every 10 minutes,
+    extremes are dated by their minute of day, and the wind is also averaged
+    as vectors.
+    """
+    periods = _Periods(grid, STEPS_PER_DAY)
+    datetimes = grid.datetimes[LOOKBACK_STEPS::STEPS_PER_DAY].normalize()
+    return ResampledValues(
+        datetimes=datetimes,
+        values=_compute(periods, DAILY_SOURCES, daily=True),
+    )
@@ -1,9 +1,16 @@
-from math import cos, radians, sin
 from typing import NamedTuple
 
 import numpy as np
+from numpy.typing import ArrayLike
 
 from constants.missing_value import MISSING_VALUE
+from constants.wind_direction import CALM_VALUE
+
+# values read from float32 stores differ from the codes by the float32 error
+CODE_TOLERANCE = 0.05
+# mean speeds [m/s] below this round to 0.0 at the 0.1 m/s of the data, so a
+# mean vector this slow, e.g. of opposite winds cancelling out, is calm
+CALM_SPEED = 0.05
 
 
 class WindComponents(NamedTuple):
@@ -11,13 +18,93 @@ class WindComponents(NamedTuple):
     v: float
 
 
+class WindComponentArrays(NamedTuple):
+    u: np.ndarray
+    v: np.ndarray
+
+
+class VectorMeanWind(NamedTuple):
+    """Vector mean of winds, with the wind speed and direction of the mean vector.
+
+    steadiness is the speed of the mean vector divided by the mean wind
+    speed: 1 when the wind kept its direction, near 0 when it turned around.
+    """
+
+    u: np.ndarray
+    v: np.ndarray
+    speed: np.ndarray
+    direction: np.ndarray
+    steadiness: np.ndarray
+    count: np.ndarray
+
+
+def _is_code(values: np.ndarray, code: str) -> np.ndarray:
+    return np.abs(values - float(code)) < CODE_TOLERANCE
+
+
+def get_wind_component_arrays(
+    wind_speed: ArrayLike, wind_direction: ArrayLike
+) -> WindComponentArrays:
+    """u (eastward) and v (northward) components of winds of any shape.
+
+    Directions are where the wind blows from, in degrees clockwise from
+    north. Calm (a direction of -888.8) gives 0 whatever the wind speed. A
+    missing (NaN or -999.9) wind speed or direction gives NaN.
+    """
+    speed = np.asarray(wind_speed, dtype=np.float64)
+    direction = np.asarray(wind_direction, dtype=np.float64)
+    calm = _is_code(direction, CALM_VALUE) | _is_code(speed, CALM_VALUE)
+    missing = (
+        np.isnan(speed)
+        | np.isnan(direction)
+        | _is_code(speed, MISSING_VALUE)
+        | _is_code(direction, MISSING_VALUE)
+    )
+    radians = np.radians(direction)
+    u = np.where(missing, np.nan, -speed * np.sin(radians))
+    v = np.where(missing, np.nan, -speed * np.cos(radians))
+    return WindComponentArrays(
+        u=np.where(calm, 0.0, u), v=np.where(calm, 0.0, v)
+    )
+
+
 def get_wind_components(
     wind_speed: float, wind_direction: float
 ) -> WindComponents:
-    if wind_speed == -888.8:
-        return WindComponents(u=0, v=0)
-    if wind_speed == np.nan or wind_direction == float(MISSING_VALUE):
-        return WindComponents(u=np.nan, v=np.nan)
-    u = wind_speed * (-sin(radians(wind_direction)))
-    v = wind_speed * (-cos(radians(wind_direction)))
-    return WindComponents(u=u, v=v)
+    components = get_wind_component_arrays(wind_speed, wind_direction)
+    return WindComponents(u=float(components.u), v=float(components.v))
+
+
+def get_vector_mean_wind(
+    wind_speed: ArrayLike, wind_direction: ArrayLike, axis: int = 0
+) -> VectorMeanWind:
+    """Vector mean of winds along an axis, e.g. over time of (time, station) arrays.
+
+    Missing winds are left out, calm counts as a wind of speed 0. Where all
+    winds are missing the results are NaN, and where the mean vector is
+    slower than CALM_SPEED the direction is calm. steadiness is NaN where the
+    mean wind speed is below CALM_SPEED.
+    """
+    components = get_wind_component_arrays(wind_speed, wind_direction)
+    valid = ~np.isnan(components.u)
+    count = valid.sum(axis=axis)
+    scalar_speed = np.hypot(components.u, components.v)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        u = np.where(valid, components.u, 0.0).sum(axis=axis) / count
+        v = np.where(valid, components.v, 0.0).sum(axis=axis) / count
+        mean_speed = np.where(valid, scalar_speed, 0.0).sum(axis=axis) / count
+        speed = np.hypot(u, v)
+        steadiness = np.where(
+            mean_speed >= CALM_SPEED, speed / mean_speed, np.nan
+        )
+    direction = np.degrees(np.arctan2(-u, -v)) % 360
+    direction = np.where(direction == 0, 360.0, direction)
+    direction = np.where(speed < CALM_SPEED, float(CALM_VALUE), direction)
+    return VectorMeanWind(
+        u=u,
+        v=v,
+        speed=speed,
+        direction=direction,
+        steadiness=steadiness,
+        count=count,
+    )
@@ -1,5 +1,4 @@
 from datetime import datetime
-from typing import cast
 from warnings import filterwarnings
 
 import pandas as pd
@@ -12,31 +11,33 @@ from analyzer.type import ObservedValuesContainer
 class HourlyDataAnalyzer(AmedasDataAnalyzer):
     filterwarnings("ignore")
 
-    def __init__(self, csv_filepath: str) -> None:
-        super().__init__(csv_filepath)
+    _type = "hourly"
+
+    def __init__(
+        self,
+        csv_filepath: str,
+        block_numbers: list[str] | None = None,
+        elements: list[str] | None = None,
+        lazy: bool = False,
+    ) -> None:
+        super().__init__(csv_filepath, block_numbers, elements, lazy)
 
     def get_observed_values(
         self, datetime: datetime, block_no: str, target_var: str
     ) -> ObservedValuesContainer:
-        station = self.station_dict[block_no].station_name
-        lon = self.station_dict[block_no].lon
-        lat = self.station_dict[block_no].lat
-        str_datetime = datetime.strftime("%Y-%m-%d %H:%M:%S")
-        each_station_vars: pd.Series = cast(
-            pd.Series, self.df.loc[str_datetime, block_no]
-        )
+        station = self.station_dict[block_no]
         return ObservedValuesContainer(
             block_no=block_no,
-            value=each_station_vars.at[station, target_var],
-            lon=lon,
-            lat=lat,
+            value=self._get_station_value(datetime, block_no, target_var),
+            lon=station.lon,
+            lat=station.lat,
         )
 
     def pivot_by_time_and_date(
         self, block_no: str, target_var: str
     ) -> pd.DataFrame:
         station = self.station_dict[block_no].station_name
-        df = self.df[(block_no, station)].copy()
+        df = self.get_station_df(block_no, station).copy()
         assert isinstance(df.index, DatetimeIndex)
         df["date"] = df.index.date
         df["time"] = df.index.time
@@ -45,7 +46,7 @@ class HourlyDataAnalyzer(AmedasDataAnalyzer):
     def get_average_by_time(self, block_no: str, target_var: str) -> pd.Series:
         pivotted_df = self.pivot_by_time_and_date(block_no, target_var)
         df = pivotted_df.mean(axis=1)
-        return df._sort_index_in_correct_order()
+        return self.sort_index_in_correct_order(df)
 
     def get_std_by_time(self, block_no: str, target_var: str) -> pd.Series:
         pivotted_df = self.pivot_by_time_and_date(block_no, target_var)
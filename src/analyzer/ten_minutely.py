@@ -1,42 +1,61 @@
-from datetime import datetime
-from typing import cast
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from typing import Literal
 from warnings import filterwarnings
 
+import numpy as np
 import pandas as pd
 from pandas import DatetimeIndex
 
 from analyzer.base import AmedasDataAnalyzer
+from analyzer.helper.resample import (
+    DAILY_SOURCES,
+    HOURLY_SOURCES,
+    LOOKBACK_STEPS,
+    NO_PHENOMENON_ZERO_ELEMENTS,
+    STEP,
+    ResampledValues,
+    TenMinuteGrid,
+    resample_to_daily,
+    resample_to_hourly,
+)
 from analyzer.type import ObservedValuesContainer
+from config.analyzer.resample import RESAMPLE_CHUNK_DAYS
+from constants.missing_value import MISSING_VALUE
+from constants.quality_flag import FLAG_NO_PHENOMENON
+from storage.sqlite import ObservationSqliteStore
 
 
 class TenMinuteDataAnalyzer(AmedasDataAnalyzer):
     filterwarnings("ignore")
 
-    def __init__(self, csv_filepath: str) -> None:
-        super().__init__(csv_filepath)
+    _type = "10min"
+
+    def __init__(
+        self,
+        csv_filepath: str,
+        block_numbers: list[str] | None = None,
+        elements: list[str] | None = None,
+        lazy: bool = False,
+    ) -> None:
+        super().__init__(csv_filepath, block_numbers, elements, lazy)
 
     def get_observed_values(
         self, datetime: datetime, block_no: str, target_var: str
     ) -> ObservedValuesContainer:
-        station = self.station_dict[block_no].station_name
-        lon = self.station_dict[block_no].lon
-        lat = self.station_dict[block_no].lat
-        str_datetime = datetime.strftime("%Y-%m-%d %H:%M:%S")
-        each_station_vars: pd.Series = cast(
-            pd.Series, self.df.loc[str_datetime, block_no]
-        )
+        station = self.station_dict[block_no]
         return ObservedValuesContainer(
             block_no=block_no,
-            value=each_station_vars.at[station, target_var],
-            lon=lon,
-            lat=lat,
+            value=self._get_station_value(datetime, block_no, target_var),
+            lon=station.lon,
+            lat=station.lat,
         )
 
     def pivot_by_time_and_date(
         self, block_no: str, target_var: str
     ) -> pd.DataFrame:
         station = self.station_dict[block_no].station_name
-        df = self.df[(block_no, station)].copy()
+        df = self.get_station_df(block_no, station).copy()
         assert isinstance(df.index, DatetimeIndex)
         df["date"] = df.index.date
         df["time"] = df.index.time
@@ -58,3 +77,130 @@ class TenMinuteDataAnalyzer(AmedasDataAnalyzer):
             start="00:10:00", freq="10min", periods=144
         ).strftime("%H:%M:%S")
         return df
+
+    def get_ten_minute_grid(self, start: date, end: date) -> TenMinuteGrid:
+        """Values of every element of all stations for the days [start, end) on a regular 10-minute timeline.
+
+        A day runs from 00:10 to 24:00 (00:00 of the next day), and the grid
+        also holds the last rows of the previous day (see
+        /src/analyzer/helper/resample.py). With a sqlite store, "--" cells of
+        NO_PHENOMENON_ZERO_ELEMENTS are 0 instead of NaN.
+        """
+        first = pd.Timestamp(start) + STEP * (1 - LOOKBACK_STEPS)
+        timeline = pd.date_range(first, pd.Timestamp(end), freq=STEP)
+        frame = self.get_frame_between(timeline[0], timeline[-1] + STEP)
+        rows = timeline.get_indexer(frame.index)
+        on_timeline = rows >= 0
+        values: dict[str, np.ndarray] = {}
+        for element in self.columns.get_level_values(-1).unique():
+            matrix = self._get_element_matrix(frame, element)
+            grid = np.full((len(timeline), matrix.shape[1]), np.nan)
+            grid[rows[on_timeline]] = matrix[on_timeline]
+            values[element] = grid
+        if self._sqlite_path is not None:
+            self._fill_no_phenomenon(values, timeline)
+        return TenMinuteGrid(datetimes=timeline, values=values)
+
+    def _fill_no_phenomenon(
+        self, values: dict[str, np.ndarray], timeline: pd.DatetimeIndex
+    ) -> None:
+        """Set the "--" cells of NO_PHENOMENON_ZERO_ELEMENTS to 0, as stored flags tell them from missing values."""
+        store = ObservationSqliteStore(self._sqlite_path)
+        cells = store.query_flagged(
+            self._type,
+            FLAG_NO_PHENOMENON,
+            [e for e in NO_PHENOMENON_ZERO_ELEMENTS if e in values],
+            start=timeline[0],
+            end=timeline[-1] + STEP,
+        )
+        store.close()
+        rows = timeline.get_indexer(pd.DatetimeIndex(cells.datetimes))
+        columns = (
+            pd.Series(self._station_indices, dtype=np.float64)
+            .reindex(cells.block_numbers)
+            .to_numpy()
+        )
+        on_grid = (rows >= 0) & ~np.isnan(columns)
+        for element in np.unique(cells.elements):
+            cell = on_grid & (cells.elements == element)
+            values[element][rows[cell], columns[cell].astype(np.int64)] = 0.0
+
+    def iter_resampled(
+        self,
+        type: Literal["hourly", "daily"],
+        start: date | None = None,
+        end: date | None = None,
+        chunk_days: int = RESAMPLE_CHUNK_DAYS,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield hourly or daily data derived from the 10-minute data, `chunk_days` days at a time.
+
+        The frames have the layout of the data the hourly and daily
+        analyzers load, so they can be written to a csv file in turn. Only
+        the elements whose source elements a station observes are given to
+        it. Periods with too few 10-minute values have the missing value
+        (see /src/config/analyzer/resample.py). Steps without rain or sun
+        ("--") count as 0 only when resampling a sqlite store, as csv files
+        hold the missing value for them.
+
+        Args:
+            type (Literal["hourly", "daily"]): data to derive. See HOURLY_SOURCES and DAILY_SOURCES in /src/analyzer/helper/resample.py for the elements.
+            start (date | None, optional): first day. Defaults to the first day of the data.
+            end (date | None, optional): day to derive up to, excluded. Defaults to the day after the last day of the data.
+            chunk_days (int, optional): days resampled at once, which bounds the memory used. Defaults to RESAMPLE_CHUNK_DAYS.
+        """
+        datetimes = self.get_datetimes()
+        if not datetimes:
+            return
+        # 00:00 closes the previous day
+        start = start or (datetimes[0] - STEP).date()
+        end = end or (datetimes[-1] - STEP).date() + timedelta(days=1)
+        match type:
+            case "hourly":
+                resample, sources = resample_to_hourly, HOURLY_SOURCES
+            case "daily":
+                resample, sources = resample_to_daily, DAILY_SOURCES
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+            grid = self.get_ten_minute_grid(chunk_start, chunk_end)
+            yield self._to_observation_frame(resample(grid), sources)
+            chunk_start = chunk_end
+
+    def resample(
+        self,
+        type: Literal["hourly", "daily"],
+        start: date | None = None,
+        end: date | None = None,
+    ) -> pd.DataFrame:
+        """Hourly or daily data derived from the 10-minute data at once. See `iter_resampled`."""
+        return pd.concat(list(self.iter_resampled(type, start, end)))
+
+    def _to_observation_frame(
+        self, resampled: ResampledValues, sources: dict[str, tuple[str, ...]]
+    ) -> pd.DataFrame:
+        elements = [e for e in sources if e in resampled.values]
+        observed = np.stack(
+            [
+                np.stack(
+                    [self._get_element_positions(s) >= 0 for s in sources[e]]
+                ).all(axis=0)
+                for e in elements
+            ],
+            axis=-1,
+        )
+        block_numbers, _, _ = self._station_locations
+        columns = pd.MultiIndex.from_tuples(
+            [
+                (block_no, self.station_dict[block_no].station_name, element)
+                for i, block_no in enumerate(block_numbers)
+                for j, element in enumerate(elements)
+                if observed[i, j]
+            ],
+            names=["block_no", "station", "element"],
+        )
+        values = np.stack([resampled.values[e] for e in elements], axis=-1)
+        df = pd.DataFrame(
+            values[:, observed], index=resampled.datetimes, columns=columns
+        )
+        df.index.name = "datetime"
+        return df.fillna(float(MISSING_VALUE))
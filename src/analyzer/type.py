@@ -1,3 +1,7 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel
 
 
@@ -6,3 +10,43 @@ class ObservedValuesContainer(BaseModel, frozen=True):
     value: float
     lon: float
     lat: float
+
+
+class StationValues(NamedTuple):
+    """Values of one element of every station at one time step."""
+
+    block_numbers: list[str]
+    lon: np.ndarray
+    lat: np.ndarray
+    value: np.ndarray
+
+
+class StationValuesBlock(NamedTuple):
+    """Values of one element of every station over a period, shaped (time, station)."""
+
+    datetimes: pd.DatetimeIndex
+    block_numbers: list[str]
+    lon: np.ndarray
+    lat: np.ndarray
+    values: np.ndarray
+
+
+class StationWind(NamedTuple):
+    """Wind components of every station at one time step."""
+
+    block_numbers: list[str]
+    lon: np.ndarray
+    lat: np.ndarray
+    u: np.ndarray
+    v: np.ndarray
+
+
+class StationWindBlock(NamedTuple):
+    """Wind components of every station over a period, shaped (time, station)."""
+
+    datetimes: pd.DatetimeIndex
+    block_numbers: list[str]
+    lon: np.ndarray
+    lat: np.ndarray
+    u: np.ndarray
+    v: np.ndarray
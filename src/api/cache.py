@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from calendar import monthrange
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from api.url_parser import get_query_params
+from config.scraping.cache import RECENT_PAGE_TTL, RESPONSE_CACHE_DIR
+
+JST = timezone(timedelta(hours=9))
+
+
+class ResponseCache:
+    """Gzip-compressed on-disk cache of page bodies keyed by url.
+
+    A JMA page whose day (or month, for pages without a day) had already
+    ended when it was stored never expires. Any other page is refetched after
+    `recent_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = RESPONSE_CACHE_DIR,
+        recent_ttl: float = RECENT_PAGE_TTL,
+    ) -> None:
+        self._cache_dir = Path(cache_dir)
+        self._recent_ttl = recent_ttl
+
+    def get(self, url: str) -> bytes | None:
+        path = self._get_path(url)
+        try:
+            stored_at = datetime.fromtimestamp(path.stat().st_mtime, tz=JST)
+            if self._is_expired(url, stored_at):
+                return None
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def contains(self, url: str) -> bool:
+        """Whether a page that has not expired is stored for the url."""
+        try:
+            stored_at = datetime.fromtimestamp(
+                self._get_path(url).stat().st_mtime, tz=JST
+            )
+        except OSError:
+            return False
+        return not self._is_expired(url, stored_at)
+
+    def put(self, url: str, body: bytes) -> None:
+        path = self._get_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(body))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _get_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self._cache_dir / key[:2] / f"{key}.gz"
+
+    def _is_expired(self, url: str, stored_at: datetime) -> bool:
+        period_end = self.get_period_end(url)
+        if period_end is not None and stored_at >= period_end:
+            return False
+        age = datetime.now(tz=JST) - stored_at
+        return age.total_seconds() > self._recent_ttl
+
+    @staticmethod
+    def get_period_end(url: str) -> datetime | None:
+        """End (JST) of the day or month the page reports, if it has one."""
+        query_params = get_query_params(url)
+        try:
+            year = int(query_params["year"][0])
+            month = int(query_params["month"][0])
+        except (KeyError, ValueError):
+            return None
+        if "day" in query_params:
+            day = int(query_params["day"][0])
+            return datetime(year, month, day, tzinfo=JST) + timedelta(days=1)
+        last_day = monthrange(year, month)[1]
+        return datetime(year, month, last_day, tzinfo=JST) + timedelta(days=1)
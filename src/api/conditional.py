@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+
+from api.transport import HttpTransport, get_default_transport
+
+NOT_MODIFIED = 304
+VALIDATORS_FILE = "validators.json"
+
+
+class ConditionalFetcher:
+    """Fetch pages with conditional requests, keeping the last body of each url.
+
+    A url fetched before is requested with If-None-Match / If-Modified-Since
+    from the ETag / Last-Modified of its stored response. When the server
+    answers 304 Not Modified, the stored body is returned without being
+    downloaded again. The urls whose body changed since the last `save` are
+    kept in `modified_urls`.
+
+    The bodies are stored as soon as they are downloaded, the validators only
+    on `save`, so a run that fails before saving requests its pages again.
+    """
+
+    def __init__(
+        self, store_dir: str, transport: HttpTransport | None = None
+    ) -> None:
+        self._store_dir = Path(store_dir)
+        self._transport = transport or get_default_transport()
+        self._lock = threading.Lock()
+        self._validators: dict[str, dict[str, str]] = self._load_validators()
+        self.modified_urls: set[str] = set()
+
+    def _load_validators(self) -> dict[str, dict[str, str]]:
+        try:
+            with open(
+                self._store_dir / VALIDATORS_FILE, encoding="utf-8"
+            ) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def fetch(self, url: str) -> bytes:
+        """Body of the url, from the store when the server reports it unchanged.
+
+        Raises:
+            HTTPError: The server answered with a status code of 400 or more.
+            URLError: The server could not be reached.
+        """
+        body_path = self._get_body_path(url)
+        with self._lock:
+            validators = self._validators.get(url, {})
+        headers = {}
+        if body_path.exists():
+            if "etag" in validators:
+                headers["If-None-Match"] = validators["etag"]
+            if "last_modified" in validators:
+                headers["If-Modified-Since"] = validators["last_modified"]
+        try:
+            response = self._transport.request(url, headers)
+        except HTTPError as http_err:
+            raise HTTPError(
+                http_err.url,
+                http_err.code,
+                http_err.reason,
+                http_err.headers,
+                http_err.fp,
+            )
+        except URLError as url_err:
+            raise URLError(url_err)
+
+        if response.status == NOT_MODIFIED:
+            with gzip.open(body_path, "rb") as f:
+                return f.read()
+        self._put_body(body_path, response.body)
+        new_validators = {}
+        if response.headers.get("ETag"):
+            new_validators["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            new_validators["last_modified"] = response.headers["Last-Modified"]
+        with self._lock:
+            self._validators[url] = new_validators
+            self.modified_urls.add(url)
+        return response.body
+
+    def save(self) -> None:
+        """Persist the validators of the fetched pages."""
+        self._store_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            validators = dict(self._validators)
+            self.modified_urls = set()
+        fd, tmp_path = tempfile.mkstemp(dir=self._store_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(validators, f)
+            os.replace(tmp_path, self._store_dir / VALIDATORS_FILE)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _get_body_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self._store_dir / f"{key}.gz"
+
+    def _put_body(self, path: Path, body: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(body))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -1,13 +1,18 @@
 from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
+from api.transport import HttpTransport, get_default_transport
 
-def fetch_data(url: str):
+
+def fetch_data(url: str, transport: HttpTransport | None = None) -> bytes:
+    """Fetch the body of the url through a pooled keep-alive transport.
+
+    Args:
+        url (str): url to fetch
+        transport (HttpTransport | None, optional): transport to use. Defaults to the process-wide transport.
+    """
+    transport = transport or get_default_transport()
     try:
-        response = Request(url)
-        with urlopen(response) as res:
-            res_data = res.read()
-            return res_data
+        return transport.get(url)
     except HTTPError as http_err:
         raise HTTPError(
             http_err.url,
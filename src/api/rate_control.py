@@ -0,0 +1,149 @@
+import random
+import threading
+from time import monotonic, sleep
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+
+from config.scraping.rate_control import (
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    CIRCUIT_BREAKER_COOLDOWN,
+    CIRCUIT_BREAKER_MAX_COOLDOWN,
+    CIRCUIT_BREAKER_THRESHOLD,
+    MAX_ADAPTIVE_INTERVAL,
+    MAX_ERROR_RATE,
+    MIN_ADAPTIVE_INTERVAL,
+    SLOW_DOWN_FACTOR,
+    SMOOTHING,
+    SPEED_UP_FACTOR,
+    TARGET_LATENCY,
+)
+
+# transient network failures; name resolution failures, invalid urls or
+# redirect loops do not heal by retrying
+RETRYABLE_NETWORK_ERRORS = (
+    TimeoutError,
+    ConnectionResetError,
+    ConnectionRefusedError,
+    ConnectionAbortedError,
+)
+
+
+def is_retryable_error(err: Exception) -> bool:
+    """429, 5xx, timeouts and reset, refused or aborted connections are worth retrying."""
+    if isinstance(err, HTTPError):
+        return err.code == 429 or err.code >= 500
+    reason: object = err
+    # URLErrors may be wrapped again on their way up
+    while isinstance(reason, URLError) and not isinstance(reason, HTTPError):
+        reason = reason.reason
+    if isinstance(reason, HTTPError):
+        return is_retryable_error(reason)
+    return isinstance(reason, RETRYABLE_NETWORK_ERRORS)
+
+
+def get_retry_after(err: Exception) -> float:
+    """Seconds to wait asked by a Retry-After header, at most BACKOFF_MAX."""
+    if not isinstance(err, HTTPError) or err.headers is None:
+        return 0.0
+    try:
+        retry_after = float(err.headers.get("Retry-After", 0))
+    except ValueError:
+        return 0.0
+    return min(max(retry_after, 0.0), BACKOFF_MAX)
+
+
+class _HostState:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.consecutive_errors = 0
+        self.paused_until = 0.0
+        self.cooldown = CIRCUIT_BREAKER_COOLDOWN
+
+
+class AdaptiveRateController:
+    """Adapt the interval between requests to one host to its health.
+
+    The interval shrinks by `SPEED_UP_FACTOR` after each response while the
+    moving averages of latency and error rate stay low, and grows by
+    `SLOW_DOWN_FACTOR` on an error or a slow response. After
+    `CIRCUIT_BREAKER_THRESHOLD` consecutive errors the circuit opens: every
+    request to the host waits for a cooldown, which doubles each time the
+    circuit opens again without a success in between.
+    """
+
+    def __init__(self, initial_interval: float) -> None:
+        self._initial_interval = initial_interval
+        self._lock = threading.Lock()
+        self._hosts: dict[str, _HostState] = {}
+
+    def _get_state(self, host: str) -> _HostState:
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self._initial_interval)
+        return self._hosts[host]
+
+    def get_interval(self, host: str) -> float:
+        with self._lock:
+            return self._get_state(host).interval
+
+    def wait_while_paused(self, host: str) -> None:
+        while True:
+            with self._lock:
+                remaining = self._get_state(host).paused_until - monotonic()
+            if remaining <= 0:
+                return
+            sleep(remaining)
+
+    def record_success(self, url: str, latency: float) -> None:
+        with self._lock:
+            state = self._get_state(urlparse(url).netloc)
+            state.latency += SMOOTHING * (latency - state.latency)
+            state.error_rate *= 1 - SMOOTHING
+            state.consecutive_errors = 0
+            state.cooldown = CIRCUIT_BREAKER_COOLDOWN
+            if (
+                state.latency <= TARGET_LATENCY
+                and state.error_rate <= MAX_ERROR_RATE
+            ):
+                state.interval *= SPEED_UP_FACTOR
+            elif state.latency > TARGET_LATENCY:
+                state.interval *= SLOW_DOWN_FACTOR
+            state.interval = min(
+                max(state.interval, MIN_ADAPTIVE_INTERVAL),
+                MAX_ADAPTIVE_INTERVAL,
+            )
+
+    def record_failure(self, url: str) -> bool:
+        """Record a retryable failure.
+
+        Returns:
+            bool: True if the failure opened the circuit and requests to the host are paused.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._get_state(host)
+            state.error_rate += SMOOTHING * (1 - state.error_rate)
+            state.consecutive_errors += 1
+            state.interval = min(
+                state.interval * SLOW_DOWN_FACTOR, MAX_ADAPTIVE_INTERVAL
+            )
+            if state.consecutive_errors < CIRCUIT_BREAKER_THRESHOLD:
+                return False
+            state.consecutive_errors = 0
+            state.paused_until = monotonic() + state.cooldown
+            cooldown = state.cooldown
+            state.cooldown = min(
+                state.cooldown * 2, CIRCUIT_BREAKER_MAX_COOLDOWN
+            )
+        print(
+            f"\n{host} keeps failing. Pausing requests for {cooldown:.0f} s …"
+        )
+        return True
+
+    @staticmethod
+    def get_backoff(attempt: int, retry_after: float = 0.0) -> float:
+        """Exponential backoff with jitter before retry number `attempt`."""
+        backoff = min(BACKOFF_BASE * 2 ** (attempt - 1), BACKOFF_MAX)
+        return max(backoff * random.uniform(0.5, 1.0), retry_after)
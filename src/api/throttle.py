@@ -0,0 +1,64 @@
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import monotonic, sleep
+from urllib.parse import urlparse
+
+from api.rate_control import AdaptiveRateController
+
+
+class HostThrottle:
+    """Politeness limit shared by all threads requesting the same host.
+
+    At most `max_connections_per_host` requests run at once against one host,
+    and consecutive request starts are spaced by at least `min_interval` seconds.
+    With a `rate_controller`, the spacing follows the controller's adaptive
+    interval, never shorter than `min_interval`, and no request starts while
+    its circuit is open.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int,
+        min_interval: float,
+        rate_controller: AdaptiveRateController | None = None,
+    ) -> None:
+        self._max_connections = max_connections_per_host
+        self._min_interval = min_interval
+        self._rate_controller = rate_controller
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlparse(url).netloc
+        with self._get_semaphore(host):
+            self._wait_for_turn(host)
+            yield
+
+    def _get_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    self._max_connections
+                )
+            return self._semaphores[host]
+
+    def _get_interval(self, host: str) -> float:
+        if self._rate_controller is None:
+            return self._min_interval
+        return max(
+            self._min_interval, self._rate_controller.get_interval(host)
+        )
+
+    def _wait_for_turn(self, host: str) -> None:
+        if self._rate_controller is not None:
+            self._rate_controller.wait_while_paused(host)
+        interval = self._get_interval(host)
+        with self._lock:
+            now = monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + interval
+        if start > now:
+            sleep(start - now)
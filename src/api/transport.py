@@ -0,0 +1,200 @@
+import gzip
+import sys
+import threading
+import zlib
+from http.client import (
+    HTTPConnection,
+    HTTPException,
+    HTTPMessage,
+    HTTPSConnection,
+)
+from io import BytesIO
+from typing import NamedTuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+from config.scraping.transport import (
+    CONNECT_TIMEOUT,
+    MAX_IDLE_CONNECTIONS_PER_HOST,
+    MAX_REDIRECTS,
+    READ_TIMEOUT,
+)
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
+class TransportResponse(NamedTuple):
+    url: str
+    status: int
+    reason: str
+    headers: HTTPMessage
+    body: bytes
+
+
+class HttpTransport:
+    """HTTP client reusing keep-alive connections per host.
+
+    Responses are requested with gzip/deflate transfer encoding and decoded
+    transparently. The transport is thread-safe: each request borrows one idle
+    connection from the pool and returns it when the response has been read.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_idle_per_host: int = MAX_IDLE_CONNECTIONS_PER_HOST,
+    ) -> None:
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._max_idle_per_host = max_idle_per_host
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str], list[HTTPConnection]] = {}
+        self._default_headers = {
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": f"Python-urllib/{sys.version_info.major}.{sys.version_info.minor}",
+        }
+
+    def get(self, url: str) -> bytes:
+        return self.request(url).body
+
+    def request(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        """GET the url, following redirects.
+
+        Raises:
+            HTTPError: The server answered with a status code of 400 or more.
+            URLError: The server could not be reached.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request_once(url, headers or {})
+            location = response.headers.get("Location")
+            if response.status in REDIRECT_CODES and location:
+                url = urljoin(url, location)
+                continue
+            if response.status >= 400:
+                raise HTTPError(
+                    url,
+                    response.status,
+                    response.reason,
+                    response.headers,
+                    BytesIO(response.body),
+                )
+            return response
+        raise URLError(f"Too many redirects: {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle_connections = self._idle
+            self._idle = {}
+        for connections in idle_connections.values():
+            for connection in connections:
+                connection.close()
+
+    def _request_once(
+        self, url: str, headers: dict[str, str]
+    ) -> TransportResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise URLError(f"Unsupported url scheme: {url}")
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        request_headers = {**self._default_headers, **headers}
+
+        connection, reused = self._acquire(key)
+        try:
+            try:
+                response = self._send(connection, path, request_headers)
+            except (HTTPException, ConnectionError):
+                # A pooled connection may have been closed by the server.
+                if not reused:
+                    raise
+                connection.close()
+                connection, _ = self._acquire(key, fresh=True)
+                response = self._send(connection, path, request_headers)
+        except (HTTPException, OSError) as err:
+            connection.close()
+            raise URLError(err)
+
+        status, reason, response_headers, body, will_close = response
+        if will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+        return TransportResponse(
+            url=url,
+            status=status,
+            reason=reason,
+            headers=response_headers,
+            body=self._decode(body, response_headers),
+        )
+
+    def _send(
+        self, connection: HTTPConnection, path: str, headers: dict[str, str]
+    ) -> tuple[int, str, HTTPMessage, bytes, bool]:
+        connection.request("GET", path, headers=headers)
+        if connection.sock is not None:
+            connection.sock.settimeout(self._read_timeout)
+        response = connection.getresponse()
+        body = response.read()
+        return (
+            response.status,
+            response.reason,
+            response.headers,
+            body,
+            response.will_close,
+        )
+
+    def _acquire(
+        self, key: tuple[str, str], fresh: bool = False
+    ) -> tuple[HTTPConnection, bool]:
+        if not fresh:
+            with self._lock:
+                connections = self._idle.get(key)
+                if connections:
+                    return connections.pop(), True
+        scheme, netloc = key
+        connection_class = (
+            HTTPSConnection if scheme == "https" else HTTPConnection
+        )
+        return connection_class(netloc, timeout=self._connect_timeout), False
+
+    def _release(
+        self, key: tuple[str, str], connection: HTTPConnection
+    ) -> None:
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self._max_idle_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+    @staticmethod
+    def _decode(body: bytes, headers: HTTPMessage) -> bytes:
+        match headers.get("Content-Encoding", "").lower():
+            case "gzip":
+                return gzip.decompress(body)
+            case "deflate":
+                try:
+                    return zlib.decompress(body)
+                except zlib.error:
+                    return zlib.decompress(body, -zlib.MAX_WBITS)
+            case _:
+                return body
+
+
+_default_transport: HttpTransport | None = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """Process-wide transport shared by every network caller."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
@@ -0,0 +1,6 @@
+# share of the 10-minute values of a period needed for a derived value,
+# below which JMA marks the value as insufficient (資料不足値)
+MIN_COMPLETENESS = 0.8
+
+# days of 10-minute data resampled at once when deriving hourly or daily data
+RESAMPLE_CHUNK_DAYS = 7
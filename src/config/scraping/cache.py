@@ -0,0 +1,10 @@
+from util.path import generate_path
+
+# whether to keep downloaded observation pages on disk
+use_response_cache = True
+
+# directory of the cached pages
+RESPONSE_CACHE_DIR = generate_path("/data/cache/pages")
+
+# lifetime [s] of a cached page whose period (day or month) is not over yet
+RECENT_PAGE_TTL = 600
@@ -0,0 +1,17 @@
+# number of worker threads downloading observation pages
+MAX_WORKERS = 1
+
+# number of processes parsing downloaded pages (0 parses in the download threads)
+PARSE_WORKERS = 0
+
+# number of dates whose pages are downloaded or parsed ahead of the writer
+MAX_DATES_IN_FLIGHT = 2
+
+# maximum simultaneous requests to one host
+MAX_CONNECTIONS_PER_HOST = 4
+
+# minimum interval [s] between the starts of two requests to one host
+MIN_REQUEST_INTERVAL = 0.05
+
+# expected time [s] to download one page, used to estimate job durations
+ESTIMATED_PAGE_LATENCY = 0.5
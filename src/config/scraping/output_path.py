@@ -1,3 +1,9 @@
 from util.path import generate_path
 
 STATIONS_CSV = generate_path("/data/stations/stations.csv")
+
+# responses of the station pages kept to refresh the stations with conditional requests
+STATIONS_REFRESH_DIR = generate_path("/data/stations/.refresh")
+
+# log of the stations added, removed or moved by the refreshes
+STATIONS_CHANGE_LOG = generate_path("/data/stations/changes.jsonl")
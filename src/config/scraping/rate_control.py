@@ -0,0 +1,31 @@
+from config.scraping.concurrency import MIN_REQUEST_INTERVAL
+
+# bounds [s] of the adaptive interval between request starts to one host; it
+# never goes below the politeness floor
+MIN_ADAPTIVE_INTERVAL = MIN_REQUEST_INTERVAL
+MAX_ADAPTIVE_INTERVAL = 10.0
+
+# the interval shrinks while the average latency [s] and error rate stay below these
+TARGET_LATENCY = 1.0
+MAX_ERROR_RATE = 0.05
+
+# factors applied to the interval on healthy responses and on errors or slow responses
+SPEED_UP_FACTOR = 0.9
+SLOW_DOWN_FACTOR = 2.0
+
+# weight of the latest response in the moving averages of latency and error rate
+SMOOTHING = 0.2
+
+# retries of one page on 429, 5xx, timeouts and connection errors
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# time [s] a page keeps being retried after its first failure, circuit
+# pauses included, before the job fails
+MAX_RETRY_DURATION = 3600.0
+
+# consecutive errors that pause every request to the host, and the pause [s]
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 30.0
+CIRCUIT_BREAKER_MAX_COOLDOWN = 600.0
@@ -0,0 +1,11 @@
+# timeout [s] to establish a connection
+CONNECT_TIMEOUT = 10.0
+
+# timeout [s] to wait for data from an established connection
+READ_TIMEOUT = 30.0
+
+# idle keep-alive connections kept per host
+MAX_IDLE_CONNECTIONS_PER_HOST = 8
+
+# maximum number of redirects followed for one request
+MAX_REDIRECTS = 5
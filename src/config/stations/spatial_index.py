@@ -0,0 +1,2 @@
+# cell size [degree] of the grid indexing the stations by latitude and longitude
+GRID_CELL_DEGREES = 0.25
@@ -0,0 +1,2 @@
+# number of parsed time chunks of a csv file kept in memory by lazy analyzers
+MAX_CACHED_CHUNKS = 8
@@ -0,0 +1,10 @@
+from util.path import generate_path
+
+# root directory of the parquet observation stores, one sub directory per dataset
+PARQUET_STORE_DIR = generate_path("/data/parquet")
+
+# directory of the memory-mapped observation cubes, one sub directory per cube
+CUBE_DIR = generate_path("/data/cube")
+
+# directory of the sqlite observation stores, one database file per dataset
+SQLITE_STORE_DIR = generate_path("/data/sqlite")
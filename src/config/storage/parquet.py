@@ -0,0 +1,5 @@
+# compression codec of the parquet files
+PARQUET_COMPRESSION = "zstd"
+
+# maximum rows in one row group, the unit pruned by station and time filters
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
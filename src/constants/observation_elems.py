@@ -52,3 +52,8 @@ COLUMNS_DAILY = [
     "daytime_general_weather_condition",
     "nighttime_general_weather_condition",
 ]
+
+TEXT_COLUMNS = [
+    "daytime_general_weather_condition",
+    "nighttime_general_weather_condition",
+]
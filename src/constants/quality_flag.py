@@ -0,0 +1,29 @@
+# quality flags of observed values
+FLAG_NORMAL = 0
+# value followed by ")": quasi-normal value
+FLAG_QUASI_NORMAL = 1
+# value followed by "]": value with insufficient data
+FLAG_INSUFFICIENT = 2
+# "///": missing
+FLAG_MISSING = 3
+# "×": not observed because of a failure
+FLAG_NOT_OBSERVED = 4
+# "#" or value followed by "#": questionable value
+FLAG_QUESTIONABLE = 5
+# "--": no phenomenon
+FLAG_NO_PHENOMENON = 6
+# empty cell: the element is not observed at the station
+FLAG_UNAVAILABLE = 7
+
+QUALITY_MARKS = {
+    "///": FLAG_MISSING,
+    "×": FLAG_NOT_OBSERVED,
+    "#": FLAG_QUESTIONABLE,
+    "--": FLAG_NO_PHENOMENON,
+}
+
+QUALITY_SUFFIXES = {
+    ")": FLAG_QUASI_NORMAL,
+    "]": FLAG_INSUFFICIENT,
+    "#": FLAG_QUESTIONABLE,
+}
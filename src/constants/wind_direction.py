@@ -1,3 +1,6 @@
+# wind direction of calm (静穏), whatever the wind speed
+CALM_VALUE = "-888.8"
+
 WIND_DIRECTION = {
     "北北東": "22.5",
     "東北東": "67.5",
@@ -15,5 +18,5 @@ WIND_DIRECTION = {
     "東": "90.0",
     "南": "180.0",
     "西": "270.0",
-    "静穏": "-888.8",
+    "静穏": CALM_VALUE,
 }
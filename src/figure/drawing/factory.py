@@ -5,8 +5,18 @@ import cartopy.crs as ccrs
 import matplotlib.pyplot as plt
 from cartopy.mpl.geoaxes import GeoAxes
 
+from config.figure.base_map import LAT_BOTTOM, LAT_TOP, LON_LEFT, LON_RIGHT
 from figure.basemap.helper.fig_size import calculate_figsize
 from figure.basemap.maker import make_base_map
+from stations.spatial import BoundingBox
+
+# stations drawn on the maps unless an area is given
+MAP_EXTENT = BoundingBox(
+    lon_left=LON_LEFT,
+    lon_right=LON_RIGHT,
+    lat_bottom=LAT_BOTTOM,
+    lat_top=LAT_TOP,
+)
 
 
 class FigureFactory:
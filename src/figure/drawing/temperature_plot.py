@@ -7,15 +7,18 @@ import numpy as np
 import pandas as pd
 from cartopy.mpl.geoaxes import GeoAxes
 
+from analyzer.helper.composite import get_time_of_day_frame
 from analyzer.hourly import HourlyDataAnalyzer
 from analyzer.ten_minutely import TenMinuteDataAnalyzer
 from config.figure.base_map import LAT_BOTTOM, LAT_TOP, LON_LEFT, LON_RIGHT
 from config.figure.figure import TITLE_NAME
 from config.figure.gif import GIF_INTERVAL_TIME
-from figure.drawing.factory import FigureFactory
+from figure.drawing.factory import MAP_EXTENT, FigureFactory
 from figure.drawing.helper.color import get_color_from_value
 from figure.drawing.methods import PlotMethods
 from gif.gif import make_gif_from_imgs
+from stations.registry import get_station_registry
+from stations.spatial import SpatialQuery
 from util.date_formatter import PaddedDate, PaddedDatetime
 
 
@@ -29,13 +32,27 @@ class TemperaturePlot(FigureFactory):
     _type: Literal["10min", "hourly"]
 
     def __init__(
-        self, csv_filepath: str, type: Literal["10min", "hourly"]
+        self,
+        csv_filepath: str,
+        type: Literal["10min", "hourly"],
+        area: SpatialQuery | None = None,
     ) -> None:
+        """
+        Args:
+            csv_filepath (str): observed data loaded by the analyzer
+            type (Literal["10min", "hourly"]): type of the observed data
+            area (SpatialQuery | None, optional): stations to load and plot (see /src/stations/spatial.py). Defaults to the extent of the map.
+        """
         super().__init__()
+        block_numbers = get_station_registry().select(area=area or MAP_EXTENT)
         if type == "10min":
-            self._analyzer = TenMinuteDataAnalyzer(csv_filepath)
+            self._analyzer = TenMinuteDataAnalyzer(
+                csv_filepath, block_numbers=block_numbers
+            )
         elif type == "hourly":
-            self._analyzer = HourlyDataAnalyzer(csv_filepath)
+            self._analyzer = HourlyDataAnalyzer(
+                csv_filepath, block_numbers=block_numbers
+            )
         else:
             raise ValueError(
                 "Invalid type. Please input type from '10min', 'hourly'."
@@ -45,15 +62,12 @@ class TemperaturePlot(FigureFactory):
     def _get_coords_and_values(
         self, jst_time: datetime, var_name: str
     ) -> ValuesWithCoords:
-        lons, lats, values = [], [], []
-        for block_no in self._analyzer.block_numbers:
-            observed_values = self._analyzer.get_observed_values(
-                jst_time, block_no, var_name
-            )
-            lons.append(observed_values.lon)
-            lats.append(observed_values.lat)
-            values.append(observed_values.value)
-        return ValuesWithCoords(lon=lons, lat=lats, value=values)
+        values = self._analyzer.get_values_at(jst_time, var_name)
+        return ValuesWithCoords(
+            lon=values.lon.tolist(),
+            lat=values.lat.tolist(),
+            value=values.value.tolist(),
+        )
 
     def _get_title(self, jst_time: datetime) -> str:
         padded_dt = PaddedDatetime(jst_time)
@@ -120,17 +134,12 @@ class TemperaturePlot(FigureFactory):
                 print("Successfully made gif!")
 
     def _get_average_temperature_df(self, var_name: str) -> pd.DataFrame:
-        temperature_ave_df = pd.DataFrame()
-        for block_no in self._analyzer.block_numbers:
-            temperature_df = self._analyzer.pivot_by_time_and_date(
-                block_no, var_name
-            )
-            temperature_ave = temperature_df.mean(axis=1)
-            temperature_ave = self._analyzer.sort_index_in_correct_order(
-                temperature_ave
-            )
-            temperature_ave_df[block_no] = temperature_ave
-        return temperature_ave_df
+        composite = self._analyzer.get_diurnal_composites(
+            [var_name], percentiles=()
+        )[var_name]
+        return get_time_of_day_frame(
+            composite.mean, composite.minutes, self._analyzer.block_numbers
+        )
 
     def make_composite_temperature(
         self, var_name: str, save_dir: str, make_gif: bool
@@ -3,18 +3,19 @@ from datetime import datetime, timedelta
 from typing import Literal, NamedTuple, cast
 
 import matplotlib.pyplot as plt
-import numpy as np
 import pandas as pd
 from cartopy.mpl.geoaxes import GeoAxes
 
-from analyzer.helper.wind import get_wind_components
+from analyzer.helper.composite import DiurnalGrouping, get_time_of_day_frame
 from analyzer.hourly import HourlyDataAnalyzer
 from analyzer.ten_minutely import TenMinuteDataAnalyzer
 from config.figure.figure import TITLE_NAME
 from config.figure.gif import GIF_INTERVAL_TIME
-from figure.drawing.factory import FigureFactory
+from figure.drawing.factory import MAP_EXTENT, FigureFactory
 from figure.drawing.methods import PlotMethods
 from gif.gif import make_gif_from_imgs
+from stations.registry import get_station_registry
+from stations.spatial import SpatialQuery
 from util.date_formatter import PaddedDate, PaddedDatetime
 
 
@@ -29,13 +30,27 @@ class WindPlot(FigureFactory):
     _type: Literal["10min", "hourly"]
 
     def __init__(
-        self, csv_filepath: str, type: Literal["10min", "hourly"]
+        self,
+        csv_filepath: str,
+        type: Literal["10min", "hourly"],
+        area: SpatialQuery | None = None,
     ) -> None:
+        """
+        Args:
+            csv_filepath (str): observed data loaded by the analyzer
+            type (Literal["10min", "hourly"]): type of the observed data
+            area (SpatialQuery | None, optional): stations to load and plot (see /src/stations/spatial.py). Defaults to the extent of the map.
+        """
         super().__init__()
+        block_numbers = get_station_registry().select(area=area or MAP_EXTENT)
         if type == "10min":
-            self._analyzer = TenMinuteDataAnalyzer(csv_filepath)
+            self._analyzer = TenMinuteDataAnalyzer(
+                csv_filepath, block_numbers=block_numbers
+            )
         elif type == "hourly":
-            self._analyzer = HourlyDataAnalyzer(csv_filepath)
+            self._analyzer = HourlyDataAnalyzer(
+                csv_filepath, block_numbers=block_numbers
+            )
         else:
             raise ValueError(
                 "Invalid type. Please input type from '10min', 'hourly', 'daily'."
@@ -43,21 +58,12 @@ class WindPlot(FigureFactory):
         self._type = type
 
     def get_coords_and_values(self, jst_time: datetime) -> ValuesWithCoords:
-        lons, lats, u_components, v_components = [], [], [], []
-        for block_no in self._analyzer.block_numbers:
-            wind_speed = self._analyzer.get_observed_values(
-                jst_time, block_no, "mean_ws"
-            )
-            wind_direction = self._analyzer.get_observed_values(
-                jst_time, block_no, "mean_wd"
-            )
-            u, v = get_wind_components(wind_speed.value, wind_direction.value)
-            lons.append(wind_direction.lon)
-            lats.append(wind_direction.lat)
-            u_components.append(u)
-            v_components.append(v)
+        wind = self._analyzer.get_wind_at(jst_time)
         return ValuesWithCoords(
-            lon=lons, lat=lats, u=u_components, v=v_components
+            lon=wind.lon.tolist(),
+            lat=wind.lat.tolist(),
+            u=wind.u.tolist(),
+            v=wind.v.tolist(),
         )
 
     def _get_title(self, jst_time: datetime) -> str:
@@ -72,11 +78,17 @@ class WindPlot(FigureFactory):
             case "daily":
                 return f"{base_title} {padded_dt.year}/{padded_dt.month}/{padded_dt.day}"
 
-    def make_figure(self, jst_time: datetime, save_dir: str) -> None:
+    def make_figure(
+        self,
+        jst_time: datetime,
+        save_dir: str,
+        value_with_coords: ValuesWithCoords | None = None,
+    ) -> None:
         basefig = pickle.loads(self._basefig)
         ax = cast(GeoAxes, basefig.get_axes()[0])
         target_ax = PlotMethods(ax)
-        value_with_coords = self.get_coords_and_values(jst_time)
+        if value_with_coords is None:
+            value_with_coords = self.get_coords_and_values(jst_time)
         target_ax.plot_vector(
             value_with_coords.lon,
             value_with_coords.lat,
@@ -96,14 +108,19 @@ class WindPlot(FigureFactory):
         plt.close()
 
     def make_all_figures(self, save_root_dir: str, make_gif: bool) -> None:
-        for datetime in self._analyzer.get_datetimes():
+        wind = self._analyzer.get_wind_between()
+        lons, lats = wind.lon.tolist(), wind.lat.tolist()
+        for i, datetime in enumerate(wind.datetimes):
             print(f"Now making {datetime} figure…")
+            value_with_coords = ValuesWithCoords(
+                lon=lons, lat=lats, u=wind.u[i].tolist(), v=wind.v[i].tolist()
+            )
             if not (datetime.hour == 0 and datetime.minute == 0):
                 padded_date = PaddedDate(datetime.date())
                 each_save_dir = f"{save_root_dir}/{self._type}/{padded_date.year}/{padded_date.month}/{padded_date.day}"
-                self.make_figure(datetime, each_save_dir)
+                self.make_figure(datetime, each_save_dir, value_with_coords)
             elif make_gif:
-                self.make_figure(datetime, each_save_dir)
+                self.make_figure(datetime, each_save_dir, value_with_coords)
                 make_gif_from_imgs(
                     img_dir_path=each_save_dir,
                     saved_gif_path=f"{each_save_dir}/wind.gif",
@@ -112,21 +129,19 @@ class WindPlot(FigureFactory):
                 print("Successfully made gif!")
 
     def _get_averge_wind_uv_df(self) -> tuple[pd.DataFrame, pd.DataFrame]:
-        u_ave_df, v_ave_df = pd.DataFrame(), pd.DataFrame()
-        for block_no in self._analyzer.block_numbers:
-            wind_speed = self._analyzer.pivot_by_time_and_date(
-                block_no, "mean_ws"
-            )
-            wind_direction = self._analyzer.pivot_by_time_and_date(
-                block_no, "mean_wd"
-            )
-            wind_speed.replace(-888.8, 0, inplace=True)
-            wind_u = wind_speed * (-np.sin(np.radians(wind_direction)))
-            wind_v = wind_speed * (-np.cos(np.radians(wind_direction)))
-            u_ave, v_ave = wind_u.mean(axis=1), wind_v.mean(axis=1)
-            u_ave = self._analyzer.sort_index_in_correct_order(u_ave)
-            v_ave = self._analyzer.sort_index_in_correct_order(v_ave)
-            u_ave_df[block_no], v_ave_df[block_no] = u_ave, v_ave
+        """Vector mean u and v of each station by time of day."""
+        wind = self._analyzer.get_wind_between()
+        grouping = DiurnalGrouping(wind.datetimes)
+        u_ave, v_ave = (
+            grouping.aggregate(component, percentiles=())
+            for component in (wind.u, wind.v)
+        )
+        u_ave_df = get_time_of_day_frame(
+            u_ave.mean, u_ave.minutes, wind.block_numbers
+        )
+        v_ave_df = get_time_of_day_frame(
+            v_ave.mean, v_ave.minutes, wind.block_numbers
+        )
         return u_ave_df, v_ave_df
 
     def make_composite_wind_figure(
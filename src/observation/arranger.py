@@ -1,24 +1,40 @@
+from io import StringIO
 from typing import Literal
 
 import numpy as np
 import pandas as pd
 
 from constants.missing_value import MISSING_VALUE
-from constants.observation_elems import (
-    COLUMNS_10MIN,
-    COLUMNS_DAILY,
-    COLUMNS_HOURLY,
-)
-from constants.wind_direction import WIND_DIRECTION
+from observation.table_parser import get_elements, parse_observation_table
 
 
 class ObservedDataArranger:
     def __init__(
-        self, page_url: str, type: Literal["10min", "hourly", "daily"]
+        self,
+        html: bytes,
+        type: Literal["10min", "hourly", "daily"],
+        parser: Literal["fast", "read_html"] = "fast",
     ) -> None:
+        """Parse the observation table of a JMA page.
+
+        Args:
+            html (bytes): html of the observation page
+            type (Literal["10min", "hourly", "daily"]): type of the observation page
+            parser (Literal["fast", "read_html"], optional): "fast" reads the known table layouts directly into the element columns. "read_html" uses pandas.read_html. Defaults to "fast".
+        """
         self._type = type
-        self._df = pd.read_html(page_url)[0].reset_index(drop=True)
-        self._drop_time_column()
+        match parser:
+            case "fast":
+                self._df = pd.DataFrame(
+                    parse_observation_table(html, type),
+                    columns=get_elements(type),
+                )
+                self._is_aligned = True
+            case "read_html":
+                self._df = pd.read_html(StringIO(html.decode("utf-8")))[0]
+                self._df = self._df.reset_index(drop=True)
+                self._drop_time_column()
+                self._is_aligned = False
 
     def _drop_time_column(self) -> None:
         self._df = self._df.iloc[:, 1:]
@@ -28,6 +44,8 @@ class ObservedDataArranger:
         return self._df
 
     def add_lacking_columns(self) -> None:
+        if self._is_aligned:
+            return
         match self._type:
             case "10min":
                 if "現地" not in self._df.columns.get_level_values(-1):
@@ -55,13 +73,7 @@ class ObservedDataArranger:
                 return
 
     def add_id_to_columns(self, station_name: str, block_no: str) -> None:
-        match self._type:
-            case "10min":
-                elements = COLUMNS_10MIN
-            case "hourly":
-                elements = COLUMNS_HOURLY
-            case "daily":
-                elements = COLUMNS_DAILY
+        elements = get_elements(self._type)
         multi_index = pd.MultiIndex.from_tuples(
             tuples=[(block_no, station_name, elem) for elem in elements],
             names=["block_no", "station", "element"],
@@ -87,8 +99,3 @@ class ObservedDataArranger:
             regex=True,
         )
         return df
-
-    @staticmethod
-    def replace_wind_direction(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.replace(WIND_DIRECTION)
-        return df
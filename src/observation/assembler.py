@@ -0,0 +1,137 @@
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from constants.observation_elems import TEXT_COLUMNS
+from constants.quality_flag import FLAG_UNAVAILABLE
+from observation.arranger import ObservedDataArranger
+from observation.converter import TypedValues, convert_cells, to_csv_values
+from observation.table_parser import get_elements
+
+
+class ObservationBuffer:
+    """Preallocated (time × station × element) buffer of observed values.
+
+    The time axis is the rows of the target pages one after another, and the
+    element axis is the fixed schema of the type (`COLUMNS_10MIN`,
+    `COLUMNS_HOURLY` or `COLUMNS_DAILY`). Each page is converted and written
+    into its slice as soon as it is parsed, and the labelled frame is built
+    once by `to_dataframe`, instead of concatenating a frame per station and
+    per date.
+    """
+
+    def __init__(
+        self,
+        type: Literal["10min", "hourly", "daily"],
+        stations: list[tuple[str, str]],
+        page_datetimes: list[pd.DatetimeIndex],
+    ) -> None:
+        """
+        Args:
+            type (Literal["10min", "hourly", "daily"]): type of the observation pages
+            stations (list[tuple[str, str]]): (block_no, station name) of each station axis position
+            page_datetimes (list[pd.DatetimeIndex]): datetimes of the rows of each page axis position
+        """
+        elements = np.array(get_elements(type))
+        self._stations = stations
+        self._elements = elements
+        self._is_text = np.isin(elements, TEXT_COLUMNS)
+        self._offsets = np.cumsum([0] + [len(dt) for dt in page_datetimes])
+        self._datetimes = (
+            page_datetimes[0].append(page_datetimes[1:])
+            if page_datetimes
+            else pd.DatetimeIndex([])
+        )
+        time_size = len(self._datetimes)
+        numeric_shape = (time_size, len(stations), (~self._is_text).sum())
+        self._values = np.full(numeric_shape, np.nan, dtype=np.float32)
+        self._flags = np.full(numeric_shape, FLAG_UNAVAILABLE, dtype=np.uint8)
+        self._texts = np.full(
+            (time_size, len(stations), self._is_text.sum()),
+            np.nan,
+            dtype=object,
+        )
+
+    def fill(
+        self, page_index: int, station_cells: dict[int, np.ndarray]
+    ) -> None:
+        """Convert the cells of the pages of one date and write them into the buffer.
+
+        The pages of all stations are converted together, so each distinct
+        cell text is parsed once per date.
+
+        Args:
+            page_index (int): position of the date in `page_datetimes`
+            station_cells (dict[int, np.ndarray]): raw cells of shape (rows, elements) as parsed from each page, keyed by the position of the station in `stations`
+        """
+        start, end = self._offsets[page_index], self._offsets[page_index + 1]
+        station_indices = list(station_cells)
+        cells = np.full(
+            (end - start, len(station_indices), len(self._elements)),
+            np.nan,
+            dtype=object,
+        )
+        for i, page_cells in enumerate(station_cells.values()):
+            page_cells = page_cells[: end - start]
+            cells[: len(page_cells), i] = page_cells
+        typed = convert_cells(cells[:, :, ~self._is_text])
+        self._values[start:end, station_indices] = typed.values
+        self._flags[start:end, station_indices] = typed.flags
+        self._texts[start:end, station_indices] = cells[:, :, self._is_text]
+
+    @property
+    def datetimes(self) -> pd.DatetimeIndex:
+        return self._datetimes
+
+    @property
+    def stations(self) -> list[tuple[str, str]]:
+        return self._stations
+
+    @property
+    def numeric_elements(self) -> list[str]:
+        return self._elements[~self._is_text].tolist()
+
+    @property
+    def typed(self) -> TypedValues:
+        """Values and quality flags of the numeric elements, of shape (time, station, element)."""
+        return TypedValues(values=self._values, flags=self._flags)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Build the frame written to the csv files.
+
+        The ("", "", "datetime") column comes first, followed by the
+        (block_no, station, element) columns of each station in turn.
+        """
+        time_size = len(self._datetimes)
+
+        def make_columns(elements: np.ndarray) -> pd.MultiIndex:
+            return pd.MultiIndex.from_tuples(
+                [
+                    (block_no, station, element)
+                    for block_no, station in self._stations
+                    for element in elements
+                ],
+                names=[None, None, None],
+            )
+
+        datetime_df = pd.DataFrame({("", "", "datetime"): self._datetimes})
+        # explicit shapes, as a buffer may hold no date or no station
+        numeric_df = pd.DataFrame(
+            to_csv_values(self.typed).reshape(
+                time_size, len(self._stations) * (~self._is_text).sum()
+            ),
+            columns=make_columns(self._elements[~self._is_text]),
+        )
+        if not self._is_text.any():
+            return pd.concat([datetime_df, numeric_df], axis=1)
+        text_df = ObservedDataArranger.replace_missing_data(
+            pd.DataFrame(
+                self._texts.reshape(
+                    time_size, len(self._stations) * self._is_text.sum()
+                ),
+                columns=make_columns(self._elements[self._is_text]),
+            )
+        )
+        df = pd.concat([datetime_df, numeric_df, text_df], axis=1)
+        return df[[("", "", "datetime")] + list(make_columns(self._elements))]
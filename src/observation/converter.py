@@ -0,0 +1,77 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from constants.missing_value import MISSING_VALUE
+from constants.quality_flag import (
+    FLAG_MISSING,
+    FLAG_NORMAL,
+    FLAG_UNAVAILABLE,
+    QUALITY_MARKS,
+    QUALITY_SUFFIXES,
+)
+from constants.wind_direction import WIND_DIRECTION
+
+
+class TypedValues(NamedTuple):
+    values: np.ndarray
+    flags: np.ndarray
+
+
+def parse_cell(text: str) -> tuple[float, int]:
+    """Parse one cell text into a value and a quality flag."""
+    if not text:
+        return np.nan, FLAG_UNAVAILABLE
+    if text in QUALITY_MARKS:
+        return np.nan, QUALITY_MARKS[text]
+    if text in WIND_DIRECTION:
+        return float(WIND_DIRECTION[text]), FLAG_NORMAL
+    suffix_flag = QUALITY_SUFFIXES.get(text[-1])
+    if suffix_flag is not None:
+        value, _ = parse_cell(text[:-1].strip())
+        return value, suffix_flag
+    try:
+        return float(text), FLAG_NORMAL
+    except ValueError:
+        return np.nan, FLAG_MISSING
+
+
+def convert_cells(cells: np.ndarray) -> TypedValues:
+    """Convert raw table cells into float32 values and uint8 quality flags.
+
+    Each distinct cell text is parsed once and the results are scattered back
+    to every cell with the same text, so one pass covers the numbers, the
+    quality marks, the 16 compass directions and calm (静穏 -> -888.8).
+
+    Args:
+        cells (np.ndarray): cell texts, NaN for empty cells. Numbers already converted by pandas are accepted too.
+
+    Returns:
+        TypedValues: float32 values (NaN where no value could be read) and flags of the same shape. See /src/constants/quality_flag.py for the flags.
+    """
+    texts = np.asarray(cells, dtype=object)
+    texts = np.where(pd.isna(texts), "", texts).astype(str)
+    unique_texts, inverse = np.unique(texts, return_inverse=True)
+    unique_values = np.empty(len(unique_texts), dtype=np.float32)
+    unique_flags = np.empty(len(unique_texts), dtype=np.uint8)
+    for i, text in enumerate(unique_texts):
+        unique_values[i], unique_flags[i] = parse_cell(text.strip())
+    inverse = inverse.reshape(texts.shape)
+    return TypedValues(
+        values=unique_values[inverse], flags=unique_flags[inverse]
+    )
+
+
+def to_csv_values(typed: TypedValues) -> np.ndarray:
+    """Values as written to csv files.
+
+    Values with any flag other than normal are replaced by the missing value,
+    and cells of elements the station does not observe stay NaN.
+    """
+    values = np.where(
+        typed.flags == FLAG_NORMAL, typed.values, np.float32(MISSING_VALUE)
+    )
+    return np.where(typed.flags == FLAG_UNAVAILABLE, np.nan, values).astype(
+        np.float32
+    )
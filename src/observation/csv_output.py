@@ -1,8 +1,16 @@
 from datetime import date
 from typing import Literal
 
+import pandas as pd
+
+from config.scraping.cache import use_response_cache
+from config.scraping.concurrency import MAX_WORKERS, PARSE_WORKERS
 from observation.fetcher import ObservedDataFetcher
+from observation.manifest import FetchManifest
+from observation.planner import FetchPlan, FetchPlanner
 from observation.station import StationDataManager
+from stations.spatial import SpatialQuery
+from util.path import generate_path
 
 
 class ObservedDataProcessor:
@@ -10,31 +18,143 @@ class ObservedDataProcessor:
 
     def __init__(
         self,
-        prec_numbers: list[str],
+        prec_numbers: list[str] | None,
         type: Literal["10min", "hourly", "daily"],
         dates: list[date] | None = None,
         months: list[date] | None = None,
+        max_workers: int = MAX_WORKERS,
+        use_cache: bool = use_response_cache,
+        parse_workers: int = PARSE_WORKERS,
+        area: SpatialQuery | None = None,
     ) -> None:
         self._prec_numbers = prec_numbers
         self._dates = dates
         self._months = months
         self._type = type
+        self._max_workers = max_workers
+        self._use_cache = use_cache
+        self._parse_workers = parse_workers
+        self._area = area
+
+    def get_block_numbers(self, prec_numbers: list[str] | None) -> list[str]:
+        return StationDataManager().registry.select(prec_numbers, self._area)
 
-    def get_block_numbers(self, prec_numbers: list[str]) -> list[str]:
-        stations_df = StationDataManager().df
-        block_numbers = stations_df[stations_df["prec_no"].isin(prec_numbers)][
-            "block_no"
-        ]
-        return block_numbers.to_list()
+    def get_job_dir(self, csv_file_name: str) -> str:
+        return generate_path(f"/data/{self._type}_data/.jobs/{csv_file_name}")
 
-    def save_observed_data(self, csv_file_name: str) -> None:
-        fetcher = ObservedDataFetcher(
+    def create_fetcher(
+        self, manifest: FetchManifest | None = None
+    ) -> ObservedDataFetcher:
+        return ObservedDataFetcher(
             block_numbers=self.get_block_numbers(self._prec_numbers),
             type=self._type,
             dates=self._dates,
             months=self._months,
+            max_workers=self._max_workers,
+            use_cache=self._use_cache,
+            manifest=manifest,
+            parse_workers=self._parse_workers,
+        )
+
+    def plan(self, csv_file_name: str | None = None) -> FetchPlan:
+        """Report the number of requests and the estimated time of a job without fetching.
+
+        Args:
+            csv_file_name (str | None, optional): csv filename of the job. If given, its checkpoint is taken into account.
+        """
+        manifest = (
+            FetchManifest(self.get_job_dir(csv_file_name))
+            if csv_file_name is not None
+            else None
         )
+        fetcher = self.create_fetcher(manifest)
+        plan = fetcher.make_plan(fetcher.get_target_urls())
+        FetchPlanner.print_report(plan)
+        return plan
+
+    def load_saved(
+        self,
+        fetcher: ObservedDataFetcher,
+        file_name: str,
+        storage_format: Literal["csv", "parquet", "sqlite"],
+    ) -> pd.DataFrame | None:
+        match storage_format:
+            case "csv":
+                return fetcher.load_saved_csv(file_name)
+            case "parquet":
+                return fetcher.load_saved_store(file_name)
+            case "sqlite":
+                return fetcher.load_saved_sqlite(file_name)
+
+    def save_observed_data(
+        self,
+        csv_file_name: str,
+        resumable: bool = True,
+        incremental: bool = False,
+        streaming: bool = False,
+        max_requests: int | None = None,
+        storage_format: Literal["csv", "parquet", "sqlite"] = "csv",
+    ) -> None:
+        """Fetch the observed data and save it to a csv file or a parquet store.
+
+        Args:
+            csv_file_name (str): csv filename to save the observation data.
+            resumable (bool, optional): If True, every finished (block_no, date, type) unit is checkpointed on disk, and a job restarted after a failure only fetches the remaining units. The checkpoint is removed once the csv file is saved. Defaults to True.
+            incremental (bool, optional): If True and the csv file already exists, only the (station, date) pairs missing from it are fetched and merged into it. Defaults to False.
+            streaming (bool, optional): If True, each date block is arranged and appended to the csv file as soon as it is fetched, so memory does not grow with the number of dates. Cannot be combined with incremental. Defaults to False.
+            max_requests (int | None, optional): If given, the job is not started when it needs more requests than this. Defaults to None.
+            storage_format (Literal["csv", "parquet", "sqlite"], optional): "parquet" stores the data in the parquet store named after csv_file_name (see /src/storage/parquet.py), and "sqlite" in the sqlite store named after it (see /src/storage/sqlite.py), instead of the csv file. Defaults to "csv".
+        """
+        if incremental and streaming:
+            raise ValueError("incremental and streaming cannot be combined.")
+        manifest = (
+            FetchManifest(self.get_job_dir(csv_file_name))
+            if resumable
+            else None
+        )
+        if manifest is not None and manifest.completed_count:
+            print(
+                f"Resuming job: {manifest.completed_count} units already fetched."
+            )
+        fetcher = self.create_fetcher(manifest)
         target_urls = fetcher.get_target_urls()
-        fetched_df = fetcher.fetch_observed_values(target_urls)
-        arranged_df = fetcher.arrange_fetched_df(fetched_df)
-        fetcher.save_as_csv(df=arranged_df, file_name=csv_file_name)
+        saved_df = (
+            self.load_saved(fetcher, csv_file_name, storage_format)
+            if incremental
+            else None
+        )
+        fetched_pairs = (
+            fetcher.get_fetched_pairs(saved_df)
+            if saved_df is not None
+            else None
+        )
+        plan = fetcher.make_plan(target_urls, fetched_pairs)
+        FetchPlanner.print_report(plan)
+        FetchPlanner.enforce_budget(plan, max_requests)
+
+        if streaming and storage_format == "parquet":
+            fetcher.stream_to_store(target_urls, csv_file_name)
+        elif streaming and storage_format == "sqlite":
+            fetcher.stream_to_sqlite(target_urls, csv_file_name)
+        elif streaming:
+            fetcher.stream_to_csv(target_urls, csv_file_name)
+        elif storage_format == "sqlite":
+            # stored values are replaced by key, so only new data is inserted
+            fetcher.save_to_sqlite(
+                fetcher.fill_buffer(target_urls, fetched_pairs), csv_file_name
+            )
+        else:
+            arranged_df = fetcher.assemble_observed_values(
+                target_urls, fetched_pairs
+            )
+            if storage_format == "parquet":
+                # newer parts take precedence on read, so only new data is written
+                fetcher.save_to_store(df=arranged_df, file_name=csv_file_name)
+            else:
+                if saved_df is not None:
+                    arranged_df = fetcher.merge_with_saved(
+                        arranged_df, saved_df
+                    )
+                fetcher.save_as_csv(df=arranged_df, file_name=csv_file_name)
+        if manifest is not None:
+            manifest.remove()
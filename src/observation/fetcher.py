@@ -1,17 +1,65 @@
+import multiprocessing
 import os
 from calendar import monthrange
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import nullcontext
 from datetime import date, datetime
-from time import sleep
+from time import monotonic, sleep
 from typing import Literal
+from urllib.error import HTTPError, URLError
 
+import numpy as np
 import pandas as pd
 
-from observation.arranger import ObservedDataArranger
+from api.cache import JST, ResponseCache
+from api.data_fetcher import fetch_data
+from api.rate_control import (
+    AdaptiveRateController,
+    get_retry_after,
+    is_retryable_error,
+)
+from api.throttle import HostThrottle
+from api.transport import get_default_transport
+from config.scraping.cache import use_response_cache
+from config.scraping.concurrency import (
+    MAX_CONNECTIONS_PER_HOST,
+    MAX_DATES_IN_FLIGHT,
+    MAX_WORKERS,
+    MIN_REQUEST_INTERVAL,
+    PARSE_WORKERS,
+)
+from config.scraping.rate_control import MAX_RETRIES, MAX_RETRY_DURATION
+from config.storage.output_path import PARQUET_STORE_DIR, SQLITE_STORE_DIR
+from observation.assembler import ObservationBuffer
+from observation.manifest import FetchManifest, FetchUnit
+from observation.planner import FetchPlan, FetchPlanner
 from observation.station import StationDataManager
+from observation.table_parser import parse_observation_table
+from observation.writer import CSV_FLOAT_FORMAT, CsvBlockWriter
+from storage.parquet import ObservationParquetStore
+from storage.sqlite import ObservationSqliteStore
 from util.date_formatter import PaddedDate
 from util.path import generate_path
 
 
+def parse_page(
+    html: bytes, type: Literal["10min", "hourly", "daily"]
+) -> np.ndarray:
+    """Parse an observation page into its (rows, elements) cells.
+
+    Defined at module level so that it can run in a process pool. See
+    `parse_observation_table`.
+    """
+    return parse_observation_table(html, type)
+
+
 class ObservedDataFetcher:
     _type: Literal["10min", "hourly", "daily"]
 
@@ -21,33 +69,57 @@ class ObservedDataFetcher:
         type: Literal["10min", "hourly", "daily"],
         dates: list[date] | None = None,
         months: list[date] | None = None,
+        max_workers: int = MAX_WORKERS,
+        use_cache: bool = use_response_cache,
+        manifest: FetchManifest | None = None,
+        parse_workers: int = PARSE_WORKERS,
     ) -> None:
 
         self._block_numbers = block_numbers
         self._dates = dates
         self._months = months
         self._type = type
+        self._max_workers = max_workers
+        self._parse_workers = parse_workers
+        self._rate_controller = AdaptiveRateController(
+            initial_interval=MIN_REQUEST_INTERVAL
+        )
+        self._throttle = HostThrottle(
+            max_connections_per_host=MAX_CONNECTIONS_PER_HOST,
+            min_interval=MIN_REQUEST_INTERVAL,
+            rate_controller=self._rate_controller,
+        )
+        self._transport = get_default_transport()
+        self._cache = ResponseCache() if use_cache else None
+        self._manifest = manifest
+        self._planner = FetchPlanner(type=type, max_workers=max_workers)
         self._validate_input()
 
     def _validate_input(self):
-        if (not self._block_numbers) or (not self._dates):
+        if not self._block_numbers:
             raise ValueError(
-                "Stations' block numbers and datetimes must be provided at least one."
+                "Stations' block numbers must be provided at least one."
             )
         if (self._dates is None) and (self._months is None):
             raise ValueError("Either dates or months must be provided.")
+        if not self.get_target_dates():
+            raise ValueError("Target dates must be provided at least one.")
+        if self._max_workers < 1:
+            raise ValueError("max_workers must be 1 or more.")
+        if self._parse_workers < 0:
+            raise ValueError("parse_workers must be 0 or more.")
 
     def get_target_urls(self) -> list[str]:
         urls = []
         self._station_dict = {}
         station_manager = StationDataManager()
         for blocK_no in self._block_numbers:
-            affiliation = station_manager.get_affiliation(blocK_no)
+            record = station_manager.registry.get(blocK_no)
             target_url = station_manager.generate_station_url(
-                affiliation.prec_no, affiliation.block_no, self._type
+                record.prec_no, record.block_no, self._type
             )
             urls.append(target_url)
-            self._station_dict[affiliation.block_no] = affiliation.station_name
+            self._station_dict[record.block_no] = record.en_name
         return urls
 
     def create_base_dataframe(self, target_date: date) -> pd.DataFrame:
@@ -74,53 +146,458 @@ class ObservedDataFetcher:
         )
         return df
 
-    def fetch_observed_values(self, urls: list[str]) -> pd.DataFrame:
-        each_date_df = []
-        if self._dates is not None:
-            dates = self._dates
+    def get_target_dates(self) -> list[date]:
+        """Dates of the pages to fetch, one per page (one per month for daily)."""
         if (self._months is not None) and (self._type == "daily"):
-            dates = self._months
-        for date in dates:
-            print(f"Now fetching data of {date} … ", end="")
-            base_df = self.create_base_dataframe(date)
-            padded = PaddedDate(date)
-            year, month, day = padded.year, padded.month, padded.day
-            match self._type:
-                case "10min":
-                    query_params = (
-                        f"year={year}&month={month}&day={day}&view=p1"
+            return self._planner.get_page_dates(self._months)
+        return self._planner.get_page_dates(self._dates or [])
+
+    def make_plan(
+        self,
+        urls: list[str],
+        fetched_pairs: set[tuple[str, date]] | None = None,
+    ) -> FetchPlan:
+        """Count the pages of the job and how many of them need a request.
+
+        Pages checkpointed in the manifest or fresh in the response cache are
+        not requested. See `iter_station_cells` for the arguments.
+        """
+        fetched_pairs = fetched_pairs or set()
+        page_dates = self.get_target_dates()
+        unit_count = checkpointed_count = cached_count = 0
+        for target_date in page_dates:
+            query_params = self.get_query_params(target_date)
+            for block_no, base_url in zip(self._station_dict, urls):
+                if (block_no, target_date) in fetched_pairs:
+                    continue
+                unit_count += 1
+                unit = FetchUnit(
+                    block_no=block_no, date=target_date, type=self._type
+                )
+                if self._manifest is not None and self._manifest.is_completed(
+                    unit
+                ):
+                    checkpointed_count += 1
+                elif self._cache is not None and self._cache.contains(
+                    f"{base_url}&{query_params}"
+                ):
+                    cached_count += 1
+        return self._planner.make_plan(
+            page_dates=page_dates,
+            unit_count=unit_count,
+            checkpointed_count=checkpointed_count,
+            cached_count=cached_count,
+        )
+
+    def get_query_params(self, target_date: date) -> str:
+        padded = PaddedDate(target_date)
+        year, month, day = padded.year, padded.month, padded.day
+        match self._type:
+            case "10min":
+                return f"year={year}&month={month}&day={day}&view=p1"
+            case "hourly":
+                return f"year={year}&month={month}&day={day}&view="
+            case "daily":
+                return f"year={year}&month={month}&day=&view="
+
+    def fetch_page(self, page_url: str) -> bytes:
+        if self._cache is not None:
+            cached_html = self._cache.get(page_url)
+            if cached_html is not None:
+                return cached_html
+        html = self.download_page(page_url)
+        if self._cache is not None:
+            self._cache.put(page_url, html)
+        return html
+
+    def download_page(self, page_url: str) -> bytes:
+        """Download a page, retrying 429, 5xx and connection errors with exponential backoff.
+
+        A failure that opens the circuit of the rate controller does not count
+        as a retry: the page waits for the pause like every other request to
+        the host and then gets a fresh set of retries, so an outage pauses the
+        job instead of failing it. A page still failing MAX_RETRY_DURATION
+        after its first failure fails the job, pauses included.
+        """
+        attempt = 0
+        first_failure: float | None = None
+        while True:
+            with self._throttle.slot(page_url):
+                started = monotonic()
+                try:
+                    html = fetch_data(page_url, self._transport)
+                except (HTTPError, URLError) as err:
+                    if not is_retryable_error(err):
+                        raise
+                    if first_failure is None:
+                        first_failure = started
+                    paused = self._rate_controller.record_failure(page_url)
+                    if (not paused and attempt >= MAX_RETRIES) or (
+                        monotonic() - first_failure >= MAX_RETRY_DURATION
+                    ):
+                        raise
+                    retry_after = get_retry_after(err)
+                else:
+                    self._rate_controller.record_success(
+                        page_url, monotonic() - started
                     )
-                case "hourly":
-                    query_params = f"year={year}&month={month}&day={day}&view="
-                case "daily":
-                    query_params = f"year={year}&month={month}&day=&view="
-            each_station_df = []
-            for (block_no, station), base_url in zip(
-                self._station_dict.items(), urls
-            ):
-                url = f"{base_url}&{query_params}"
-                processor = ObservedDataArranger(page_url=url, type=self._type)
-                processor.add_lacking_columns()
-                processor.add_id_to_columns(station, block_no)
-                each_station_df.append(processor.df)
-                sleep(0.05)
-            df = pd.concat([base_df] + each_station_df, axis=1)
-            each_date_df.append(df)
-            print("done!")
-        return pd.concat(each_date_df, axis=0).reset_index(drop=True)
-
-    def arrange_fetched_df(self, df: pd.DataFrame) -> pd.DataFrame:
-        df = ObservedDataArranger.replace_missing_data(df)
-        df = ObservedDataArranger.replace_wind_direction(df)
+                    return html
+            if paused:
+                attempt = 0
+                continue
+            attempt += 1
+            sleep(AdaptiveRateController.get_backoff(attempt, retry_after))
+
+    def fetch_station_cells(
+        self,
+        base_url: str,
+        target_date: date,
+        block_no: str,
+        parse_pool: Executor | None = None,
+    ) -> np.ndarray | Future[np.ndarray]:
+        """Fetch and parse the page of one station and date into its (rows, elements) cells.
+
+        With a `parse_pool`, the downloaded page is handed to it for parsing
+        and the future of its cells is returned at once, so the download
+        thread goes on to the next page. See `collect_station_cells`.
+        """
+        unit = FetchUnit(block_no=block_no, date=target_date, type=self._type)
+        if self._manifest is not None and self._manifest.is_completed(unit):
+            return self._manifest.load_result(unit)
+        page_url = f"{base_url}&{self.get_query_params(target_date)}"
+        html = self.fetch_page(page_url)
+        if parse_pool is not None:
+            return parse_pool.submit(parse_page, html, self._type)
+        cells = parse_page(html, self._type)
+        if self._manifest is not None:
+            self._manifest.record(unit, cells)
+        return cells
+
+    def collect_station_cells(
+        self,
+        future: Future[np.ndarray | Future[np.ndarray]],
+        target_date: date,
+        block_no: str,
+    ) -> np.ndarray:
+        """Wait for the cells of a page from `fetch_station_cells`, checkpointing those parsed in the parse pool."""
+        result = future.result()
+        if not isinstance(result, Future):
+            return result
+        cells = result.result()
+        if self._manifest is not None:
+            self._manifest.record(
+                FetchUnit(
+                    block_no=block_no, date=target_date, type=self._type
+                ),
+                cells,
+            )
+        return cells
+
+    def create_parse_pool(self) -> ProcessPoolExecutor | None:
+        if self._parse_workers == 0:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self._parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def iter_station_cells(
+        self,
+        urls: list[str],
+        fetched_pairs: set[tuple[str, date]] | None = None,
+    ) -> Iterator[tuple[date, dict[int, np.ndarray]]]:
+        """Yield each target date in order with the parsed cells of its stations.
+
+        The work runs as a pipeline: `max_workers` threads download pages,
+        `parse_workers` processes parse them (or the download threads when it
+        is 0), and the caller consumes the dates in order. A download thread
+        does not wait for the pages it hands to the parse processes. Only
+        `MAX_DATES_IN_FLIGHT` dates are submitted at a time, so when the
+        consumer falls behind the downloads stop, and memory stays bounded by
+        a few dates whatever the number of dates.
+
+        Args:
+            urls (list[str]): station urls returned by `get_target_urls`
+            fetched_pairs (set[tuple[str, date]] | None, optional): (block_no, date) pairs to skip because they are already stored.
+
+        Yields:
+            tuple[date, dict[int, np.ndarray]]: target date and the (rows, elements) cells of each fetched station keyed by its position in `urls`. Dates whose pairs are all skipped are not yielded.
+        """
+        fetched_pairs = fetched_pairs or set()
+        dates = iter(self.get_target_dates())
+        parse_pool = self.create_parse_pool()
+        with (
+            parse_pool or nullcontext(),
+            ThreadPoolExecutor(max_workers=self._max_workers) as executor,
+        ):
+            in_flight: deque[tuple[date, dict[int, Future]]] = deque()
+            block_numbers = list(self._station_dict)
+
+            def submit_next_date() -> None:
+                target_date = next(dates, None)
+                if target_date is None:
+                    return
+                in_flight.append(
+                    (
+                        target_date,
+                        {
+                            i: executor.submit(
+                                self.fetch_station_cells,
+                                base_url,
+                                target_date,
+                                block_no,
+                                parse_pool,
+                            )
+                            for i, (block_no, base_url) in enumerate(
+                                zip(self._station_dict, urls)
+                            )
+                            if (block_no, target_date) not in fetched_pairs
+                        },
+                    )
+                )
+
+            for _ in range(MAX_DATES_IN_FLIGHT - 1):
+                submit_next_date()
+            while in_flight:
+                submit_next_date()
+                target_date, date_futures = in_flight.popleft()
+                if not date_futures:
+                    print(f"Data of {target_date} is already stored.")
+                    continue
+                print(f"Now fetching data of {target_date} … ", end="")
+                station_cells = {
+                    i: self.collect_station_cells(
+                        future, target_date, block_numbers[i]
+                    )
+                    for i, future in date_futures.items()
+                }
+                print("done!")
+                yield target_date, station_cells
+
+    def create_buffer(
+        self,
+        target_dates: list[date],
+        station_indices: list[int],
+    ) -> ObservationBuffer:
+        station_items = list(self._station_dict.items())
+        return ObservationBuffer(
+            type=self._type,
+            stations=[station_items[i] for i in station_indices],
+            page_datetimes=[
+                pd.DatetimeIndex(self.create_base_dataframe(d).iloc[:, 0])
+                for d in target_dates
+            ],
+        )
+
+    def assemble_observed_values(
+        self,
+        urls: list[str],
+        fetched_pairs: set[tuple[str, date]] | None = None,
+    ) -> pd.DataFrame:
+        """Fetch the pages of all stations and dates into one arranged DataFrame.
+
+        The frame is built once from the buffer filled by `fill_buffer`. See
+        `iter_station_cells` for the arguments.
+        """
+        return self.fill_buffer(urls, fetched_pairs).to_dataframe()
+
+    def fill_buffer(
+        self,
+        urls: list[str],
+        fetched_pairs: set[tuple[str, date]] | None = None,
+    ) -> ObservationBuffer:
+        """Fetch the pages of all stations and dates into a preallocated (time × station × element) buffer.
+
+        Each page is written into the buffer as it arrives. See
+        `iter_station_cells` for the arguments.
+        """
+        fetched_pairs = fetched_pairs or set()
+        pending = [
+            [
+                i
+                for i, block_no in enumerate(self._station_dict)
+                if (block_no, target_date) not in fetched_pairs
+            ]
+            for target_date in self.get_target_dates()
+        ]
+        target_dates = [
+            target_date
+            for target_date, indices in zip(self.get_target_dates(), pending)
+            if indices
+        ]
+        station_indices = sorted({i for indices in pending for i in indices})
+        buffer = self.create_buffer(target_dates, station_indices)
+        station_positions = {i: pos for pos, i in enumerate(station_indices)}
+        for page_index, (_, station_cells) in enumerate(
+            self.iter_station_cells(urls, fetched_pairs)
+        ):
+            buffer.fill(
+                page_index,
+                {
+                    station_positions[i]: cells
+                    for i, cells in station_cells.items()
+                },
+            )
+        return buffer
+
+    def iter_date_buffers(
+        self, urls: list[str]
+    ) -> Iterator[ObservationBuffer]:
+        """Yield a buffer holding the data of each target date in order, one date at a time."""
+        for target_date, station_cells in self.iter_station_cells(urls):
+            buffer = self.create_buffer([target_date], list(station_cells))
+            buffer.fill(0, dict(enumerate(station_cells.values())))
+            yield buffer
+
+    def iter_arranged_blocks(self, urls: list[str]) -> Iterator[pd.DataFrame]:
+        """Yield the arranged data of each target date in order, one date at a time."""
+        for buffer in self.iter_date_buffers(urls):
+            yield buffer.to_dataframe()
+
+    def stream_to_csv(self, urls: list[str], file_name: str) -> None:
+        """Fetch, arrange and append each date block to the csv file in turn.
+
+        Peak memory is one date block instead of the whole period.
+        """
+        writer = CsvBlockWriter(self.get_csv_path(file_name))
+        for df in self.iter_arranged_blocks(urls):
+            writer.write(df)
+        writer.close()
+
+    def stream_to_store(self, urls: list[str], file_name: str) -> None:
+        """Fetch, arrange and store each date block in the parquet store in turn."""
+        store = self.get_store(file_name)
+        for df in self.iter_arranged_blocks(urls):
+            store.write(df, self._type)
+
+    def get_csv_path(self, file_name: str) -> str:
+        saving_dir = generate_path(f"/data/{self._type}_data")
+        return os.path.join(saving_dir, file_name)
+
+    def get_store(self, file_name: str) -> ObservationParquetStore:
+        """Parquet store of the dataset named after the file name without its extension."""
+        dataset_name = os.path.splitext(file_name)[0]
+        return ObservationParquetStore(
+            os.path.join(PARQUET_STORE_DIR, dataset_name)
+        )
+
+    def load_saved_store(self, file_name: str) -> pd.DataFrame | None:
+        """Load the stations of the job from the parquet store, indexed by datetime."""
+        df = self.get_store(file_name).read(
+            self._type, block_numbers=self._block_numbers
+        )
+        return None if df.empty else df
+
+    def save_to_store(self, df: pd.DataFrame, file_name: str) -> None:
+        self.get_store(file_name).write(df, self._type)
+
+    def get_sqlite_store(self, file_name: str) -> ObservationSqliteStore:
+        """Sqlite store of the dataset named after the file name without its extension."""
+        dataset_name = os.path.splitext(file_name)[0]
+        return ObservationSqliteStore(
+            os.path.join(SQLITE_STORE_DIR, f"{dataset_name}.sqlite3")
+        )
+
+    def load_saved_sqlite(self, file_name: str) -> pd.DataFrame | None:
+        """Load the stations of the job from the sqlite store, indexed by datetime."""
+        store = self.get_sqlite_store(file_name)
+        df = store.read(self._type, block_numbers=self._block_numbers)
+        store.close()
+        return None if df.empty else df
+
+    def save_to_sqlite(
+        self, buffer: ObservationBuffer, file_name: str
+    ) -> None:
+        """Insert the values of a buffer with their quality flags into the sqlite store."""
+        store = self.get_sqlite_store(file_name)
+        store.insert(buffer, self._type)
+        store.close()
+
+    def stream_to_sqlite(self, urls: list[str], file_name: str) -> None:
+        """Fetch and insert each date block into the sqlite store in turn."""
+        store = self.get_sqlite_store(file_name)
+        for buffer in self.iter_date_buffers(urls):
+            store.insert(buffer, self._type)
+        store.close()
+
+    def load_saved_csv(self, file_name: str) -> pd.DataFrame | None:
+        """Load a csv saved by `save_as_csv`, indexed by datetime."""
+        csv_path = self.get_csv_path(file_name)
+        if not os.path.exists(csv_path):
+            return None
+        df = pd.read_csv(csv_path, header=[0, 1, 2], index_col=0)
+        df.columns.names = ["block_no", "station", "element"]
+        df.index = pd.to_datetime(df.index)
+        df.index.name = "datetime"
         return df
 
+    def get_fetched_pairs(
+        self, saved_df: pd.DataFrame
+    ) -> set[tuple[str, date]]:
+        """(block_no, date) pairs of the target dates already in `saved_df`.
+
+        A pair counts as stored when the day (or month) of its page had ended,
+        as for `ResponseCache`, and the last row of the page holds a value of
+        the station. A page saved before its period ended lacks its last rows
+        and is fetched again.
+        """
+        BLOCK_NO_COLUMN_LEVEL = 0
+        has_value = (
+            saved_df.notna()
+            .T.groupby(level=BLOCK_NO_COLUMN_LEVEL, sort=False)
+            .any()
+            .T
+        )
+        has_value = has_value[~has_value.index.duplicated(keep="last")]
+        now = datetime.now(tz=JST)
+        fetched_pairs = set()
+        for target_date in self.get_target_dates():
+            period_end = ResponseCache.get_period_end(
+                f"?{self.get_query_params(target_date)}"
+            )
+            if period_end is None or period_end > now:
+                continue
+            last_datetime = pd.Timestamp(
+                self.create_base_dataframe(target_date).iloc[-1, 0]
+            )
+            if last_datetime not in has_value.index:
+                continue
+            stored = has_value.loc[last_datetime]
+            for block_no in stored[stored].index:
+                fetched_pairs.add((block_no, target_date))
+        return fetched_pairs
+
+    def merge_with_saved(
+        self, df: pd.DataFrame, saved_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Merge newly fetched data into saved data.
+
+        Cells are deduplicated by (block_no, datetime); fetched values take
+        precedence over saved ones. The saved column order is kept and new
+        stations are appended.
+        """
+        fetched = df.set_index(("", "", "datetime"))
+        fetched.index = pd.to_datetime(fetched.index)
+        fetched = fetched[~fetched.index.duplicated(keep="last")]
+        fetched.columns.names = saved_df.columns.names
+        merged = fetched.combine_first(saved_df)
+        new_columns = [
+            column for column in fetched.columns if column not in saved_df
+        ]
+        merged = merged[list(saved_df.columns) + new_columns].sort_index()
+        merged = merged.rename_axis("datetime").reset_index(
+            col_level=2, col_fill=""
+        )
+        merged.columns.names = [None, None, None]
+        return merged
+
     def save_as_csv(self, df: pd.DataFrame, file_name: str) -> None:
-        saving_dir = generate_path(f"/data/{self._type}_data")
-        os.makedirs(saving_dir, exist_ok=True)
-        csv_path = os.path.join(saving_dir, file_name)
+        csv_path = self.get_csv_path(file_name)
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
         df.to_csv(
             csv_path,
             header=True,
             index=False,
             na_rep="nan",
+            float_format=CSV_FLOAT_FORMAT,
         )
@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+
+class FetchUnit(NamedTuple):
+    block_no: str
+    date: date
+    type: str
+
+
+class FetchManifest:
+    """On-disk checkpoint of the fetch units finished by a job.
+
+    The parsed cells of each finished unit are stored as a `.npy` file under
+    `parts/`, then the unit is appended to `manifest.jsonl`. A unit is only
+    treated as finished once its manifest line has been written, so a job
+    killed in between refetches it.
+    """
+
+    def __init__(self, job_dir: str) -> None:
+        self._job_dir = Path(job_dir)
+        self._parts_dir = self._job_dir / "parts"
+        self._manifest_path = self._job_dir / "manifest.jsonl"
+        self._lock = threading.Lock()
+        self._completed = self._load_completed_units()
+
+    @property
+    def completed_count(self) -> int:
+        return len(self._completed)
+
+    def _load_completed_units(self) -> set[FetchUnit]:
+        completed = set()
+        if not self._manifest_path.exists():
+            return completed
+        with open(self._manifest_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be cut off by an interrupted write.
+                    continue
+                unit = FetchUnit(
+                    block_no=record["block_no"],
+                    date=date.fromisoformat(record["date"]),
+                    type=record["type"],
+                )
+                if self._get_part_path(unit).exists():
+                    completed.add(unit)
+        return completed
+
+    def is_completed(self, unit: FetchUnit) -> bool:
+        return unit in self._completed
+
+    def load_result(self, unit: FetchUnit) -> np.ndarray:
+        return np.load(self._get_part_path(unit), allow_pickle=True)
+
+    def record(self, unit: FetchUnit, cells: np.ndarray) -> None:
+        self._parts_dir.mkdir(parents=True, exist_ok=True)
+        part_path = self._get_part_path(unit)
+        fd, tmp_path = tempfile.mkstemp(dir=self._parts_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, cells, allow_pickle=True)
+        os.replace(tmp_path, part_path)
+        line = json.dumps(
+            {
+                "block_no": unit.block_no,
+                "date": unit.date.isoformat(),
+                "type": unit.type,
+            }
+        )
+        with self._lock:
+            with open(self._manifest_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._completed.add(unit)
+
+    def remove(self) -> None:
+        shutil.rmtree(self._job_dir, ignore_errors=True)
+
+    def _get_part_path(self, unit: FetchUnit) -> Path:
+        return (
+            self._parts_dir
+            / f"{unit.type}_{unit.block_no}_{unit.date.isoformat()}.npy"
+        )
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from typing import Literal, NamedTuple
+
+from config.scraping.concurrency import (
+    ESTIMATED_PAGE_LATENCY,
+    MAX_CONNECTIONS_PER_HOST,
+    MIN_REQUEST_INTERVAL,
+)
+
+
+class FetchPlan(NamedTuple):
+    page_dates: list[date]
+    unit_count: int
+    checkpointed_count: int
+    cached_count: int
+    request_count: int
+    estimated_seconds: float
+
+
+def expand_date_range(start: date, end: date) -> list[date]:
+    """All dates from start to end, both included."""
+    if end < start:
+        raise ValueError("The end of the date range is before its start.")
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+class FetchPlanner:
+    _type: Literal["10min", "hourly", "daily"]
+
+    def __init__(
+        self, type: Literal["10min", "hourly", "daily"], max_workers: int
+    ) -> None:
+        self._type = type
+        self._max_workers = max_workers
+
+    def get_page_dates(self, dates: list[date]) -> list[date]:
+        """Collapse dates to one date per page, keeping the first-seen order.
+
+        A 10min or hourly page covers one day, a daily page one month, which is
+        represented by its first day.
+        """
+        page_dates = []
+        seen = set()
+        for target_date in dates:
+            if self._type == "daily":
+                target_date = target_date.replace(day=1)
+            if target_date not in seen:
+                seen.add(target_date)
+                page_dates.append(target_date)
+        return page_dates
+
+    def estimate_seconds(self, request_count: int) -> float:
+        concurrency = min(self._max_workers, MAX_CONNECTIONS_PER_HOST)
+        seconds_per_request = max(
+            ESTIMATED_PAGE_LATENCY / concurrency, MIN_REQUEST_INTERVAL
+        )
+        return request_count * seconds_per_request
+
+    def make_plan(
+        self,
+        page_dates: list[date],
+        unit_count: int,
+        checkpointed_count: int,
+        cached_count: int,
+    ) -> FetchPlan:
+        request_count = unit_count - checkpointed_count - cached_count
+        return FetchPlan(
+            page_dates=page_dates,
+            unit_count=unit_count,
+            checkpointed_count=checkpointed_count,
+            cached_count=cached_count,
+            request_count=request_count,
+            estimated_seconds=self.estimate_seconds(request_count),
+        )
+
+    @staticmethod
+    def enforce_budget(plan: FetchPlan, max_requests: int | None) -> None:
+        if max_requests is not None and plan.request_count > max_requests:
+            raise ValueError(
+                f"The job needs {plan.request_count} requests, which exceeds the budget of {max_requests} requests."
+            )
+
+    @staticmethod
+    def print_report(plan: FetchPlan) -> None:
+        minutes, seconds = divmod(round(plan.estimated_seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        print(
+            f"Fetch plan: {len(plan.page_dates)} page dates, {plan.unit_count} pages "
+            f"({plan.checkpointed_count} checkpointed, {plan.cached_count} cached), "
+            f"{plan.request_count} requests, "
+            f"estimated time {hours:d}:{minutes:02d}:{seconds:02d}"
+        )
@@ -3,8 +3,7 @@ from typing import Literal
 import pandas as pd
 from pydantic import BaseModel
 
-from config.scraping.output_path import STATIONS_CSV
-from util.path import generate_path
+from stations.registry import StationRegistry, get_station_registry
 
 
 class StationInfoContainer(BaseModel, frozen=True):
@@ -15,18 +14,21 @@ class StationInfoContainer(BaseModel, frozen=True):
 
 class StationDataManager:
     def __init__(self) -> None:
-        stations_csv_path = STATIONS_CSV
-        self._df = pd.read_csv(stations_csv_path, dtype=str)
+        self._registry = get_station_registry()
 
     @property
     def df(self) -> pd.DataFrame:
-        return self._df
+        return self._registry.df
+
+    @property
+    def registry(self) -> StationRegistry:
+        return self._registry
 
     def get_affiliation(self, block_no: str) -> StationInfoContainer:
-        affiliation = self._df[self._df["block_no"] == block_no]
+        record = self._registry.get(block_no)
         return StationInfoContainer(
-            prec_no=affiliation["prec_no"].item(),
-            station_name=affiliation["enName"].item(),
+            prec_no=record.prec_no,
+            station_name=record.en_name,
             block_no=block_no,
         )
 
@@ -0,0 +1,103 @@
+import re
+from html import unescape
+from typing import Literal
+
+import numpy as np
+
+from constants.observation_elems import (
+    COLUMNS_10MIN,
+    COLUMNS_DAILY,
+    COLUMNS_HOURLY,
+)
+
+TABLE_PATTERN = re.compile(
+    r"<table[^>]*id=[\"']tablefix1[\"'][^>]*>(.*?)</table>", re.S | re.I
+)
+ROW_PATTERN = re.compile(r"<tr[^>]*>(.*?)</tr>", re.S | re.I)
+CELL_PATTERN = re.compile(r"<td[^>]*>(.*?)</td>", re.S | re.I)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Position in the element columns of each source column, keyed by the
+# number of data columns (the time column excluded) of each page layout.
+# None marks a source column that is not kept (the hourly weather symbol).
+LAYOUTS: dict[str, dict[int, list[int | None]]] = {
+    "10min": {
+        # *_s1.php: with pressure
+        10: list(range(10)),
+        # *_a1.php: without pressure
+        8: list(range(2, 10)),
+    },
+    "hourly": {
+        10: [2, 3, 4, 5, 6, 7, 8, 9, 11, 12],
+        16: list(range(13)) + [None, 13, 14],
+    },
+    "daily": {
+        17: list(range(2, 19)),
+        20: list(range(15)) + [16, 17, 18, 19, 20],
+    },
+}
+
+
+def get_elements(type: Literal["10min", "hourly", "daily"]) -> list[str]:
+    match type:
+        case "10min":
+            return COLUMNS_10MIN
+        case "hourly":
+            return COLUMNS_HOURLY
+        case "daily":
+            return COLUMNS_DAILY
+
+
+def parse_observation_table(
+    html: bytes, type: Literal["10min", "hourly", "daily"]
+) -> np.ndarray:
+    """Read the cells of a JMA etrn observation table into an array.
+
+    The table layouts of the `10min/hourly/daily` `a1`/`s1` pages are fixed, so
+    the rows are read with regular expressions instead of building a DOM.
+    The time column is dropped and the cells are placed at the positions of
+    the element columns of the type; elements the page lacks are NaN.
+
+    Args:
+        html (bytes): html of the observation page
+        type (Literal["10min", "hourly", "daily"]): type of the observation page
+
+    Returns:
+        np.ndarray: object array of shape (rows, elements) holding stripped cell strings, or NaN for empty cells.
+    """
+    table = TABLE_PATTERN.search(html.decode("utf-8"))
+    if table is None:
+        raise ValueError("No observation table found.")
+    rows = []
+    for row in ROW_PATTERN.findall(table.group(1)):
+        cells = CELL_PATTERN.findall(row)
+        if cells:
+            rows.append(cells[1:])
+    if not rows:
+        raise ValueError("The observation table has no data rows.")
+
+    num_columns = len(rows[0])
+    layout = LAYOUTS[type].get(num_columns)
+    if layout is None or any(len(row) != num_columns for row in rows):
+        raise ValueError(
+            f"Unexpected {type} table layout with {num_columns} columns."
+        )
+    values = np.full(
+        (len(rows), len(get_elements(type))), np.nan, dtype=object
+    )
+    kept_columns = [
+        (source_index, target_index)
+        for source_index, target_index in enumerate(layout)
+        if target_index is not None
+    ]
+    for row_index, row in enumerate(rows):
+        for source_index, target_index in kept_columns:
+            text = row[source_index]
+            if "<" in text:
+                text = TAG_PATTERN.sub("", text)
+            if "&" in text:
+                text = unescape(text)
+            text = text.strip()
+            if text:
+                values[row_index, target_index] = text
+    return values
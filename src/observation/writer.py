@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+
+# float32 values are written with the digits they were read with
+CSV_FLOAT_FORMAT = "%.7g"
+
+
+class CsvBlockWriter:
+    """Append date blocks to a csv file as soon as they are arranged.
+
+    The header is written with the first block and later blocks are aligned to
+    its columns. Blocks go to a `.part` file that replaces the csv file on
+    `close`, so an interrupted job never leaves a truncated csv behind.
+    """
+
+    def __init__(self, csv_path: str) -> None:
+        self._csv_path = csv_path
+        self._part_path = f"{csv_path}.part"
+        self._columns: pd.Index | None = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._columns is None:
+            os.makedirs(os.path.dirname(self._csv_path), exist_ok=True)
+            self._columns = df.columns
+            df.to_csv(
+                self._part_path,
+                header=True,
+                index=False,
+                na_rep="nan",
+                float_format=CSV_FLOAT_FORMAT,
+            )
+            return
+        df.reindex(columns=self._columns).to_csv(
+            self._part_path,
+            mode="a",
+            header=False,
+            index=False,
+            na_rep="nan",
+            float_format=CSV_FLOAT_FORMAT,
+        )
+
+    def close(self) -> None:
+        if self._columns is None:
+            raise ValueError("No data was written.")
+        os.replace(self._part_path, self._csv_path)
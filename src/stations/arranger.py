@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 import numpy as np
@@ -77,9 +79,16 @@ class StationsArranger:
             return merged_df
         return merged_df.dropna()
 
-    def save_stations_info_to_csv(
-        self, df: pd.DataFrame, output_path: str
-    ) -> None:
+    @staticmethod
+    def save_stations_info_to_csv(df: pd.DataFrame, output_path: str) -> None:
+        """Replace the csv file at once, so that readers never see it half written."""
         saving_dir = Path(output_path).parent
         saving_dir.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_path, index=False, encoding="UTF-8")
+        fd, tmp_path = tempfile.mkstemp(dir=saving_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="UTF-8", newline="") as f:
+                df.to_csv(f, index=False)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -1,30 +1,48 @@
+from collections.abc import Callable
+
+import pandas as pd
+
+from api.data_fetcher import fetch_data
 from stations.arranger import StationsArranger
 from stations.fetcher import StationsFetcher
 from stations.parser import StationsParser
 
 
 class StationsDataProcessor:
-    def __init__(self) -> None:
-        self._affiliations_html = (
-            StationsFetcher.fetch_station_affiliation_html()
-        )
-        self._detailed_json = StationsFetcher.fetch_stations_json()
+    def __init__(
+        self,
+        affiliations_html: bytes | None = None,
+        detailed_json: dict | None = None,
+    ) -> None:
+        """
+        Args:
+            affiliations_html (bytes | None, optional): page listing the areas. Defaults to downloading it.
+            detailed_json (dict | None, optional): details of the stations (amedastable.json). Defaults to downloading it.
+        """
+        if affiliations_html is None:
+            affiliations_html = (
+                StationsFetcher.fetch_station_affiliation_html()
+            )
+        if detailed_json is None:
+            detailed_json = StationsFetcher.fetch_stations_json()
+        self._affiliations_html = affiliations_html
+        self._detailed_json = detailed_json
 
-    def save_stations_info(
+    def get_stations_info(
         self,
-        output_path: str,
         include_inactive_stations: bool = False,
-    ) -> None:
-        """Fetch, process, merge, and save AMeDAS stations information to a csv file.
+        fetch: Callable[[str], bytes] = fetch_data,
+    ) -> pd.DataFrame:
+        """Fetch the prefecture pages, then process and merge AMeDAS stations information.
 
         Args:
-            output_path (str): Path to save the information as a csv file.
-            include_inactive_stations (bool) : If True, include currently inactive stations in the output.
+            include_inactive_stations (bool) : If True, include currently inactive stations.
+            fetch (Callable[[str], bytes], optional): function downloading the prefecture pages. Defaults to fetch_data.
         """
         # Parse the affiliation html.
         parser = StationsParser(self._affiliations_html)
         affiliation_info = parser.get_area_affiliations()
-        affiliated_df = parser.get_stations_info(affiliation_info)
+        affiliated_df = parser.get_stations_info(affiliation_info, fetch=fetch)
 
         # Arrange the detailed information.
         arranger = StationsArranger(affiliated_df, self._detailed_json)
@@ -33,9 +51,24 @@ class StationsDataProcessor:
         arranger.add_observed_elements_columns()
 
         # Merge with the affiliation information.
-        merged_df = arranger.merge_stations_info(
+        return arranger.merge_stations_info(
+            include_inactive_stations=include_inactive_stations
+        )
+
+    def save_stations_info(
+        self,
+        output_path: str,
+        include_inactive_stations: bool = False,
+    ) -> None:
+        """Fetch, process, merge, and save AMeDAS stations information to a csv file.
+
+        Args:
+            output_path (str): Path to save the information as a csv file.
+            include_inactive_stations (bool) : If True, include currently inactive stations in the output.
+        """
+        merged_df = self.get_stations_info(
             include_inactive_stations=include_inactive_stations
         )
-        arranger.save_stations_info_to_csv(
+        StationsArranger.save_stations_info_to_csv(
             df=merged_df, output_path=output_path
         )
@@ -1,11 +1,22 @@
+import html as html_lib
 import re
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from typing import NamedTuple
 
 import pandas as pd
-from bs4 import BeautifulSoup
 
 from api.data_fetcher import fetch_data
+from api.throttle import HostThrottle
 from api.url_parser import get_query_params
+from config.scraping.concurrency import (
+    MAX_CONNECTIONS_PER_HOST,
+    MIN_REQUEST_INTERVAL,
+)
+
+AREA_TAG_PATTERN = re.compile(r"<area\b[^>]*>", re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r"([\w-]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')")
+VIEW_POINT_PATTERN = re.compile(r"viewPoint\((.*?)\)")
 
 
 class AreaInfoContainer(NamedTuple):
@@ -13,16 +24,60 @@ class AreaInfoContainer(NamedTuple):
     prec_no: list[str]
 
 
+def iter_area_attrs(html: bytes) -> Iterator[dict[str, str]]:
+    """Yield the attributes of every `<area>` tag of a page, unescaped.
+
+    The area maps only need the attributes of these tags, so the page is
+    scanned with regular expressions instead of being parsed into a DOM.
+    """
+    text = html.decode("utf-8", errors="replace")
+    for tag in AREA_TAG_PATTERN.finditer(text):
+        attributes = ATTRIBUTE_PATTERN.findall(tag.group(0))
+        yield {
+            name.lower(): html_lib.unescape(double_quoted or single_quoted)
+            for name, double_quoted, single_quoted in attributes
+        }
+
+
+def parse_area_html(html: bytes, area_name: str, prec_no: str) -> list[dict]:
+    """Parse the stations of a prefecture page."""
+    st_info = []
+    for attrs in iter_area_attrs(html):
+        if "onmouseover" in attrs:
+            match = VIEW_POINT_PATTERN.search(attrs["onmouseover"])
+            if match:
+                items = [item.strip("'") for item in match.group(1).split(",")]
+                st_info.append(
+                    {
+                        "area": area_name,
+                        "station": attrs["alt"],
+                        "knName": items[3],
+                        "prec_no": prec_no,
+                        "block_no": items[1],
+                        "lat_degree": int(items[4]),
+                        "lat_minute": float(items[5]),
+                        "lon_degree": int(items[6]),
+                        "lon_minute": float(items[7]),
+                    }
+                )
+            else:
+                raise ValueError(
+                    "No match found. Target information is missing."
+                )
+    return st_info
+
+
 class StationsParser:
+    BASE_URL = "https://www.data.jma.go.jp/obd/stats/etrn/select/"
+
     def __init__(self, area_html: bytes) -> None:
-        self._area_html = BeautifulSoup(area_html, features="html.parser")
+        self._area_html = area_html
 
     def get_area_affiliations(self) -> AreaInfoContainer:
-        elements = self._area_html.find_all("area")
         area_names, prec_no_list = [], []
-        for element in elements:
-            area_name = element["alt"]
-            prec_no = get_query_params(element["href"])["prec_no"][0]
+        for attrs in iter_area_attrs(self._area_html):
+            area_name = attrs["alt"]
+            prec_no = get_query_params(attrs["href"])["prec_no"][0]
             area_names.append(area_name)
             prec_no_list.append(prec_no)
         return AreaInfoContainer(area_names, prec_no_list)
@@ -30,47 +85,52 @@ class StationsParser:
     def parse_area_html(
         self, html: bytes, area_name: str, prec_no: str
     ) -> list[dict]:
-        soup = BeautifulSoup(html, features="html.parser")
-        elements = soup.find_all("area")
-        st_info = []
-        for element in elements:
-            if "onmouseover" in element.attrs:
-                target_attr = element["onmouseover"]
-                match = re.search(r"viewPoint\((.*?)\)", target_attr)
-                if match:
-                    items = [
-                        item.strip("'") for item in match.group(1).split(",")
-                    ]
-                    st_info.append(
-                        {
-                            "area": area_name,
-                            "station": element["alt"],
-                            "knName": items[3],
-                            "prec_no": prec_no,
-                            "block_no": items[1],
-                            "lat_degree": int(items[4]),
-                            "lat_minute": float(items[5]),
-                            "lon_degree": int(items[6]),
-                            "lon_minute": float(items[7]),
-                        }
-                    )
-                else:
-                    raise ValueError(
-                        "No match found. Target information is missing."
-                    )
-        return st_info
-
-    def get_stations_info(self, area_info: AreaInfoContainer) -> pd.DataFrame:
-        BASE_URL = "https://www.data.jma.go.jp/obd/stats/etrn/select/"
-        stations_info = []
-        area_names = area_info.area_name
-        prec_no_list = area_info.prec_no
-        for area_name, prec_no in zip(area_names, prec_no_list):
-            url = (
-                BASE_URL
-                + f"prefecture.php?prec_no={prec_no}&block_no=&year=&month=&day=&view="
-            )
-            html = fetch_data(url)
-            parsed_results = self.parse_area_html(html, area_name, prec_no)
-            stations_info.extend(parsed_results)
+        return parse_area_html(html, area_name, prec_no)
+
+    @staticmethod
+    def get_area_url(prec_no: str) -> str:
+        return (
+            StationsParser.BASE_URL
+            + f"prefecture.php?prec_no={prec_no}&block_no=&year=&month=&day=&view="
+        )
+
+    def get_stations_info(
+        self,
+        area_info: AreaInfoContainer,
+        max_workers: int = MAX_CONNECTIONS_PER_HOST,
+        fetch: Callable[[str], bytes] = fetch_data,
+    ) -> pd.DataFrame:
+        """Fetch and parse the prefecture pages of all areas.
+
+        The pages are downloaded by `max_workers` threads, within the
+        per-host limits of /src/config/scraping/concurrency.py. Each thread
+        parses its pages itself, as scanning the `<area>` tags of about 60
+        small pages costs less than starting parsing processes.
+
+        Args:
+            area_info (AreaInfoContainer): areas returned by `get_area_affiliations`
+            max_workers (int, optional): number of download threads. Defaults to MAX_CONNECTIONS_PER_HOST.
+            fetch (Callable[[str], bytes], optional): function downloading a page. Defaults to fetch_data.
+        """
+        throttle = HostThrottle(
+            max_connections_per_host=MAX_CONNECTIONS_PER_HOST,
+            min_interval=MIN_REQUEST_INTERVAL,
+        )
+
+        def fetch_area_stations(area_name: str, prec_no: str) -> list[dict]:
+            url = self.get_area_url(prec_no)
+            with throttle.slot(url):
+                html = fetch(url)
+            return parse_area_html(html, area_name, prec_no)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            stations_info = [
+                station
+                for results in executor.map(
+                    fetch_area_stations,
+                    area_info.area_name,
+                    area_info.prec_no,
+                )
+                for station in results
+            ]
         return pd.DataFrame(stations_info).drop_duplicates()
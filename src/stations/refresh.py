@@ -0,0 +1,215 @@
+import json
+import os
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from typing import Literal, NamedTuple
+
+import pandas as pd
+
+from api.conditional import ConditionalFetcher
+from config.scraping.output_path import (
+    STATIONS_CHANGE_LOG,
+    STATIONS_CSV,
+    STATIONS_REFRESH_DIR,
+)
+from stations.arranger import StationsArranger
+from stations.csv_output import StationsDataProcessor
+from stations.fetcher import StationsFetcher
+
+# a station is listed once per area it belongs to
+STATION_KEY_COLUMNS = ["prec_no", "block_no"]
+LOCATION_COLUMNS = ["lat", "lon"]
+
+
+class StationChange(NamedTuple):
+    change: Literal["added", "removed", "moved", "updated"]
+    prec_no: str
+    block_no: str
+    station: str
+    lat: str
+    lon: str
+    previous_lat: str = ""
+    previous_lon: str = ""
+
+
+def _to_csv_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """The values of a frame as they are read back from the stations csv file."""
+    return pd.read_csv(
+        StringIO(df.to_csv(index=False)), dtype=str, keep_default_na=False
+    )
+
+
+def _get_differing_rows(
+    saved: pd.DataFrame, fetched: pd.DataFrame
+) -> pd.Series:
+    """Whether each row differs, comparing numeric columns by value.
+
+    The numbers of the same station can be written differently ("1" or
+    "1.0") depending on the other stations of the file.
+    """
+    differs = pd.Series(False, index=saved.index)
+    for column in saved.columns:
+        saved_values = pd.to_numeric(saved[column], errors="coerce")
+        fetched_values = pd.to_numeric(fetched[column], errors="coerce")
+        is_numeric = (saved_values.notna() | (saved[column] == "")) & (
+            fetched_values.notna() | (fetched[column] == "")
+        )
+        numeric_differs = ~(
+            (saved_values == fetched_values)
+            | (saved_values.isna() & fetched_values.isna())
+        )
+        text_differs = saved[column] != fetched[column]
+        differs |= numeric_differs.where(is_numeric, text_differs)
+    return differs
+
+
+def diff_stations(
+    saved_df: pd.DataFrame, fetched_df: pd.DataFrame
+) -> tuple[pd.DataFrame, list[StationChange]]:
+    """Apply the stations added, removed, moved or otherwise updated in `fetched_df` to `saved_df`.
+
+    Both frames hold the values read from the csv file (strings). The
+    stations of `saved_df` keep their order and the added ones are appended.
+
+    Returns:
+        tuple[pd.DataFrame, list[StationChange]]: updated stations and the changes applied.
+    """
+    if list(saved_df.columns) != list(fetched_df.columns):
+        # the layout of the file changed, so every station is rewritten
+        saved_df = saved_df.iloc[:0].reindex(columns=fetched_df.columns)
+    saved = saved_df.drop_duplicates(STATION_KEY_COLUMNS).set_index(
+        STATION_KEY_COLUMNS, drop=False
+    )
+    fetched = fetched_df.drop_duplicates(STATION_KEY_COLUMNS).set_index(
+        STATION_KEY_COLUMNS, drop=False
+    )
+
+    changes: list[StationChange] = []
+    removed = saved.index.difference(fetched.index, sort=False)
+    added = fetched.index.difference(saved.index, sort=False)
+    common = saved.index.intersection(fetched.index, sort=False)
+    for key in removed:
+        row = saved.loc[key]
+        changes.append(
+            StationChange(
+                "removed", *key, row["station"], row["lat"], row["lon"]
+            )
+        )
+    differs = _get_differing_rows(saved.loc[common], fetched.loc[common])
+    for key in common[differs.to_numpy()]:
+        before, after = saved.loc[key], fetched.loc[key]
+        moved = _get_differing_rows(
+            before[LOCATION_COLUMNS].to_frame().T,
+            after[LOCATION_COLUMNS].to_frame().T,
+        ).item()
+        changes.append(
+            StationChange(
+                "moved" if moved else "updated",
+                *key,
+                after["station"],
+                after["lat"],
+                after["lon"],
+                before["lat"],
+                before["lon"],
+            )
+        )
+    for key in added:
+        row = fetched.loc[key]
+        changes.append(
+            StationChange(
+                "added", *key, row["station"], row["lat"], row["lon"]
+            )
+        )
+
+    updated = saved.drop(index=removed)
+    updated.loc[common] = fetched.loc[common]
+    updated = pd.concat([updated, fetched.loc[added]])
+    return updated.reset_index(drop=True), changes
+
+
+class StationsRefresher:
+    """Bring the stations csv file up to date with the JMA pages at little cost.
+
+    The area page, amedastable.json and the prefecture pages are requested
+    with conditional requests (see /src/api/conditional.py). When none of
+    them changed, nothing else is done. Otherwise the stations are rebuilt
+    from the new and the stored pages, only the stations added, removed,
+    moved or otherwise updated are applied to the csv file, and each change
+    is appended to a change log. The station registry reloads the file the
+    next time it is requested.
+    """
+
+    def __init__(
+        self,
+        output_path: str = STATIONS_CSV,
+        include_inactive_stations: bool = False,
+        refresh_dir: str = STATIONS_REFRESH_DIR,
+        change_log_path: str = STATIONS_CHANGE_LOG,
+    ) -> None:
+        self._output_path = output_path
+        self._include_inactive_stations = include_inactive_stations
+        self._fetcher = ConditionalFetcher(refresh_dir)
+        self._change_log_path = Path(change_log_path)
+
+    def refresh(self) -> list[StationChange]:
+        """Refresh the stations csv file.
+
+        Returns:
+            list[StationChange]: changes applied to the file, empty when it was up to date or just created.
+        """
+        affiliations_html = self._fetcher.fetch(
+            StationsFetcher.JMA_STATIONS_PAGE_URL
+        )
+        detailed_json = json.loads(
+            self._fetcher.fetch(StationsFetcher.STATIONS_DETAILS_URL)
+        )
+        processor = StationsDataProcessor(affiliations_html, detailed_json)
+        fetched_df = _to_csv_strings(
+            processor.get_stations_info(
+                include_inactive_stations=self._include_inactive_stations,
+                fetch=self._fetcher.fetch,
+            )
+        )
+        exists = os.path.exists(self._output_path)
+        if exists and not self._fetcher.modified_urls:
+            print("stations are up to date.")
+            self._fetcher.save()
+            return []
+
+        if not exists:
+            StationsArranger.save_stations_info_to_csv(
+                df=fetched_df, output_path=self._output_path
+            )
+            print(f"saved {len(fetched_df)} stations: {self._output_path}")
+            self._fetcher.save()
+            return []
+
+        saved_df = pd.read_csv(
+            self._output_path, dtype=str, keep_default_na=False
+        )
+        updated_df, changes = diff_stations(saved_df, fetched_df)
+        if changes:
+            StationsArranger.save_stations_info_to_csv(
+                df=updated_df, output_path=self._output_path
+            )
+            self._log_changes(changes)
+        counts = pd.Series([c.change for c in changes]).value_counts()
+        print(
+            "stations refreshed: "
+            + (
+                ", ".join(f"{n} {change}" for change, n in counts.items())
+                or "no change"
+            )
+        )
+        # validators are kept only once the file matches the pages
+        self._fetcher.save()
+        return changes
+
+    def _log_changes(self, changes: list[StationChange]) -> None:
+        refreshed_at = datetime.now().isoformat(timespec="seconds")
+        self._change_log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._change_log_path, "a", encoding="utf-8") as f:
+            for change in changes:
+                record = {"refreshed_at": refreshed_at, **change._asdict()}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,150 @@
+import os
+import threading
+from functools import cached_property
+from typing import NamedTuple
+
+import pandas as pd
+
+from config.scraping.output_path import STATIONS_CSV
+from stations.spatial import Nearest, SpatialQuery, StationSpatialIndex
+
+
+class StationRecord(NamedTuple):
+    block_no: str
+    prec_no: str
+    station: str
+    en_name: str
+    lon: float
+    lat: float
+
+
+class StationRegistry:
+    """Stations of the stations csv file, indexed by block_no and prec_no.
+
+    Use `get_station_registry` to share one registry per process.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self._df = df
+        self._records: dict[str, StationRecord] = {}
+        self._prec_index: dict[str, list[str]] = {}
+        self._positions: dict[str, int] = {}
+        for block_no, prec_no, station, en_name, lon, lat in zip(
+            df["block_no"],
+            df["prec_no"],
+            df["station"],
+            df["enName"],
+            df["lon"].astype(float),
+            df["lat"].astype(float),
+        ):
+            prec_block_numbers = self._prec_index.setdefault(prec_no, [])
+            if block_no not in prec_block_numbers:
+                prec_block_numbers.append(block_no)
+            # a station listed in several areas keeps its first row
+            if block_no in self._records:
+                continue
+            self._positions[block_no] = len(self._positions)
+            self._records[block_no] = StationRecord(
+                block_no=block_no,
+                prec_no=prec_no,
+                station=station,
+                en_name=en_name,
+                lon=lon,
+                lat=lat,
+            )
+
+    @classmethod
+    def load(cls, stations_csv_path: str = STATIONS_CSV) -> "StationRegistry":
+        return cls(pd.read_csv(stations_csv_path, dtype=str))
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    @property
+    def block_numbers(self) -> list[str]:
+        return list(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, block_no: str) -> bool:
+        return block_no in self._records
+
+    def get(self, block_no: str) -> StationRecord:
+        try:
+            return self._records[block_no]
+        except KeyError:
+            raise ValueError(f"block_number {block_no} is not found.")
+
+    @cached_property
+    def spatial_index(self) -> StationSpatialIndex:
+        records = self._records.values()
+        return StationSpatialIndex(
+            block_numbers=[record.block_no for record in records],
+            lons=[record.lon for record in records],
+            lats=[record.lat for record in records],
+        )
+
+    def select(
+        self,
+        prec_numbers: list[str] | None = None,
+        area: SpatialQuery | None = None,
+    ) -> list[str]:
+        """Block numbers of the stations of some prefectures, within an area.
+
+        Args:
+            prec_numbers (list[str] | None, optional): prefectures of the stations. Defaults to all.
+            area (SpatialQuery | None, optional): bounding box, circle or k nearest stations (see /src/stations/spatial.py). Defaults to anywhere.
+        """
+        if prec_numbers is None:
+            block_numbers = self.block_numbers
+        else:
+            block_numbers = self.get_block_numbers(prec_numbers)
+        if area is None:
+            return block_numbers
+        if isinstance(area, Nearest) and prec_numbers is not None:
+            # the k nearest stations among those of the prefectures
+            index = StationSpatialIndex(
+                block_numbers=block_numbers,
+                lons=[self._records[b].lon for b in block_numbers],
+                lats=[self._records[b].lat for b in block_numbers],
+            )
+            return index.query(area)
+        in_area = self.spatial_index.query(area)
+        if isinstance(area, Nearest):
+            return in_area
+        in_area_set = set(in_area)
+        return [b for b in block_numbers if b in in_area_set]
+
+    def get_block_numbers(self, prec_numbers: list[str]) -> list[str]:
+        """Block numbers of the stations of some prefectures, in csv order."""
+        block_numbers = {
+            block_no
+            for prec_no in set(prec_numbers)
+            for block_no in self._prec_index.get(prec_no, [])
+        }
+        return sorted(block_numbers, key=self._positions.__getitem__)
+
+
+_registries: dict[str, tuple[tuple[int, int], StationRegistry]] = {}
+_registries_lock = threading.Lock()
+
+
+def get_station_registry(
+    stations_csv_path: str = STATIONS_CSV,
+) -> StationRegistry:
+    """The registry of a stations csv file, loaded once per process.
+
+    The file is read again only when its size or modification time changed,
+    e.g. after the station list was refreshed.
+    """
+    stat = os.stat(stations_csv_path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _registries_lock:
+        cached = _registries.get(stations_csv_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        registry = StationRegistry.load(stations_csv_path)
+        _registries[stations_csv_path] = (signature, registry)
+        return registry
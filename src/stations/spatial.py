@@ -0,0 +1,238 @@
+import math
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
+
+from config.stations.spatial_index import GRID_CELL_DEGREES
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class BoundingBox(NamedTuple):
+    lon_left: float
+    lon_right: float
+    lat_bottom: float
+    lat_top: float
+
+
+class Circle(NamedTuple):
+    lon: float
+    lat: float
+    radius_km: float
+
+
+class Nearest(NamedTuple):
+    lon: float
+    lat: float
+    k: int
+
+
+SpatialQuery = BoundingBox | Circle | Nearest
+
+
+def get_distances_km(
+    lon: float, lat: float, lons: np.ndarray, lats: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances from a point to arrays of points."""
+    lon_rad, lat_rad = np.radians(lon), np.radians(lat)
+    lons_rad, lats_rad = np.radians(lons), np.radians(lats)
+    haversine = (
+        np.sin((lats_rad - lat_rad) / 2) ** 2
+        + np.cos(lat_rad)
+        * np.cos(lats_rad)
+        * np.sin((lons_rad - lon_rad) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+
+
+class StationSpatialIndex:
+    """Uniform latitude/longitude grid over the stations.
+
+    Each query only looks at the stations of the grid cells it overlaps,
+    then keeps the ones matching exactly. Stations without coordinates are
+    not indexed.
+    """
+
+    def __init__(
+        self,
+        block_numbers: list[str],
+        lons: list[float],
+        lats: list[float],
+        cell_degrees: float = GRID_CELL_DEGREES,
+    ) -> None:
+        lons_array = np.asarray(lons, dtype=np.float64)
+        lats_array = np.asarray(lats, dtype=np.float64)
+        located = ~(np.isnan(lons_array) | np.isnan(lats_array))
+        self._block_numbers = np.asarray(block_numbers, dtype=object)[located]
+        self._lons = lons_array[located]
+        self._lats = lats_array[located]
+        self._cell_degrees = cell_degrees
+
+        cell_x = np.floor(self._lons / cell_degrees).astype(np.int64)
+        cell_y = np.floor(self._lats / cell_degrees).astype(np.int64)
+        self._cells: dict[tuple[int, int], np.ndarray] = {}
+        if len(self._block_numbers):
+            order = np.lexsort((cell_y, cell_x))
+            keys = np.stack([cell_x[order], cell_y[order]], axis=1)
+            starts = np.flatnonzero(
+                np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)]
+            )
+            for start, end in zip(starts, np.r_[starts[1:], len(order)]):
+                x, y = keys[start]
+                self._cells[(int(x), int(y))] = np.sort(order[start:end])
+            self._x_range = (int(cell_x.min()), int(cell_x.max()))
+            self._y_range = (int(cell_y.min()), int(cell_y.max()))
+            # the lowest cos(lat) of the stations bounds the length of a
+            # degree of longitude from below when pruning the cells
+            self._min_cos_lat = float(np.cos(np.radians(self._lats)).min())
+
+    def __len__(self) -> int:
+        return len(self._block_numbers)
+
+    def _get_cell(self, lon: float, lat: float) -> tuple[int, int]:
+        return (
+            math.floor(lon / self._cell_degrees),
+            math.floor(lat / self._cell_degrees),
+        )
+
+    def _collect(self, cells: Iterator[tuple[int, int]]) -> np.ndarray:
+        indices = [self._cells[cell] for cell in cells if cell in self._cells]
+        if not indices:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(indices))
+
+    def _iter_cells(
+        self,
+        lon_left: float,
+        lon_right: float,
+        lat_bottom: float,
+        lat_top: float,
+    ) -> Iterator[tuple[int, int]]:
+        x_left, y_bottom = self._get_cell(lon_left, lat_bottom)
+        x_right, y_top = self._get_cell(lon_right, lat_top)
+        x_left, x_right = (
+            max(x_left, self._x_range[0]),
+            min(x_right, self._x_range[1]),
+        )
+        y_bottom, y_top = (
+            max(y_bottom, self._y_range[0]),
+            min(y_top, self._y_range[1]),
+        )
+        for x in range(x_left, x_right + 1):
+            for y in range(y_bottom, y_top + 1):
+                yield (x, y)
+
+    def within_bbox(self, bbox: BoundingBox) -> list[str]:
+        """Stations inside a bounding box, edges included."""
+        if not self._cells:
+            return []
+        candidates = self._collect(self._iter_cells(*bbox))
+        lons, lats = self._lons[candidates], self._lats[candidates]
+        inside = (
+            (bbox.lon_left <= lons)
+            & (lons <= bbox.lon_right)
+            & (bbox.lat_bottom <= lats)
+            & (lats <= bbox.lat_top)
+        )
+        return self._block_numbers[candidates[inside]].tolist()
+
+    def within_radius(self, circle: Circle) -> list[str]:
+        """Stations within a great-circle distance of a point."""
+        if not self._cells:
+            return []
+        lat_span = np.degrees(circle.radius_km / EARTH_RADIUS_KM)
+        cos_lat = min(self._min_cos_lat, math.cos(math.radians(circle.lat)))
+        lon_span = lat_span / max(cos_lat, 1e-6)
+        candidates = self._collect(
+            self._iter_cells(
+                circle.lon - lon_span,
+                circle.lon + lon_span,
+                circle.lat - lat_span,
+                circle.lat + lat_span,
+            )
+        )
+        distances = get_distances_km(
+            circle.lon,
+            circle.lat,
+            self._lons[candidates],
+            self._lats[candidates],
+        )
+        return self._block_numbers[
+            candidates[distances <= circle.radius_km]
+        ].tolist()
+
+    def nearest(self, nearest: Nearest) -> list[str]:
+        """The k stations closest to a point, closest first.
+
+        The cells are visited in rings around the cell of the point until
+        no unvisited cell can hold a station closer than the k-th one found.
+        """
+        if not self._cells or nearest.k < 1:
+            return []
+        k = min(nearest.k, len(self))
+        center_x, center_y = self._get_cell(nearest.lon, nearest.lat)
+        max_ring = max(
+            abs(center_x - self._x_range[0]),
+            abs(center_x - self._x_range[1]),
+            abs(center_y - self._y_range[0]),
+            abs(center_y - self._y_range[1]),
+        )
+        cos_lat = min(self._min_cos_lat, math.cos(math.radians(nearest.lat)))
+        candidates: list[np.ndarray] = []
+        for ring in range(max_ring + 1):
+            candidates += [
+                self._cells[cell]
+                for cell in self._iter_ring(center_x, center_y, ring)
+                if cell in self._cells
+            ]
+            found = sum(len(indices) for indices in candidates)
+            if found < k:
+                continue
+            indices = np.concatenate(candidates)
+            distances = get_distances_km(
+                nearest.lon,
+                nearest.lat,
+                self._lons[indices],
+                self._lats[indices],
+            )
+            kth_distance = np.partition(distances, k - 1)[k - 1]
+            # unvisited cells are at least `ring` cells away in a direction
+            gap = np.radians(ring * self._cell_degrees)
+            unvisited_distance = (
+                2
+                * EARTH_RADIUS_KM
+                * math.asin(min(1.0, cos_lat * math.sin(gap / 2)))
+            )
+            if kth_distance <= unvisited_distance:
+                break
+        indices = np.concatenate(candidates)
+        distances = get_distances_km(
+            nearest.lon, nearest.lat, self._lons[indices], self._lats[indices]
+        )
+        order = np.argsort(distances, kind="stable")[:k]
+        return self._block_numbers[indices[order]].tolist()
+
+    @staticmethod
+    def _iter_ring(
+        center_x: int, center_y: int, ring: int
+    ) -> Iterator[tuple[int, int]]:
+        if ring == 0:
+            yield (center_x, center_y)
+            return
+        for x in range(center_x - ring, center_x + ring + 1):
+            yield (x, center_y - ring)
+            yield (x, center_y + ring)
+        for y in range(center_y - ring + 1, center_y + ring):
+            yield (center_x - ring, y)
+            yield (center_x + ring, y)
+
+    def query(self, query: SpatialQuery) -> list[str]:
+        match query:
+            case BoundingBox():
+                return self.within_bbox(query)
+            case Circle():
+                return self.within_radius(query)
+            case Nearest():
+                return self.nearest(query)
+        raise ValueError(f"Invalid spatial query: {query}")
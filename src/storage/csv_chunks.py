@@ -0,0 +1,149 @@
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Callable
+from io import BytesIO
+from typing import Literal
+
+import pandas as pd
+
+from config.storage.chunks import MAX_CACHED_CHUNKS
+
+HEADER_ROWS = 3
+INDEX_SUFFIX = ".chunks.json"
+
+
+class ChunkedCsvReader:
+    """Read an observation csv file one time chunk at a time.
+
+    On open, the byte range of every day (or month) of rows is indexed
+    without parsing the values. The index is kept next to the csv file and
+    reused while the file is unchanged. Chunks are parsed when a query
+    touches them, and the `max_chunks` most recently used ones are kept.
+
+    The csv file must be sorted by datetime, as written by the fetcher.
+    """
+
+    def __init__(
+        self,
+        csv_filepath: str,
+        chunk: Literal["day", "month"] = "day",
+        max_chunks: int = MAX_CACHED_CHUNKS,
+        converter: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+    ) -> None:
+        """
+        Args:
+            csv_filepath (str): csv file written by the fetcher
+            chunk (Literal["day", "month"], optional): rows of a chunk. Defaults to "day".
+            max_chunks (int, optional): number of parsed chunks kept in memory. Defaults to MAX_CACHED_CHUNKS.
+            converter (Callable[[pd.DataFrame], pd.DataFrame] | None, optional): applied to each chunk once after parsing. Defaults to None.
+        """
+        self._csv_filepath = csv_filepath
+        self._key_length = 10 if chunk == "day" else 7
+        self._max_chunks = max_chunks
+        self._converter = converter
+        self._chunks: OrderedDict[str, pd.DataFrame] = OrderedDict()
+        self._load_index()
+        self.columns = self._parse(b"").columns
+
+    def _load_index(self) -> None:
+        stat = os.stat(self._csv_filepath)
+        index_path = self._csv_filepath + INDEX_SUFFIX
+        signature = [stat.st_size, stat.st_mtime_ns, self._key_length]
+        try:
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index["signature"] == signature:
+                self._set_index(index)
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        index = self._scan(signature)
+        try:
+            with open(index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+        except OSError:
+            pass
+        self._set_index(index)
+
+    def _scan(self, signature: list[int]) -> dict:
+        header = b""
+        datetimes: list[str] = []
+        ranges: dict[str, list[int]] = {}
+        with open(self._csv_filepath, "rb") as f:
+            for _ in range(HEADER_ROWS):
+                header += f.readline()
+            offset = len(header)
+            for line in f:
+                first_field = line.split(b",", 1)[0].decode("utf-8")
+                datetimes.append(first_field)
+                key = first_field[: self._key_length]
+                if key in ranges:
+                    ranges[key][1] = offset + len(line)
+                else:
+                    ranges[key] = [offset, offset + len(line)]
+                offset += len(line)
+        return {
+            "signature": signature,
+            "header_size": len(header),
+            "datetimes": datetimes,
+            "ranges": ranges,
+        }
+
+    def _set_index(self, index: dict) -> None:
+        with open(self._csv_filepath, "rb") as f:
+            self._header = f.read(index["header_size"])
+        self.datetimes = pd.DatetimeIndex(pd.to_datetime(index["datetimes"]))
+        self._ranges: dict[str, list[int]] = index["ranges"]
+
+    def _parse(self, rows: bytes) -> pd.DataFrame:
+        df = pd.read_csv(
+            BytesIO(self._header + rows), header=[0, 1, 2], index_col=0
+        )
+        df.columns.names = ["block_no", "station", "element"]
+        df.index = pd.to_datetime(df.index)
+        return df
+
+    def get_chunk_key(self, dt: pd.Timestamp) -> str:
+        return pd.Timestamp(dt).strftime("%Y-%m-%d")[: self._key_length]
+
+    def read_chunk(self, key: str) -> pd.DataFrame:
+        """Rows of one day ("YYYY-MM-DD") or month ("YYYY-MM")."""
+        if key in self._chunks:
+            self._chunks.move_to_end(key)
+            return self._chunks[key]
+        start, end = self._ranges.get(key, (0, 0))
+        with open(self._csv_filepath, "rb") as f:
+            f.seek(start)
+            df = self._parse(f.read(end - start))
+        if self._converter is not None:
+            df = self._converter(df)
+        self._chunks[key] = df
+        if len(self._chunks) > self._max_chunks:
+            self._chunks.popitem(last=False)
+        return df
+
+    def read_at(self, dt: pd.Timestamp) -> pd.DataFrame:
+        """The chunk holding the row of a datetime."""
+        return self.read_chunk(self.get_chunk_key(dt))
+
+    def read_columns(
+        self, columns: list[tuple[str, str, str]]
+    ) -> pd.DataFrame:
+        """Some columns over the whole period, without keeping them in the chunk cache."""
+        positions = [self.columns.get_loc(c) + 1 for c in columns]
+        df = pd.read_csv(
+            self._csv_filepath,
+            header=None,
+            skiprows=HEADER_ROWS,
+            index_col=0,
+            usecols=[0] + positions,
+        )
+        df.columns = pd.MultiIndex.from_tuples(
+            [self.columns[position - 1] for position in positions],
+            names=["block_no", "station", "element"],
+        )
+        df.index = pd.to_datetime(df.index)
+        if self._converter is not None:
+            df = self._converter(df)
+        return df
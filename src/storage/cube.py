@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from constants.missing_value import MISSING_VALUE
+from constants.observation_elems import TEXT_COLUMNS
+from observation.table_parser import get_elements
+
+VALUES_FILE = "values.npy"
+LABELS_FILE = "labels.json"
+
+
+class ObservationCube:
+    """Dense float32 (time, station, element) cube of observed values.
+
+    A cube is a directory holding `values.npy`, the values in C order so that
+    every time step is contiguous, and `labels.json`, the type, datetimes,
+    stations and elements of the axes. The missing value is stored as NaN,
+    so the values can be used as they are, and the weather texts of daily
+    data are not stored.
+
+    The values are memory-mapped read-only: opening a cube does not parse or
+    copy anything, and processes opening the same cube share its pages
+    through the page cache.
+    """
+
+    def __init__(self, cube_dir: str) -> None:
+        self._cube_dir = Path(cube_dir)
+        with open(self._cube_dir / LABELS_FILE, encoding="utf-8") as f:
+            labels = json.load(f)
+        self.type: Literal["10min", "hourly", "daily"] = labels["type"]
+        self.datetimes = pd.DatetimeIndex(labels["datetimes"])
+        self.stations: list[tuple[str, str]] = [
+            (block_no, station) for block_no, station in labels["stations"]
+        ]
+        self.elements: list[str] = labels["elements"]
+        self.values: np.ndarray = np.load(
+            self._cube_dir / VALUES_FILE, mmap_mode="r"
+        )
+
+    @staticmethod
+    def is_cube(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, LABELS_FILE))
+
+    @staticmethod
+    def write(
+        df: pd.DataFrame,
+        type: Literal["10min", "hourly", "daily"],
+        cube_dir: str,
+    ) -> None:
+        """Write a frame loaded by `AmedasDataAnalyzer` (datetime index, (block_no, station, element) columns) as a cube.
+
+        The cube replaces any cube in `cube_dir` only once it is complete.
+        """
+        elements = [e for e in get_elements(type) if e not in TEXT_COLUMNS]
+        stations = list(
+            dict.fromkeys(
+                (block_no, station) for block_no, station, _ in df.columns
+            )
+        )
+        labels = {
+            "type": type,
+            "datetimes": [dt.isoformat() for dt in pd.to_datetime(df.index)],
+            "stations": stations,
+            "elements": elements,
+        }
+
+        cube_path = Path(cube_dir)
+        cube_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=cube_path.parent, suffix=".tmp"))
+        try:
+            values = np.lib.format.open_memmap(
+                tmp_dir / VALUES_FILE,
+                mode="w+",
+                dtype=np.float32,
+                shape=(len(df.index), len(stations), len(elements)),
+            )
+            for i, (block_no, station) in enumerate(stations):
+                station_values = (
+                    df[(block_no, station)]
+                    .reindex(columns=elements)
+                    .to_numpy(dtype=np.float32)
+                )
+                station_values[station_values == np.float32(MISSING_VALUE)] = (
+                    np.nan
+                )
+                values[:, i, :] = station_values
+            values.flush()
+            del values
+            with open(tmp_dir / LABELS_FILE, "w", encoding="utf-8") as f:
+                json.dump(labels, f, ensure_ascii=False)
+            if cube_path.exists():
+                shutil.rmtree(cube_path)
+            os.replace(tmp_dir, cube_path)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def to_dataframe(
+        self,
+        block_numbers: list[str] | None = None,
+        elements: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Frame laid out like `AmedasDataAnalyzer.df`.
+
+        Without projection, the frame is a view of the memory-mapped values.
+        Projecting stations or elements copies only the selected values.
+        """
+        station_indices = [
+            i
+            for i, (block_no, _) in enumerate(self.stations)
+            if block_numbers is None or block_no in block_numbers
+        ]
+        element_indices = [
+            i
+            for i, element in enumerate(self.elements)
+            if elements is None or element in elements
+        ]
+        values = self.values
+        if len(station_indices) < len(self.stations):
+            values = values[:, station_indices]
+        if len(element_indices) < len(self.elements):
+            values = values[:, :, element_indices]
+        columns = pd.MultiIndex.from_tuples(
+            [
+                (*self.stations[i], self.elements[j])
+                for i in station_indices
+                for j in element_indices
+            ],
+            names=["block_no", "station", "element"],
+        )
+        return pd.DataFrame(
+            values.reshape(len(self.datetimes), -1),
+            index=self.datetimes.rename("datetime"),
+            columns=columns,
+            copy=False,
+        )
@@ -0,0 +1,246 @@
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from time import time_ns
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+from config.storage.parquet import PARQUET_COMPRESSION, PARQUET_ROW_GROUP_SIZE
+from constants.observation_elems import TEXT_COLUMNS
+from observation.table_parser import get_elements
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+KEY_COLUMNS = ["datetime", "block_no", "station"]
+
+
+class ObservationParquetStore:
+    """Observed values stored as parquet files partitioned by type, year and month.
+
+    Files are laid out as `{root_dir}/type={type}/year={yyyy}/month={mm}/part-*.parquet`.
+    Each row holds one station at one datetime: the `datetime`, `block_no` and
+    `station` keys followed by one column per element. Values are float32 and
+    strings are dictionary encoded. Every `write` adds new part files, and
+    when parts overlap, the rows of the latest part win on read.
+
+    Values are stored as in csv files: flagged values are the missing value
+    and unobserved elements are NaN.
+    """
+
+    def __init__(self, root_dir: str) -> None:
+        if pa is None:
+            raise ImportError(
+                "pyarrow is required for the parquet storage. Install it with `pip install pyarrow`."
+            )
+        self._root_dir = Path(root_dir)
+
+    def write(
+        self, df: pd.DataFrame, type: Literal["10min", "hourly", "daily"]
+    ) -> None:
+        """Store a frame laid out like the csv files (see `ObservationBuffer.to_dataframe`)."""
+        long_df = self.to_long(df, type)
+        datetimes = long_df["datetime"].dt
+        for (year, month), part_df in long_df.groupby(
+            [datetimes.year, datetimes.month], sort=True
+        ):
+            self._write_part(
+                self._get_partition_dir(type, year, month),
+                self._to_table(part_df, type),
+            )
+
+    def read(
+        self,
+        type: Literal["10min", "hourly", "daily"],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        block_numbers: list[str] | None = None,
+        elements: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Read the stored values into a frame indexed by datetime.
+
+        Only the partitions overlapping [start, end) are opened, and only the
+        requested element columns and the row groups of the requested
+        stations are read.
+
+        Args:
+            type (Literal["10min", "hourly", "daily"]): type of the observed values
+            start (datetime | None, optional): first datetime to read. Defaults to None.
+            end (datetime | None, optional): datetime to read up to, excluded. Defaults to None.
+            block_numbers (list[str] | None, optional): stations to read. Defaults to all.
+            elements (list[str] | None, optional): elements to read. Defaults to all.
+
+        Returns:
+            pd.DataFrame: values with columns (block_no, station, element), as loaded from csv files by `AmedasDataAnalyzer`.
+        """
+        elements = elements or get_elements(type)
+        filters = []
+        if start is not None:
+            filters.append(("datetime", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("datetime", "<", pd.Timestamp(end)))
+        if block_numbers is not None:
+            filters.append(("block_no", "in", list(block_numbers)))
+        tables = [
+            pq.read_table(
+                path, columns=KEY_COLUMNS + elements, filters=filters or None
+            )
+            for path in self._get_part_paths(type, start, end)
+        ]
+        if not tables:
+            return self.to_wide(
+                pd.DataFrame(columns=KEY_COLUMNS + elements), elements
+            )
+        long_df = pa.concat_tables(tables).to_pandas()
+        return self.to_wide(long_df, elements)
+
+    @staticmethod
+    def to_long(
+        df: pd.DataFrame, type: Literal["10min", "hourly", "daily"]
+    ) -> pd.DataFrame:
+        """One row per station and datetime, ordered by station then datetime.
+
+        Rows without any value are dropped.
+        """
+        elements = get_elements(type)
+        datetimes = pd.to_datetime(df[("", "", "datetime")]).to_numpy()
+        value_df = df.drop(columns=[("", "", "datetime")])
+        stations = list(
+            dict.fromkeys(
+                (block_no, station)
+                for block_no, station, _ in value_df.columns
+            )
+        )
+        station_dfs = []
+        for block_no, station in stations:
+            station_df = value_df[(block_no, station)].reindex(
+                columns=elements
+            )
+            station_df.insert(0, "station", station)
+            station_df.insert(0, "block_no", block_no)
+            station_df.insert(0, "datetime", datetimes)
+            station_dfs.append(station_df.dropna(how="all", subset=elements))
+        return pd.concat(station_dfs, ignore_index=True)
+
+    @staticmethod
+    def to_wide(long_df: pd.DataFrame, elements: list[str]) -> pd.DataFrame:
+        long_df = long_df.astype(
+            {"block_no": str, "station": str}
+            | {
+                element: object
+                for element in elements
+                if element in TEXT_COLUMNS
+            }
+        )
+        long_df["datetime"] = pd.to_datetime(long_df["datetime"]).astype(
+            "datetime64[ns]"
+        )
+        long_df = long_df.drop_duplicates(
+            subset=["block_no", "datetime"], keep="last"
+        )
+        stations = list(
+            dict.fromkeys(zip(long_df["block_no"], long_df["station"]))
+        )
+        wide_df = (
+            long_df.set_index(KEY_COLUMNS)[elements]
+            .unstack(["block_no", "station"])
+            .reorder_levels([1, 2, 0], axis=1)
+        )
+        wide_df = wide_df.reindex(
+            columns=pd.MultiIndex.from_tuples(
+                [
+                    (block_no, station, element)
+                    for block_no, station in stations
+                    for element in elements
+                ],
+                names=["block_no", "station", "element"],
+            )
+        ).sort_index()
+        wide_df.index.name = "datetime"
+        return wide_df
+
+    def _to_table(
+        self, part_df: pd.DataFrame, type: Literal["10min", "hourly", "daily"]
+    ) -> "pa.Table":
+        columns = {
+            "datetime": pa.array(
+                part_df["datetime"].to_numpy(dtype="datetime64[s]")
+            ),
+            "block_no": pa.array(
+                part_df["block_no"].to_numpy(dtype=str)
+            ).dictionary_encode(),
+            "station": pa.array(
+                part_df["station"].to_numpy(dtype=str)
+            ).dictionary_encode(),
+        }
+        for element in get_elements(type):
+            if element in TEXT_COLUMNS:
+                texts = [
+                    None if pd.isna(text) else str(text)
+                    for text in part_df[element]
+                ]
+                columns[element] = pa.array(
+                    texts, type=pa.string()
+                ).dictionary_encode()
+            else:
+                columns[element] = pa.array(
+                    part_df[element].to_numpy(dtype=np.float32)
+                )
+        return pa.table(columns)
+
+    def _write_part(self, partition_dir: Path, table: "pa.Table") -> None:
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=partition_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(
+                table,
+                tmp_path,
+                compression=PARQUET_COMPRESSION,
+                row_group_size=PARQUET_ROW_GROUP_SIZE,
+            )
+            os.replace(tmp_path, partition_dir / f"part-{time_ns()}.parquet")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _get_partition_dir(self, type: str, year: int, month: int) -> Path:
+        return (
+            self._root_dir
+            / f"type={type}"
+            / f"year={year}"
+            / f"month={str(month).zfill(2)}"
+        )
+
+    def _get_part_paths(
+        self, type: str, start: datetime | None, end: datetime | None
+    ) -> list[Path]:
+        """Part files of the months overlapping [start, end), oldest part first in each month."""
+        first_month = (start.year, start.month) if start is not None else None
+        end_month = (end.year, end.month) if end is not None else None
+        paths = []
+        type_dir = self._root_dir / f"type={type}"
+        for month_dir in sorted(type_dir.glob("year=*/month=*")):
+            month = (
+                int(month_dir.parent.name.split("=")[1]),
+                int(month_dir.name.split("=")[1]),
+            )
+            if first_month is not None and month < first_month:
+                continue
+            if end_month is not None and (
+                month > end_month
+                or (month == end_month and end == datetime(*end_month, 1))
+            ):
+                continue
+            paths += sorted(
+                month_dir.glob("part-*.parquet"),
+                key=lambda path: int(path.stem.split("-")[1]),
+            )
+        return paths
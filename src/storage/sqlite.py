@@ -0,0 +1,283 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Literal, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from constants.missing_value import MISSING_VALUE
+from constants.quality_flag import FLAG_NORMAL, FLAG_UNAVAILABLE
+from observation.assembler import ObservationBuffer
+from observation.table_parser import get_elements
+
+
+class StationSeries(NamedTuple):
+    datetimes: np.ndarray
+    values: np.ndarray
+    flags: np.ndarray
+
+
+class StationSnapshot(NamedTuple):
+    block_numbers: np.ndarray
+    values: np.ndarray
+    flags: np.ndarray
+
+
+class FlaggedCells(NamedTuple):
+    datetimes: np.ndarray
+    block_numbers: np.ndarray
+    elements: np.ndarray
+
+
+def _to_epoch(dt: datetime) -> int:
+    return pd.Timestamp(dt).value // 1_000_000_000
+
+
+class ObservationSqliteStore:
+    """Observed values in an embedded sqlite database, one row per value.
+
+    Each type has its own tidy table `observation_{type}` of (block_no,
+    datetime, element, value, flag), keyed by (block_no, datetime, element)
+    so that the values of a station over a period are contiguous, with an
+    index on datetime for the values of all stations at a time. Datetimes
+    are the JST wall-clock time in seconds since 1970-01-01. Values keep the
+    quality flag they were read with (see /src/constants/quality_flag.py),
+    elements a station does not observe are not stored, and the weather
+    texts of daily data are not stored either.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS station ("
+            "block_no TEXT PRIMARY KEY, station TEXT NOT NULL)"
+        )
+        self._tables: set[str] = set()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _get_table(self, type: Literal["10min", "hourly", "daily"]) -> str:
+        if type not in ("10min", "hourly", "daily"):
+            raise ValueError(f"Invalid type: {type}")
+        table = f"observation_{type}"
+        if table in self._tables:
+            return table
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "block_no TEXT NOT NULL, datetime INTEGER NOT NULL, "
+            "element TEXT NOT NULL, value REAL, flag INTEGER NOT NULL, "
+            "PRIMARY KEY (block_no, datetime, element)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_datetime "
+            f"ON {table} (datetime)"
+        )
+        self._tables.add(table)
+        return table
+
+    def insert(
+        self,
+        buffer: ObservationBuffer,
+        type: Literal["10min", "hourly", "daily"],
+    ) -> None:
+        """Insert the values of an assembled buffer in one transaction.
+
+        Values already stored for the same (block_no, datetime, element) are replaced.
+        """
+        table = self._get_table(type)
+        typed = buffer.typed
+        time_indices, station_indices, element_indices = np.nonzero(
+            typed.flags != FLAG_UNAVAILABLE
+        )
+        block_numbers = np.array([block_no for block_no, _ in buffer.stations])
+        epochs = buffer.datetimes.to_numpy(dtype="datetime64[s]").astype(
+            np.int64
+        )
+        elements = np.array(buffer.numeric_elements)
+        values = typed.values[time_indices, station_indices, element_indices]
+        rows = zip(
+            block_numbers[station_indices].tolist(),
+            epochs[time_indices].tolist(),
+            elements[element_indices].tolist(),
+            np.where(np.isnan(values), None, values.astype(object)).tolist(),
+            typed.flags[
+                time_indices, station_indices, element_indices
+            ].tolist(),
+        )
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO station VALUES (?, ?)", buffer.stations
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def query_station(
+        self,
+        type: Literal["10min", "hourly", "daily"],
+        block_no: str,
+        element: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> StationSeries:
+        """Values of one element of a station over [start, end), in time order.
+
+        Returns:
+            StationSeries: datetime64[s] datetimes, float32 values (NaN where not readable) and uint8 flags.
+        """
+        query = (
+            f"SELECT datetime, value, flag FROM {self._get_table(type)} "
+            "WHERE block_no = ? AND element = ?"
+        )
+        params: list = [block_no, element]
+        if start is not None:
+            query += " AND datetime >= ?"
+            params.append(_to_epoch(start))
+        if end is not None:
+            query += " AND datetime < ?"
+            params.append(_to_epoch(end))
+        rows = self._conn.execute(
+            query + " ORDER BY datetime", params
+        ).fetchall()
+        epochs, values, flags = self._unzip(rows, 3)
+        return StationSeries(
+            datetimes=np.array(epochs, dtype=np.int64).astype("datetime64[s]"),
+            values=np.array(values, dtype=np.float32),
+            flags=np.array(flags, dtype=np.uint8),
+        )
+
+    def query_snapshot(
+        self,
+        type: Literal["10min", "hourly", "daily"],
+        dt: datetime,
+        element: str,
+    ) -> StationSnapshot:
+        """Values of one element of all stations at a datetime, ordered by block_no.
+
+        Returns:
+            StationSnapshot: block numbers, float32 values (NaN where not readable) and uint8 flags.
+        """
+        rows = self._conn.execute(
+            f"SELECT block_no, value, flag FROM {self._get_table(type)} "
+            "WHERE datetime = ? AND element = ? ORDER BY block_no",
+            (_to_epoch(dt), element),
+        ).fetchall()
+        block_numbers, values, flags = self._unzip(rows, 3)
+        return StationSnapshot(
+            block_numbers=np.array(block_numbers, dtype=str),
+            values=np.array(values, dtype=np.float32),
+            flags=np.array(flags, dtype=np.uint8),
+        )
+
+    def query_flagged(
+        self,
+        type: Literal["10min", "hourly", "daily"],
+        flag: int,
+        elements: list[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> FlaggedCells:
+        """Cells of some elements stored with a quality flag over [start, end).
+
+        Returns:
+            FlaggedCells: datetime64[s] datetimes, block numbers and elements of the cells.
+        """
+        query = (
+            f"SELECT datetime, block_no, element FROM {self._get_table(type)} "
+            f"WHERE flag = ? AND element IN ({', '.join('?' * len(elements))})"
+        )
+        params: list = [flag, *elements]
+        if start is not None:
+            query += " AND datetime >= ?"
+            params.append(_to_epoch(start))
+        if end is not None:
+            query += " AND datetime < ?"
+            params.append(_to_epoch(end))
+        epochs, block_numbers, element_names = self._unzip(
+            self._conn.execute(query, params).fetchall(), 3
+        )
+        return FlaggedCells(
+            datetimes=np.array(epochs, dtype=np.int64).astype("datetime64[s]"),
+            block_numbers=np.array(block_numbers, dtype=str),
+            elements=np.array(element_names, dtype=str),
+        )
+
+    def read(
+        self,
+        type: Literal["10min", "hourly", "daily"],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        block_numbers: list[str] | None = None,
+        elements: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Read the values into a frame laid out like the csv files loaded by `AmedasDataAnalyzer`.
+
+        Values with any flag other than normal become the missing value.
+        """
+        query = (
+            "SELECT o.datetime, o.block_no, s.station, o.element, o.value, "
+            f"o.flag FROM {self._get_table(type)} o "
+            "JOIN station s USING (block_no) WHERE 1 = 1"
+        )
+        params: list = []
+        if start is not None:
+            query += " AND o.datetime >= ?"
+            params.append(_to_epoch(start))
+        if end is not None:
+            query += " AND o.datetime < ?"
+            params.append(_to_epoch(end))
+        for column, keys in (
+            ("o.block_no", block_numbers),
+            ("o.element", elements),
+        ):
+            if keys is not None:
+                query += f" AND {column} IN ({', '.join('?' * len(keys))})"
+                params += list(keys)
+        long_df = pd.DataFrame(
+            self._conn.execute(query, params).fetchall(),
+            columns=[
+                "datetime",
+                "block_no",
+                "station",
+                "element",
+                "value",
+                "flag",
+            ],
+        )
+        long_df["datetime"] = pd.to_datetime(long_df["datetime"], unit="s")
+        long_df["value"] = (
+            long_df["value"]
+            .astype(np.float32)
+            .where(long_df["flag"] == FLAG_NORMAL, np.float32(MISSING_VALUE))
+        )
+        wide_df = long_df.pivot(
+            index="datetime",
+            columns=["block_no", "station", "element"],
+            values="value",
+        ).sort_index()
+        stations = list(
+            dict.fromkeys(
+                (block_no, station) for block_no, station, _ in wide_df.columns
+            )
+        )
+        present_elements = set(long_df["element"])
+        return wide_df.reindex(
+            columns=pd.MultiIndex.from_tuples(
+                [
+                    (block_no, station, element)
+                    for block_no, station in stations
+                    for element in get_elements(type)
+                    if element in present_elements
+                ],
+                names=["block_no", "station", "element"],
+            )
+        )
+
+    @staticmethod
+    def _unzip(rows: list[tuple], width: int) -> list[tuple]:
+        return list(zip(*rows)) if rows else [()] * width
@@ -0,0 +1,187 @@
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from time import perf_counter
+from typing import Literal, cast
+
+import pandas as pd
+
+from analyzer.hourly import HourlyDataAnalyzer
+from analyzer.ten_minutely import TenMinuteDataAnalyzer
+from api.cache import ResponseCache
+from api.data_fetcher import fetch_data
+from observation.arranger import ObservedDataArranger
+from observation.assembler import ObservationBuffer
+
+
+def _get_observation_type(
+    page_url: str,
+) -> Literal["10min", "hourly", "daily"]:
+    page_name = page_url.split("?")[0].rsplit("/", 1)[-1]
+    type = page_name.split("_")[0]
+    if type not in ("10min", "hourly", "daily"):
+        raise ValueError(f"Not an observation page url: {page_url}")
+    return cast(Literal["10min", "hourly", "daily"], type)
+
+
+def _load_recorded_pages(page_urls: list[str]) -> list[bytes]:
+    cache = ResponseCache()
+    pages = []
+    for page_url in page_urls:
+        html = cache.get(page_url)
+        if html is None:
+            html = fetch_data(page_url)
+            cache.put(page_url, html)
+        pages.append(html)
+    return pages
+
+
+def _arrange_page(
+    html: bytes,
+    type: Literal["10min", "hourly", "daily"],
+    parser: Literal["fast", "read_html"],
+) -> pd.DataFrame:
+    arranger = ObservedDataArranger(html, type, parser=parser)
+    arranger.add_lacking_columns()
+    arranger.add_id_to_columns(station_name="", block_no="")
+    # read_html infers float columns while the fast parser keeps the cell
+    # texts, so the cells are compared once converted as they are stored
+    buffer = ObservationBuffer(
+        type=type,
+        stations=[("", "")],
+        page_datetimes=[
+            pd.date_range(0, periods=len(arranger.df.index), freq="min")
+        ],
+    )
+    buffer.fill(0, {0: arranger.df.to_numpy(dtype=object)})
+    return buffer.to_dataframe()
+
+
+def assert_same_parse(
+    html: bytes, type: Literal["10min", "hourly", "daily"]
+) -> None:
+    """Check that the fast table parser and pandas.read_html give the same values for a page.
+
+    Raises:
+        AssertionError: The columns or values of the parsers differ.
+    """
+    pd.testing.assert_frame_equal(
+        _arrange_page(html, type, "fast"),
+        _arrange_page(html, type, "read_html"),
+    )
+
+
+def benchmark_observation_parser(
+    page_urls: list[str], repeat: int = 5
+) -> None:
+    """Compare the parse time of the fast table parser and pandas.read_html.
+
+    Pages are taken from the response cache (see /src/config/scraping/cache.py) and recorded there first if missing, so only the parsing is timed. Both parsers must give the same values for every page (see `assert_same_parse`) before anything is timed.
+
+    Args:
+        page_urls (list[str]): urls of `10min/hourly/daily` `a1`/`s1` observation pages
+        repeat (int, optional): number of times each page is parsed by each parser. Defaults to 5.
+    Examples:
+        benchmark_observation_parser(
+            page_urls=[
+                "http://www.data.jma.go.jp/obd/stats/etrn/view/10min_s1.php?prec_no=82&block_no=47807&year=2022&month=08&day=08&view=p1",
+                "http://www.data.jma.go.jp/obd/stats/etrn/view/hourly_a1.php?prec_no=82&block_no=0780&year=2022&month=08&day=08&view=",
+            ],
+        )
+    """
+    pages = _load_recorded_pages(page_urls)
+    types = [_get_observation_type(page_url) for page_url in page_urls]
+    for html, type in zip(pages, types):
+        assert_same_parse(html, type)
+    elapsed = {}
+    for parser in ("read_html", "fast"):
+        start = perf_counter()
+        for _ in range(repeat):
+            for html, type in zip(pages, types):
+                arranger = ObservedDataArranger(html, type, parser=parser)
+                arranger.add_lacking_columns()
+        elapsed[parser] = (perf_counter() - start) / (repeat * len(pages))
+        print(f"{parser:>9}: {elapsed[parser] * 1000:.2f} ms/page")
+    print(f"speed-up: {elapsed['read_html'] / elapsed['fast']:.1f}x")
+
+
+def _measure_frames(
+    extract: Callable[[datetime], object], datetimes: list[datetime]
+) -> tuple[float, int]:
+    extract(datetimes[0])
+    start = perf_counter()
+    for dt in datetimes:
+        extract(dt)
+    elapsed = (perf_counter() - start) / len(datetimes)
+
+    peak = 0
+    tracemalloc.start()
+    for dt in datetimes:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        extract(dt)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark_frame_extraction(
+    observed_data_path: str,
+    type: Literal["10min", "hourly"],
+    var_name: str = "temperature",
+    frames: int = 24,
+) -> None:
+    """Compare extracting the values of all stations for a frame record by record and as arrays.
+
+    The record path builds one validated `ObservedValuesContainer` per station as `get_observed_values` does, the array path takes one row slice with `get_values_at`. Time and peak memory allocated per frame are printed.
+
+    Args:
+        observed_data_path (str): csv file path (or store, see AmedasDataAnalyzer) of the observation data
+        type (Literal["10min", "hourly"]): Type of the observation data.
+        var_name (str, optional): element to extract. Defaults to "temperature".
+        frames (int, optional): number of time steps extracted by each path. Defaults to 24.
+    Examples:
+        benchmark_frame_extraction(
+            observed_data_path=generate_path("/data/10min_data/sample.csv"),
+            type="10min",
+        )
+    """
+    if type == "10min":
+        analyzer = TenMinuteDataAnalyzer(observed_data_path)
+    else:
+        analyzer = HourlyDataAnalyzer(observed_data_path)
+    datetimes = analyzer.get_datetimes()[:frames]
+    block_numbers = [
+        block_no
+        for block_no in analyzer.block_numbers
+        if (block_no, analyzer.station_dict[block_no].station_name, var_name)
+        in analyzer.columns
+    ]
+
+    def extract_records(dt: datetime) -> list:
+        return [
+            analyzer.get_observed_values(dt, block_no, var_name)
+            for block_no in block_numbers
+        ]
+
+    def extract_arrays(dt: datetime) -> object:
+        return analyzer.get_values_at(dt, var_name)
+
+    results = {
+        "records": _measure_frames(extract_records, datetimes),
+        "arrays": _measure_frames(extract_arrays, datetimes),
+    }
+    print(f"{len(block_numbers)} stations, {len(datetimes)} frames")
+    for path, (elapsed, peak) in results.items():
+        print(
+            f"{path:>7}: {elapsed * 1000:.3f} ms/frame, "
+            f"{peak / 1024:.1f} KiB allocated/frame"
+        )
+    (records_elapsed, records_peak), (arrays_elapsed, arrays_peak) = (
+        results["records"],
+        results["arrays"],
+    )
+    print(
+        f"speed-up: {records_elapsed / arrays_elapsed:.1f}x, "
+        f"allocation: {records_peak / max(arrays_peak, 1):.1f}x less"
+    )
@@ -3,6 +3,7 @@ from typing import Literal
 from config.figure.gif import make_gif
 from figure.drawing.temperature_plot import TemperaturePlot
 from figure.drawing.wind_plot import WindPlot
+from stations.spatial import SpatialQuery
 
 
 def visualize_composite_temperature(
@@ -18,6 +19,7 @@ def visualize_composite_temperature(
         "lowest_temperature",
         "mean_temperature",
     ] = "temperature",
+    area: SpatialQuery | None = None,
 ):
     """The acquired temperature data for the entire period is plotted on a map and saved as an image.
 
@@ -26,8 +28,11 @@ def visualize_composite_temperature(
         type (Literal[ "10min", "hourly", ]): Type of observation value to be obtained.
         save_dir (str, optional): directory to save figure images.
         var_name (Literal["temperature"], optional): variable name to plot. See csv column name. 'highest_temperature', 'lowest_temperature', 'mean_temperature' is available. Defaults to "temperature".
+        area (SpatialQuery | None, optional): stations to plot: a BoundingBox, a Circle, or the k Nearest stations of a point (see /src/stations/spatial.py). Only these stations are loaded. Defaults to the extent of the map set in /src/config/figure/base_map.py.
     """
-    service = TemperaturePlot(csv_filepath=observed_data_path, type=type)
+    service = TemperaturePlot(
+        csv_filepath=observed_data_path, type=type, area=area
+    )
     service.make_composite_temperature(
         var_name=var_name,
         save_dir=save_dir,
@@ -42,6 +47,7 @@ def visualize_composite_wind(
         "hourly",
     ],
     save_dir: str,
+    area: SpatialQuery | None = None,
 ):
     """The acquired wind data for the entire period is plotted on a map and saved as an image.
 
@@ -49,6 +55,7 @@ def visualize_composite_wind(
         observed_data_path (str): csv file path of the acquired observation data
         type (Literal[ "10min", "hourly", ]): Type of observation value to be obtained.
         save_dir (str, optional): directory to save figure images.
+        area (SpatialQuery | None, optional): stations to plot: a BoundingBox, a Circle, or the k Nearest stations of a point (see /src/stations/spatial.py). Only these stations are loaded. Defaults to the extent of the map set in /src/config/figure/base_map.py.
     """
-    service = WindPlot(csv_filepath=observed_data_path, type=type)
+    service = WindPlot(csv_filepath=observed_data_path, type=type, area=area)
     service.make_composite_wind_figure(save_dir=save_dir, make_gif=make_gif)
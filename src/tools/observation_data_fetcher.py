@@ -1,15 +1,46 @@
-from datetime import date
+import os
+from datetime import date, datetime
 from typing import Literal
 
+from analyzer.daily import DailyDataAnalyzer
+from analyzer.hourly import HourlyDataAnalyzer
+from analyzer.ten_minutely import TenMinuteDataAnalyzer
+from config.scraping.cache import use_response_cache
+from config.scraping.concurrency import MAX_WORKERS, PARSE_WORKERS
+from config.storage.output_path import CUBE_DIR, PARQUET_STORE_DIR
 from observation.csv_output import ObservedDataProcessor
+from observation.planner import expand_date_range
+from observation.writer import CSV_FLOAT_FORMAT, CsvBlockWriter
+from stations.spatial import SpatialQuery
+from storage.cube import ObservationCube
+from storage.parquet import ObservationParquetStore
+from util.path import generate_path
+
+
+def _expand_target_dates(
+    dates: list[date] | None, date_range: tuple[date, date] | None
+) -> list[date] | None:
+    if date_range is None:
+        return dates
+    return (dates or []) + expand_date_range(*date_range)
 
 
 def fetch_observation_data(
-    prec_numbers: list[str],
+    prec_numbers: list[str] | None,
     type: Literal["10min", "hourly", "daily"],
     dates: list[date] | None,
     months: list[date] | None,
     csv_file_name: str,
+    max_workers: int = MAX_WORKERS,
+    use_cache: bool = use_response_cache,
+    resumable: bool = True,
+    incremental: bool = False,
+    streaming: bool = False,
+    date_range: tuple[date, date] | None = None,
+    max_requests: int | None = None,
+    parse_workers: int = PARSE_WORKERS,
+    storage_format: Literal["csv", "parquet", "sqlite"] = "csv",
+    area: SpatialQuery | None = None,
 ) -> None:
     """Scraping observation data from the JMA AMeDAS page and saving it to a csv file.
     Available AMeDAS observation data is three types: 10-minute data, hourly data, and daily data.
@@ -17,11 +48,21 @@ def fetch_observation_data(
     Specify the type of data you want to retrieve (type) and the dates you want to retrieve (dates).
     If you want to get data for multiple days, please add them to the list.If you want to specify a daily value, specify any day of the month.
     Args:
-        prec_numbers (list[str]): List of prec numbers for the prefecture you wish to retrieve.
+        prec_numbers (list[str] | None): List of prec numbers for the prefecture you wish to retrieve. None selects all prefectures.
         type (Literal[&quot;10min&quot;, &quot;hourly&quot;, &quot;daily&quot;]): Type of observation value to be obtained.
         dates (list[date] | None): List of dates retrieved for 10-minute data and hourly data
         months (list[date] | None): List of dates retrieved for daily data
         csv_file_name (str): csv filename to save the observation data.
+        max_workers (int, optional): Number of pages downloaded in parallel. Requests to the JMA server are still limited per host (see /src/config/scraping/concurrency.py). Defaults to 1.
+        use_cache (bool, optional): If True, downloaded pages are kept in a local compressed cache and reused by later runs (see /src/config/scraping/cache.py). Pages of elapsed days never expire. Defaults to True.
+        resumable (bool, optional): If True, finished pages are checkpointed on disk so that rerunning the same call after a failure continues where it stopped. Defaults to True.
+        incremental (bool, optional): If True and csv_file_name already exists, only the (station, date) pairs missing from it are fetched, and they are merged into the existing file deduplicated by (block_no, datetime). Defaults to False.
+        streaming (bool, optional): If True, each date is written to the csv file as soon as it is fetched, which keeps memory at one date's worth of data for long periods. Cannot be combined with incremental. Defaults to False.
+        date_range (tuple[date, date] | None, optional): (start, end) of the dates to retrieve, both included. The dates are added to dates. For daily data, dates in the same month are fetched once. Defaults to None.
+        max_requests (int | None, optional): If given, the job is not started when it needs more requests than this. The number of requests and the estimated time are printed before every job. Defaults to None.
+        parse_workers (int, optional): Number of processes parsing the downloaded pages while the next pages are downloaded. 0 parses them in the download threads. Defaults to 0.
+        storage_format (Literal["csv", "parquet", "sqlite"], optional): "parquet" stores the data in a columnar store partitioned by type/year/month under /data/parquet/{csv_file_name without extension} instead of a csv file. It loads much faster for long periods and can be exported to csv with export_observation_csv. Requires pyarrow. "sqlite" stores every value with its quality flag in /data/sqlite/{csv_file_name without extension}.sqlite3, indexed for station and time queries (see /src/storage/sqlite.py). Defaults to "csv".
+        area (SpatialQuery | None, optional): If given, only the stations in this area are fetched: a BoundingBox, a Circle, or the k Nearest stations of a point (see /src/stations/spatial.py). prec_numbers can then be None to select stations from all prefectures. Defaults to None.
     Examples:
         fetch_observation_data(
         prec_numbers=["82", "83", "85", "86", "87"],
@@ -37,11 +78,187 @@ def fetch_observation_data(
         months=[date(2022, 8, 1), date(2022, 9, 1)],
         csv_file_name="sample_daily.csv",
     )
+    fetch_observation_data(
+        prec_numbers=None,
+        type="hourly",
+        dates=[date(2022, 8, 8)],
+        months=None,
+        csv_file_name="sample_map_extent.csv",
+        area=BoundingBox(
+            lon_left=130, lon_right=132, lat_bottom=32, lat_top=34
+        ),
+    )
+    """
+    service = ObservedDataProcessor(
+        prec_numbers=prec_numbers,
+        type=type,
+        dates=_expand_target_dates(dates, date_range),
+        months=months,
+        max_workers=max_workers,
+        use_cache=use_cache,
+        parse_workers=parse_workers,
+        area=area,
+    )
+    service.save_observed_data(
+        csv_file_name=csv_file_name,
+        resumable=resumable,
+        incremental=incremental,
+        streaming=streaming,
+        max_requests=max_requests,
+        storage_format=storage_format,
+    )
+
+
+def estimate_observation_fetch(
+    prec_numbers: list[str] | None,
+    type: Literal["10min", "hourly", "daily"],
+    dates: list[date] | None,
+    months: list[date] | None,
+    max_workers: int = MAX_WORKERS,
+    date_range: tuple[date, date] | None = None,
+    csv_file_name: str | None = None,
+    area: SpatialQuery | None = None,
+) -> None:
+    """Print the number of pages and requests and the estimated time of a fetch_observation_data job without fetching anything.
+    Pages already in the response cache or in the checkpoint of csv_file_name are not counted as requests.
+    Args:
+        prec_numbers (list[str] | None): List of prec numbers for the prefecture you wish to retrieve. None selects all prefectures.
+        type (Literal[&quot;10min&quot;, &quot;hourly&quot;, &quot;daily&quot;]): Type of observation value to be obtained.
+        dates (list[date] | None): List of dates retrieved for 10-minute data and hourly data
+        months (list[date] | None): List of dates retrieved for daily data
+        max_workers (int, optional): Number of pages downloaded in parallel. Defaults to 1.
+        date_range (tuple[date, date] | None, optional): (start, end) of the dates to retrieve, both included. Defaults to None.
+        csv_file_name (str | None, optional): csv filename of the job. Defaults to None.
+        area (SpatialQuery | None, optional): If given, only the stations in this area are counted (see fetch_observation_data). Defaults to None.
+    Examples:
+        estimate_observation_fetch(
+        prec_numbers=["82"],
+        type="hourly",
+        dates=None,
+        months=None,
+        max_workers=4,
+        date_range=(date(2022, 8, 1), date(2022, 8, 31)),
+    )
     """
     service = ObservedDataProcessor(
         prec_numbers=prec_numbers,
         type=type,
-        dates=dates,
+        dates=_expand_target_dates(dates, date_range),
         months=months,
+        max_workers=max_workers,
+        area=area,
     )
-    service.save_observed_data(csv_file_name=csv_file_name)
+    service.plan(csv_file_name=csv_file_name)
+
+
+def export_observation_csv(
+    dataset_name: str,
+    type: Literal["10min", "hourly", "daily"],
+    csv_file_name: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    block_numbers: list[str] | None = None,
+) -> None:
+    """Export observation data of a parquet store to a csv file in the format written by fetch_observation_data.
+    Args:
+        dataset_name (str): name of the store, the csv_file_name given to fetch_observation_data without its extension.
+        type (Literal[&quot;10min&quot;, &quot;hourly&quot;, &quot;daily&quot;]): Type of observation value to export.
+        csv_file_name (str): csv filename to save the observation data.
+        start (datetime | None, optional): first datetime to export. Defaults to None.
+        end (datetime | None, optional): datetime to export up to, excluded. Defaults to None.
+        block_numbers (list[str] | None, optional): stations to export. Defaults to all.
+    Examples:
+        export_observation_csv(
+        dataset_name="sample_hourly",
+        type="hourly",
+        csv_file_name="sample_hourly_202208.csv",
+        start=datetime(2022, 8, 1),
+        end=datetime(2022, 9, 1),
+    )
+    """
+    store = ObservationParquetStore(
+        os.path.join(PARQUET_STORE_DIR, dataset_name)
+    )
+    df = store.read(type, start=start, end=end, block_numbers=block_numbers)
+    df = df.reset_index(col_level=2, col_fill="")
+    df.columns.names = [None, None, None]
+    csv_path = generate_path(f"/data/{type}_data/{csv_file_name}")
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    df.to_csv(
+        csv_path,
+        header=True,
+        index=False,
+        na_rep="nan",
+        float_format=CSV_FLOAT_FORMAT,
+    )
+
+
+def derive_observation_data(
+    observed_data_path: str,
+    type: Literal["hourly", "daily"],
+    csv_file_name: str,
+    start: date | None = None,
+    end: date | None = None,
+) -> str:
+    """Derive hourly or daily data from 10-minute data already fetched, without any request to the JMA server.
+    The values follow the JMA statistics: hourly values are the values on the hour, daily means are the means of the 24 values on the hour, precipitation and sunshine are summed, and extremes are given with their time as minutes of the day (see /src/analyzer/helper/resample.py). The wind is also averaged as vectors (vector_mean_ws, vector_mean_wd, wind_steadiness).
+    A csv file is read and written a few days at a time (see /src/config/analyzer/resample.py), so long periods fit in memory.
+    Args:
+        observed_data_path (str): csv file path, parquet store directory, sqlite store file or cube directory of the 10-minute data
+        type (Literal[&quot;hourly&quot;, &quot;daily&quot;]): Type of observation value to derive.
+        csv_file_name (str): csv filename to save the derived data, under /data/{type}_data like the fetched data.
+        start (date | None, optional): first day to derive. Defaults to None.
+        end (date | None, optional): day to derive up to, excluded. Defaults to None.
+    Returns:
+        str: path of the csv file
+    Examples:
+        derive_observation_data(
+        observed_data_path=generate_path("/data/10min_data/sample.csv"),
+        type="daily",
+        csv_file_name="sample_daily_derived.csv",
+    )
+    """
+    # csv files are parsed one day at a time
+    analyzer = TenMinuteDataAnalyzer(
+        observed_data_path, lazy=observed_data_path.endswith(".csv")
+    )
+    csv_path = generate_path(f"/data/{type}_data/{csv_file_name}")
+    writer = CsvBlockWriter(csv_path)
+    for df in analyzer.iter_resampled(type, start=start, end=end):
+        df = df.reset_index(col_level=2, col_fill="")
+        df.columns.names = [None, None, None]
+        writer.write(df)
+    writer.close()
+    return csv_path
+
+
+def build_observation_cube(
+    observed_data_path: str,
+    type: Literal["10min", "hourly", "daily"],
+    cube_name: str,
+) -> str:
+    """Convert observation data to a memory-mapped cube that analyzers and plots can load without parsing or copying it.
+    Pass the returned directory as observed_data_path (csv_filepath) to the visualization tools or analyzers.
+    Args:
+        observed_data_path (str): csv file path or parquet store directory of the acquired observation data
+        type (Literal[&quot;10min&quot;, &quot;hourly&quot;, &quot;daily&quot;]): Type of observation value.
+        cube_name (str): name of the cube directory created under /data/cube
+    Returns:
+        str: directory of the cube
+    Examples:
+        build_observation_cube(
+        observed_data_path=generate_path("/data/10min_data/sample.csv"),
+        type="10min",
+        cube_name="sample_10min",
+    )
+    """
+    match type:
+        case "10min":
+            analyzer = TenMinuteDataAnalyzer(observed_data_path)
+        case "hourly":
+            analyzer = HourlyDataAnalyzer(observed_data_path)
+        case "daily":
+            analyzer = DailyDataAnalyzer(observed_data_path)
+    cube_dir = os.path.join(CUBE_DIR, cube_name)
+    ObservationCube.write(analyzer.df, type, cube_dir)
+    return cube_dir
@@ -2,6 +2,7 @@ import os
 
 from config.scraping.output_path import STATIONS_CSV
 from stations.csv_output import StationsDataProcessor
+from stations.refresh import StationsRefresher
 
 
 def fetch_stations_info(output_path: str = STATIONS_CSV) -> None:
@@ -17,3 +18,14 @@ def fetch_stations_info(output_path: str = STATIONS_CSV) -> None:
         return
     service = StationsDataProcessor()
     service.save_stations_info(output_path=output_path)
+
+
+def refresh_stations_info(output_path: str = STATIONS_CSV) -> None:
+    """Brings the stations csv file up to date with the JMA pages, creating it if it does not exist.
+    The pages are requested with conditional requests, so a refresh costs a few small requests when nothing changed and can run before every job.
+    Only the stations added, removed or moved since the last refresh are applied, and each change is appended to /data/stations/changes.jsonl (see /src/config/scraping/output_path.py).
+
+     Args:
+         output_path (str, optional): path of the station csv file. Default is following to /src/config/output_path.py.
+    """
+    StationsRefresher(output_path=output_path).refresh()
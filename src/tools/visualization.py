@@ -4,6 +4,7 @@ from config.figure.gif import make_gif
 from config.figure.output_path import FIGURE_IMAGE_DIR
 from figure.drawing.temperature_plot import TemperaturePlot
 from figure.drawing.wind_plot import WindPlot
+from stations.spatial import SpatialQuery
 
 
 def vizualize_temperature(
@@ -19,6 +20,7 @@ def vizualize_temperature(
         "lowest_temperature",
         "mean_temperature",
     ] = "temperature",
+    area: SpatialQuery | None = None,
 ):
     """The acquired temperature data for the entire period is plotted on a map and saved as an image.
 
@@ -27,8 +29,11 @@ def vizualize_temperature(
         type (Literal[ &quot;10min&quot;, &quot;hourly&quot;, ]): Type of observation value to be obtained.
         save_root_dir (str, optional): root directory to save figure images. Default is following to src/config/figure/output_path.py.
         var_name (Literal[&quot;temperature&quot;], optional): variable name to plot. See csv column name. 'highest_temperature', 'lowest_temperature', 'mean_temperature' is available. Defaults to "temperature".
+        area (SpatialQuery | None, optional): stations to plot: a BoundingBox, a Circle, or the k Nearest stations of a point (see /src/stations/spatial.py). Only these stations are loaded. Defaults to the extent of the map set in /src/config/figure/base_map.py.
     """
-    service = TemperaturePlot(csv_filepath=observed_data_path, type=type)
+    service = TemperaturePlot(
+        csv_filepath=observed_data_path, type=type, area=area
+    )
     service.make_all_figures(
         var_name=var_name,
         save_root_dir=save_root_dir,
@@ -43,6 +48,7 @@ def vizualize_wind(
         "hourly",
     ],
     save_root_dir: str = FIGURE_IMAGE_DIR,
+    area: SpatialQuery | None = None,
 ):
     """The acquired wind data for the entire period is plotted on a map and saved as an image.
 
@@ -50,6 +56,7 @@ def vizualize_wind(
         observed_data_path (str): csv file path of the acquired observation data
         type (Literal[ &quot;10min&quot;, &quot;hourly&quot;, ]): Type of observation value to be obtained.
         save_root_dir (str, optional): root directory to save figure images. Default is following to src/config/figure/output_path.py.
+        area (SpatialQuery | None, optional): stations to plot: a BoundingBox, a Circle, or the k Nearest stations of a point (see /src/stations/spatial.py). Only these stations are loaded. Defaults to the extent of the map set in /src/config/figure/base_map.py.
     """
-    service = WindPlot(csv_filepath=observed_data_path, type=type)
+    service = WindPlot(csv_filepath=observed_data_path, type=type, area=area)
     service.make_all_figures(save_root_dir=save_root_dir, make_gif=make_gif)
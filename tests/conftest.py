@@ -0,0 +1,27 @@
+import sys
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# the modules are imported from /src as the tools do
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+
+@pytest.fixture
+def stations_csv(monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Use the stations of tests/fixtures/stations.csv instead of /data/stations/stations.csv."""
+    import analyzer.base
+    import observation.station
+    from stations.registry import get_station_registry
+
+    path = FIXTURES_DIR / "stations.csv"
+    for module in (analyzer.base, observation.station):
+        monkeypatch.setattr(
+            module,
+            "get_station_registry",
+            partial(get_station_registry, str(path)),
+        )
+    return path
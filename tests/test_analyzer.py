@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from analyzer.hourly import HourlyDataAnalyzer
+from observation.writer import CsvBlockWriter
+from storage.csv_chunks import ChunkedCsvReader
+from storage.cube import ObservationCube
+
+
+def test_cube_values_keep_their_stored_digits(stations_csv, tmp_path):
+    df = pd.DataFrame(
+        {
+            ("0780", "Maebaru", "temperature"): [8.7, -999.9],
+            ("47807", "Fukuoka", "temperature"): [9.2, 10.3],
+        },
+        index=pd.DatetimeIndex(
+            ["2024-01-01 01:00", "2024-01-01 02:00"], name="datetime"
+        ),
+    )
+    ObservationCube.write(df, "hourly", str(tmp_path / "cube"))
+    analyzer = HourlyDataAnalyzer(str(tmp_path / "cube"))
+
+    values = analyzer.get_values_at(datetime(2024, 1, 1, 1), "temperature")
+
+    assert values.value.tolist() == [8.7, 9.2]
+
+
+def write_hourly_csv(csv_path: str, days: int) -> None:
+    datetimes = pd.date_range("2024-01-01 01:00", periods=24 * days, freq="h")
+    df = pd.DataFrame(
+        {
+            ("", "", "datetime"): datetimes,
+            ("47807", "Fukuoka", "temperature"): range(len(datetimes)),
+        }
+    )
+    writer = CsvBlockWriter(csv_path)
+    writer.write(df)
+    writer.close()
+
+
+def test_lazy_values_between_parse_only_the_days_in_range(
+    stations_csv, tmp_path, monkeypatch
+):
+    csv_path = str(tmp_path / "hourly.csv")
+    write_hourly_csv(csv_path, days=5)
+    eager = HourlyDataAnalyzer(csv_path)
+    lazy = HourlyDataAnalyzer(csv_path, lazy=True)
+    read_keys = []
+    read_chunk = ChunkedCsvReader.read_chunk
+    monkeypatch.setattr(
+        ChunkedCsvReader,
+        "read_chunk",
+        lambda reader, key: read_keys.append(key) or read_chunk(reader, key),
+    )
+    start, end = datetime(2024, 1, 2, 6), datetime(2024, 1, 3, 6)
+
+    lazy_values = lazy.get_values_between("temperature", start, end)
+    eager_values = eager.get_values_between("temperature", start, end)
+
+    assert read_keys == ["2024-01-02", "2024-01-03"]
+    assert lazy_values.datetimes.equals(eager_values.datetimes)
+    np.testing.assert_array_equal(lazy_values.values, eager_values.values)
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+import pytest
+
+from tools.benchmark import assert_same_parse
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+
+
+@pytest.mark.parametrize("layout", ["a1", "s1"])
+@pytest.mark.parametrize("type", ["10min", "hourly", "daily"])
+def test_fast_parser_matches_read_html(type, layout):
+    html = (PAGES_DIR / f"{type}_{layout}.html").read_bytes()
+
+    assert_same_parse(html, type)
@@ -0,0 +1,78 @@
+from email.message import Message
+
+from api.conditional import ConditionalFetcher
+from api.transport import TransportResponse
+
+URL = "https://www.data.jma.go.jp/stats/etrn/select/prefecture00.php"
+
+
+class FakeTransport:
+    """Answer 304 when the request carries the current ETag, 200 otherwise."""
+
+    def __init__(self, body: bytes, etag: str) -> None:
+        self.body = body
+        self.etag = etag
+        self.requests: list[dict[str, str]] = []
+
+    def request(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> TransportResponse:
+        headers = headers or {}
+        self.requests.append(headers)
+        response_headers = Message()
+        response_headers["ETag"] = self.etag
+        if headers.get("If-None-Match") == self.etag:
+            return TransportResponse(
+                url, 304, "Not Modified", response_headers, b""
+            )
+        return TransportResponse(url, 200, "OK", response_headers, self.body)
+
+
+def test_fetch_returns_stored_body_when_not_modified(tmp_path):
+    transport = FakeTransport(b"<html>1</html>", '"v1"')
+    first = ConditionalFetcher(str(tmp_path), transport)
+    first.fetch(URL)
+    first.save()
+    second = ConditionalFetcher(str(tmp_path), transport)
+
+    body = second.fetch(URL)
+
+    assert body == b"<html>1</html>"
+    assert transport.requests[-1] == {"If-None-Match": '"v1"'}
+    assert second.modified_urls == set()
+
+
+def test_fetch_downloads_changed_body(tmp_path):
+    transport = FakeTransport(b"<html>1</html>", '"v1"')
+    first = ConditionalFetcher(str(tmp_path), transport)
+    first.fetch(URL)
+    first.save()
+    transport.body, transport.etag = b"<html>2</html>", '"v2"'
+    second = ConditionalFetcher(str(tmp_path), transport)
+
+    body = second.fetch(URL)
+
+    assert body == b"<html>2</html>"
+    assert second.modified_urls == {URL}
+
+
+def test_validators_are_kept_only_on_save(tmp_path):
+    transport = FakeTransport(b"<html>1</html>", '"v1"')
+    ConditionalFetcher(str(tmp_path), transport).fetch(URL)
+    fetcher = ConditionalFetcher(str(tmp_path), transport)
+
+    fetcher.fetch(URL)
+
+    assert transport.requests == [{}, {}]
+    assert fetcher.modified_urls == {URL}
+
+
+def test_save_clears_modified_urls(tmp_path):
+    fetcher = ConditionalFetcher(
+        str(tmp_path), FakeTransport(b"<html>1</html>", '"v1"')
+    )
+    fetcher.fetch(URL)
+
+    fetcher.save()
+
+    assert fetcher.modified_urls == set()
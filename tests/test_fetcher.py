@@ -0,0 +1,182 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import observation.fetcher
+from api.cache import JST
+from observation.fetcher import ObservedDataFetcher
+from observation.manifest import FetchManifest
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+
+
+def test_assemble_observed_values_with_nothing_to_fetch(stations_csv):
+    fetcher = ObservedDataFetcher(
+        ["47807", "0780"], "hourly", dates=[date(2024, 1, 1)], use_cache=False
+    )
+    urls = fetcher.get_target_urls()
+    fetched_pairs = {
+        (block_no, date(2024, 1, 1)) for block_no in ["47807", "0780"]
+    }
+
+    df = fetcher.assemble_observed_values(urls, fetched_pairs=fetched_pairs)
+
+    assert df.empty
+    assert list(df.columns) == [("", "", "datetime")]
+
+
+def test_merge_with_saved_keeps_saved_data_when_nothing_is_fetched(
+    stations_csv,
+):
+    fetcher = ObservedDataFetcher(
+        ["47807"], "hourly", dates=[date(2024, 1, 1)], use_cache=False
+    )
+    urls = fetcher.get_target_urls()
+    saved_df = pd.DataFrame(
+        {("47807", "Fukuoka", "temperature"): [1.5, 2.5]},
+        index=pd.DatetimeIndex(
+            ["2024-01-01 01:00", "2024-01-01 02:00"], name="datetime"
+        ),
+    )
+
+    df = fetcher.merge_with_saved(
+        fetcher.assemble_observed_values(
+            urls, fetched_pairs={("47807", date(2024, 1, 1))}
+        ),
+        saved_df,
+    )
+
+    assert df[("47807", "Fukuoka", "temperature")].tolist() == [1.5, 2.5]
+
+
+def make_saved_df(
+    fetcher: ObservedDataFetcher, target_date: date, hours: int
+) -> pd.DataFrame:
+    datetimes = pd.DatetimeIndex(
+        fetcher.create_base_dataframe(target_date).iloc[:, 0],
+        name="datetime",
+    )
+    values = [0.5] * hours + [None] * (len(datetimes) - hours)
+    return pd.DataFrame(
+        {("47807", "Fukuoka", "temperature"): values}, index=datetimes
+    )
+
+
+def test_get_fetched_pairs_counts_complete_pages_of_past_days(stations_csv):
+    fetcher = ObservedDataFetcher(
+        ["47807"], "hourly", dates=[date(2024, 1, 1)], use_cache=False
+    )
+    fetcher.get_target_urls()
+    saved_df = make_saved_df(fetcher, date(2024, 1, 1), hours=24)
+
+    assert fetcher.get_fetched_pairs(saved_df) == {("47807", date(2024, 1, 1))}
+
+
+def test_get_fetched_pairs_skips_partially_saved_pages(stations_csv):
+    fetcher = ObservedDataFetcher(
+        ["47807"], "hourly", dates=[date(2024, 1, 1)], use_cache=False
+    )
+    fetcher.get_target_urls()
+    saved_df = make_saved_df(fetcher, date(2024, 1, 1), hours=12)
+
+    assert fetcher.get_fetched_pairs(saved_df) == set()
+
+
+def test_get_fetched_pairs_skips_today(stations_csv):
+    today = datetime.now(tz=JST).date()
+    fetcher = ObservedDataFetcher(
+        ["47807"], "hourly", dates=[today], use_cache=False
+    )
+    fetcher.get_target_urls()
+    saved_df = make_saved_df(fetcher, today, hours=24)
+
+    assert fetcher.get_fetched_pairs(saved_df) == set()
+
+
+def serve_fixture_pages(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Answer page requests with tests/fixtures/pages and record their urls."""
+    requested = []
+
+    def fetch_page(self, page_url: str) -> bytes:
+        requested.append(page_url)
+        page_name = page_url.split("?")[0].rsplit("/", 1)[-1]
+        return (PAGES_DIR / page_name.replace(".php", ".html")).read_bytes()
+
+    monkeypatch.setattr(ObservedDataFetcher, "fetch_page", fetch_page)
+    return requested
+
+
+def assemble_fixture_pages(parse_workers: int) -> pd.DataFrame:
+    fetcher = ObservedDataFetcher(
+        ["47807", "0780"],
+        "hourly",
+        dates=[date(2022, 8, 8), date(2022, 8, 9)],
+        use_cache=False,
+        parse_workers=parse_workers,
+    )
+    return fetcher.assemble_observed_values(fetcher.get_target_urls())
+
+
+def test_pages_parsed_in_a_process_pool_give_the_same_frame(
+    stations_csv, monkeypatch
+):
+    serve_fixture_pages(monkeypatch)
+
+    df = assemble_fixture_pages(parse_workers=0)
+
+    assert df.shape == (48, 1 + 2 * 15)
+    assert df[("47807", "Fukuoka", "temperature")].notna().all()
+    pd.testing.assert_frame_equal(assemble_fixture_pages(parse_workers=1), df)
+
+
+@pytest.mark.parametrize("parse_workers", [0, 1])
+def test_resumed_job_reads_checkpointed_cells(
+    stations_csv, monkeypatch, tmp_path, parse_workers
+):
+    requested = serve_fixture_pages(monkeypatch)
+    kwargs = dict(
+        block_numbers=["47807", "0780"],
+        type="hourly",
+        dates=[date(2022, 8, 8)],
+        use_cache=False,
+        parse_workers=parse_workers,
+    )
+    fetcher = ObservedDataFetcher(
+        **kwargs, manifest=FetchManifest(str(tmp_path))
+    )
+    first = fetcher.assemble_observed_values(fetcher.get_target_urls())
+    requested.clear()
+
+    fetcher = ObservedDataFetcher(
+        **kwargs, manifest=FetchManifest(str(tmp_path))
+    )
+    resumed = fetcher.assemble_observed_values(fetcher.get_target_urls())
+
+    assert requested == []
+    pd.testing.assert_frame_equal(resumed, first)
+
+
+def test_download_thread_does_not_wait_for_parsing(stations_csv, monkeypatch):
+    serve_fixture_pages(monkeypatch)
+    parsing = threading.Event()
+    monkeypatch.setattr(
+        observation.fetcher,
+        "parse_page",
+        lambda html, type: parsing.wait() and np.empty((0, 15), dtype=object),
+    )
+    fetcher = ObservedDataFetcher(
+        ["47807"], "hourly", dates=[date(2022, 8, 8)], use_cache=False
+    )
+    (url,) = fetcher.get_target_urls()
+
+    with ThreadPoolExecutor(max_workers=1) as parse_pool:
+        result = fetcher.fetch_station_cells(
+            url, date(2022, 8, 8), "47807", parse_pool
+        )
+        assert isinstance(result, Future) and not result.done()
+        parsing.set()
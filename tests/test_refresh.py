@@ -0,0 +1,101 @@
+import pandas as pd
+
+from stations.refresh import StationChange, diff_stations
+
+COLUMNS = ["prec_no", "block_no", "station", "lat", "lon", "alt"]
+
+
+def make_stations(rows: list[list[str]]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def test_diff_stations_classifies_changes():
+    saved_df = make_stations(
+        [
+            ["82", "47807", "Fukuoka", "33.58", "130.38", "2.5"],
+            ["82", "0780", "Maebaru", "33.55", "130.2", "17"],
+            ["82", "0781", "Dazaifu", "33.5", "130.5", "37"],
+            ["82", "0782", "Itoshima", "33.6", "130.1", "5"],
+        ]
+    )
+    fetched_df = make_stations(
+        [
+            ["82", "47807", "Fukuoka", "33.58", "130.38", "2.5"],
+            ["82", "0780", "Maebaru", "33.56", "130.2", "17"],
+            ["82", "0782", "Itoshima", "33.6", "130.1", "6"],
+            ["82", "0783", "Asakura", "33.4", "130.7", "40"],
+        ]
+    )
+
+    updated_df, changes = diff_stations(saved_df, fetched_df)
+
+    assert changes == [
+        StationChange("removed", "82", "0781", "Dazaifu", "33.5", "130.5"),
+        StationChange(
+            "moved",
+            "82",
+            "0780",
+            "Maebaru",
+            "33.56",
+            "130.2",
+            "33.55",
+            "130.2",
+        ),
+        StationChange(
+            "updated",
+            "82",
+            "0782",
+            "Itoshima",
+            "33.6",
+            "130.1",
+            "33.6",
+            "130.1",
+        ),
+        StationChange("added", "82", "0783", "Asakura", "33.4", "130.7"),
+    ]
+    assert updated_df["block_no"].tolist() == ["47807", "0780", "0782", "0783"]
+    assert updated_df["lat"].tolist() == ["33.58", "33.56", "33.6", "33.4"]
+    assert updated_df["alt"].tolist() == ["2.5", "17", "6", "40"]
+
+
+def test_diff_stations_compares_numbers_by_value():
+    saved_df = make_stations(
+        [["82", "0780", "Maebaru", "33.0", "130", "17.0"]]
+    )
+    fetched_df = make_stations(
+        [["82", "0780", "Maebaru", "33", "130.0", "17"]]
+    )
+
+    _, changes = diff_stations(saved_df, fetched_df)
+
+    assert changes == []
+
+
+def test_diff_stations_detects_text_changes():
+    saved_df = make_stations([["82", "0780", "Maebaru", "33", "130", ""]])
+    fetched_df = make_stations([["82", "0780", "Itoshima", "33", "130", ""]])
+
+    _, changes = diff_stations(saved_df, fetched_df)
+
+    assert [change.change for change in changes] == ["updated"]
+    assert changes[0].station == "Itoshima"
+
+
+def test_diff_stations_rewrites_every_station_when_layout_changes():
+    saved_df = make_stations(
+        [["82", "0780", "Maebaru", "33", "130", "17"]]
+    ).drop(columns="alt")
+    fetched_df = make_stations([["82", "0780", "Maebaru", "33", "130", "17"]])
+
+    updated_df, changes = diff_stations(saved_df, fetched_df)
+
+    assert [change.change for change in changes] == ["added"]
+    assert list(updated_df.columns) == COLUMNS
+    assert updated_df.iloc[0].tolist() == [
+        "82",
+        "0780",
+        "Maebaru",
+        "33",
+        "130",
+        "17",
+    ]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from analyzer.ten_minutely import TenMinuteDataAnalyzer
+from constants.missing_value import MISSING_VALUE
+from observation.assembler import ObservationBuffer
+from storage.sqlite import ObservationSqliteStore
+
+
+def make_dry_day_buffer() -> ObservationBuffer:
+    """A day of 10-minute data of Fukuoka without rain nor sunshine ("--")."""
+    datetimes = pd.date_range("2024-01-01 00:10", periods=144, freq="10min")
+    row = ["1013.2", "1016.5", "--", "8.4", "60", "3.2", "北", "5.1", "北"]
+    buffer = ObservationBuffer(
+        type="10min",
+        stations=[("47807", "Fukuoka")],
+        page_datetimes=[datetimes],
+    )
+    buffer.fill(0, {0: np.array([row + ["--"]] * 144, dtype=object)})
+    return buffer
+
+
+def test_no_phenomenon_is_resampled_as_zero_from_sqlite(
+    stations_csv, tmp_path
+):
+    db_path = str(tmp_path / "10min.sqlite3")
+    store = ObservationSqliteStore(db_path)
+    store.insert(make_dry_day_buffer(), "10min")
+    store.close()
+    analyzer = TenMinuteDataAnalyzer(db_path)
+
+    hourly = analyzer.resample("hourly")
+    daily = analyzer.resample("daily")
+
+    assert len(hourly.index) == 24 and len(daily.index) == 1
+    for element in ("precipitation", "sunshine_hours"):
+        assert (hourly[("47807", "Fukuoka", element)] == 0).all()
+    for element in (
+        "total_precipitation",
+        "max_hourly_precipitation",
+        "sunshine_hours",
+    ):
+        assert (daily[("47807", "Fukuoka", element)] == 0).all()
+    assert (hourly[("47807", "Fukuoka", "temperature")] == 8.4).all()
+
+
+def test_no_phenomenon_stays_the_missing_value_in_csv_data():
+    df = make_dry_day_buffer().to_dataframe()
+
+    for element in ("precipitation", "sunshine_hours"):
+        assert (
+            df[("47807", "Fukuoka", element)] == np.float32(MISSING_VALUE)
+        ).all()
@@ -0,0 +1,26 @@
+from stations.parser import AreaInfoContainer, StationsParser
+
+AREA_PAGE = b"""<map name="point">
+<area shape="rect" alt="&#31119;&#23713;" href="#"
+ onmouseover="javascript:viewPoint('s','47807','&#31119;&#23713;','\xe3\x83\x95\xe3\x82\xaf\xe3\x82\xaa\xe3\x82\xab','33','34.9','130','22.6','2.5','1','1','1','1','1','9999','99','99','','','','','');">
+<area shape="rect" alt="&#21069;&#21407;" href="#"
+ onmouseover="javascript:viewPoint('a','0780','&#21069;&#21407;','\xe3\x83\x9e\xe3\x82\xa8\xe3\x83\x90\xe3\x83\xab','33','33.0','130','12.0','17','0','1','0','0','0','9999','99','99','','','','','');">
+</map>"""
+
+
+def test_get_stations_info_parses_every_area_page():
+    requested = []
+
+    def fetch(url: str) -> bytes:
+        requested.append(url)
+        return AREA_PAGE
+
+    df = StationsParser(b"").get_stations_info(
+        AreaInfoContainer(area_name=["福岡", "福岡"], prec_no=["82", "82"]),
+        fetch=fetch,
+    )
+
+    assert requested == [StationsParser.get_area_url("82")] * 2
+    assert df["block_no"].tolist() == ["47807", "0780"]
+    assert df["station"].tolist() == ["福岡", "前原"]
+    assert df["lat_minute"].tolist() == [34.9, 33.0]
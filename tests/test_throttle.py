@@ -0,0 +1,32 @@
+from api.rate_control import AdaptiveRateController
+from api.throttle import HostThrottle
+from config.scraping.concurrency import MIN_REQUEST_INTERVAL
+
+URL = "https://www.data.jma.go.jp/obd/stats/etrn/view/hourly_s1.php"
+
+
+def test_adaptive_interval_never_beats_the_politeness_floor():
+    controller = AdaptiveRateController(initial_interval=MIN_REQUEST_INTERVAL)
+    throttle = HostThrottle(
+        max_connections_per_host=4,
+        min_interval=MIN_REQUEST_INTERVAL,
+        rate_controller=controller,
+    )
+    for _ in range(100):
+        controller.record_success(URL, latency=0.01)
+
+    assert (
+        controller.get_interval("www.data.jma.go.jp") >= MIN_REQUEST_INTERVAL
+    )
+    assert throttle._get_interval("www.data.jma.go.jp") >= MIN_REQUEST_INTERVAL
+
+
+def test_throttle_keeps_its_floor_over_a_faster_controller():
+    controller = AdaptiveRateController(initial_interval=MIN_REQUEST_INTERVAL)
+    throttle = HostThrottle(
+        max_connections_per_host=4,
+        min_interval=1.0,
+        rate_controller=controller,
+    )
+
+    assert throttle._get_interval("www.data.jma.go.jp") == 1.0
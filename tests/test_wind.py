@@ -0,0 +1,26 @@
+import numpy as np
+
+from analyzer.helper.wind import get_vector_mean_wind
+from constants.wind_direction import CALM_VALUE
+
+
+def test_opposite_winds_cancel_out_to_calm():
+    wind = get_vector_mean_wind([2.0, 2.0], [90.0, 270.0])
+
+    assert wind.speed < 1e-9
+    assert wind.direction == float(CALM_VALUE)
+    assert wind.steadiness < 1e-9
+
+
+def test_steady_wind_keeps_its_direction():
+    wind = get_vector_mean_wind([3.0, 3.0], [90.0, 90.0])
+
+    np.testing.assert_allclose([wind.speed, wind.direction], [3.0, 90.0])
+    np.testing.assert_allclose(wind.steadiness, 1.0)
+
+
+def test_calm_winds_have_no_steadiness():
+    wind = get_vector_mean_wind([0.0, 0.0], [CALM_VALUE, CALM_VALUE])
+
+    assert wind.direction == float(CALM_VALUE)
+    assert np.isnan(wind.steadiness)